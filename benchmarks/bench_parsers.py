@@ -0,0 +1,41 @@
+"""
+Timpul de parsare + indexare pentru fiecare backend HTML instalat.
+
+Rulare, din rădăcina depozitului:
+    python benchmarks/bench_parsers.py [--runs 200]
+"""
+
+import argparse
+import pathlib
+import sys
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from custom_components.scomet.const import URL_SITUATIE, URL_FACTURI, URL_CONSUM_APA  # noqa: E402
+from custom_components.scomet.parsers import available_backends, parse_page  # noqa: E402
+
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+PAGES = {
+    "situatie": URL_SITUATIE,
+    "facturi": URL_FACTURI,
+    "consumuri": URL_CONSUM_APA,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'pagina':<12}{'backend':<14}{'ms/parsare':>12}")
+    for name, url in PAGES.items():
+        html = (FIXTURES / f"{name}.html").read_bytes().decode("utf-8")
+        for backend in available_backends():
+            seconds = min(timeit.repeat(lambda: parse_page(html, url, backend), number=args.runs, repeat=3))
+            print(f"{name:<12}{backend:<14}{seconds / args.runs * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Benchmark offline pentru lanțul descărcare → parsare → extragere.
+
+Rulează `ScometAPI` și `ScometCoordinator._async_update_data` reale împotriva
+unui server aiohttp local care servește paginile înregistrate din `fixtures/`
+(login, situatie, facturi, consumuri, plateste). Numele scomet.ro este rezolvat
+către serverul local, care folosește un certificat auto-semnat generat la pornire
+(cu `cryptography`, într-un director temporar), așa că URL-urile din `const.py`
+rămân neschimbate.
+
+Scenarii:
+  cold       coordinator nou la fiecare ciclu (login + toate paginile parsate)
+  changed    același coordinator, paginile diferă la fiecare cerere
+  unchanged  același coordinator, pagini identice (fără parsare)
+  overlap    ca `changed`, dar fiecare ciclu rulează în paralel cu încă un ciclu și cu
+             trei apăsări ale butonului de plată (cererile identice în curs sunt comasate)
+  relayout   ca `changed`, dar cu titlurile și etichetele paginilor reformulate
+             (`RELAYOUT`): câmpurile sunt găsite prin locatorii de rezervă, iar
+             lanțul este parcurs doar la primul ciclu (vezi `locator_searches_per_cycle`)
+
+Cu `--stream on/off` parsarea incrementală (cu oprire timpurie) este forțată
+pornită sau oprită, indiferent de backend-ul de parsare instalat. Cu `--trace`,
+urmărirea cererilor (serviciul scomet.trace) este pornită pentru toate cererile.
+
+Pentru fiecare scenariu se raportează timpul pe ciclu, cererile, conexiunile
+noi (cele refolosite din pool nu sunt numărate), octeții primiți de client (cu antete, după
+TLS, numărați în protocolul conexiunilor aiohttp, nu pe server), timpul CPU de parsare,
+câmpurile căutate prin lanțul de locatori, câmpurile negăsite și vârful de alocări (tracemalloc).
+Rezultatele sunt scrise ca JSON, ca să poată fi comparate între versiuni.
+
+Rulare, din rădăcina depozitului, într-un mediu cu Home Assistant instalat:
+    python benchmarks/bench_refresh.py [--cycles 20] [--output rezultate.json]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import pathlib
+import socket
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import aiohttp
+from aiohttp import web
+from aiohttp.abc import AbstractResolver
+from aiohttp.client_proto import ResponseHandler
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.scomet import hub as hub_module, utils_http  # noqa: E402
+from custom_components.scomet.const import (  # noqa: E402
+    CONF_CONSUMPTION_INTERVAL, CONF_INVOICES_INTERVAL, CONF_UPDATE_INTERVAL, DEFAULT_PARSE_MODE, HTTP_KEEPALIVE,
+    HUB_MAX_CONNECTIONS,
+)
+from custom_components.scomet.coordinator import ScometCoordinator  # noqa: E402
+from custom_components.scomet.hub import ScometHub  # noqa: E402
+from custom_components.scomet.utils_http import HostLimiter  # noqa: E402
+
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+HOST = "scomet.ro"
+# Toate paginile scadente la fiecare ciclu: măsurăm lanțul de actualizare, nu nivelurile de actualizare
+EVERY_CYCLE = {CONF_UPDATE_INTERVAL: 0, CONF_INVOICES_INTERVAL: 0, CONF_CONSUMPTION_INTERVAL: 0}
+# Marcajul schimbat al scenariului relayout: titluri reformulate, diacritice, etichete noi
+RELAYOUT = (
+    (b"<h5>Numar curent  persoane</h5>", "<h5>Număr persoane</h5>".encode()),
+    (b"<h5>Sold profilul curent</h5>", b"<h5>Sold curent</h5>"),
+    (b'data-label="Valoare"', b'data-label="Valoare factura"'),
+    (b'data-label="Data"', b'data-label="Data emitere"'),
+    (b"<h5>Apa rece General</h5>", "<h5>Apă rece General</h5>".encode()),
+)
+
+
+class StandInPortal:
+    """Înlocuitor local pentru scomet.ro, cu contoare de cereri și conexiuni."""
+
+    def __init__(self, mutate: bool = False):
+        self.pages = {path.stem: path.read_bytes() for path in FIXTURES.glob("*.html")}
+        self.mutate = mutate
+        self.relayout = False
+        self.requests = 0
+        self.connections = 0
+        self._sessions = set()
+        self._transports = set()
+
+    def reset_counters(self):
+        self.requests = 0
+        self.connections = 0
+
+    def _reply(self, body: bytes, cookie: str | None = None) -> web.Response:
+        response = web.Response(body=body, content_type="text/html", charset="utf-8")
+        if cookie:
+            response.set_cookie("deskis", cookie)
+        return response
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if request.transport not in self._transports:
+            self._transports.add(request.transport)
+            self.connections += 1
+        if request.method == "POST":
+            token = f"bench{len(self._sessions)}"
+            self._sessions.add(token)
+            return self._reply(self.pages["situatie"], cookie=token)
+
+        if request.query.get("autentificare") or request.cookies.get("deskis") not in self._sessions:
+            return self._reply(self.pages["login"])
+
+        body = self.pages[request.query["submeniu"]]
+        if self.relayout:
+            for old, new in RELAYOUT:
+                body = body.replace(old, new)
+        if self.mutate:
+            # Un comentariu diferit la fiecare cerere anulează detecția paginilor neschimbate
+            body = body.replace(b"</body>", f"<!-- {self.requests} --></body>".encode())
+        return self._reply(body)
+
+
+class ClientBytes:
+    """
+    Octeții primiți efectiv de client. Pe server am număra tot corpul trimis, chiar dacă
+    clientul închide conexiunea înainte să îl citească; aici numărăm ce ajunge la aiohttp.
+    """
+
+    def __init__(self):
+        self.count = 0
+        received = ResponseHandler.data_received
+
+        def data_received(protocol, data: bytes) -> None:
+            self.count += len(data)
+            received(protocol, data)
+
+        ResponseHandler.data_received = data_received
+
+
+class StandInResolver(AbstractResolver):
+    """Trimite scomet.ro către serverul local, pe portul lui."""
+
+    def __init__(self, port: int):
+        self._port = port
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        return [{"hostname": host, "host": "127.0.0.1", "port": self._port,
+                 "family": socket.AF_INET, "proto": 0, "flags": 0}]
+
+    async def close(self):
+        pass
+
+
+class BenchEntry:
+    """Intrarea de configurare minimă de care are nevoie coordinatorul."""
+
+    def __init__(self, hass: HomeAssistant, number: int, options: dict | None = None):
+        self.hass = hass
+        self.entry_id = f"bench{number}"
+        self.data = {"username": "bench", "password": "bench"}
+        self.options = {**EVERY_CYCLE, **(options or {})}
+
+    def async_on_unload(self, func):
+        pass
+
+    def async_create_background_task(self, hass, target, name, eager_start=True):
+        return hass.async_create_background_task(target, name)
+
+
+class ParseTimer:
+    """
+    Măsoară timpul CPU de parsare: `parse_bytes` (în bucla de evenimente sau în executor)
+    și parsarea incrementală (`StreamingIndexer.feed`). Folosim timpul CPU al firului curent,
+    ca parsarea din executor să nu includă și munca buclei care rulează în paralel.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._parse_bytes = utils_http.parse_bytes
+        timer = self
+
+        class TimedIndexer(utils_http.StreamingIndexer):
+            def feed(self, data):
+                start = time.thread_time()
+                try:
+                    return super().feed(data)
+                finally:
+                    timer.seconds += time.thread_time() - start
+
+        self.indexer = TimedIndexer
+
+    def __call__(self, *args, **kwargs):
+        start = time.thread_time()
+        try:
+            return self._parse_bytes(*args, **kwargs)
+        finally:
+            self.seconds += time.thread_time() - start
+
+
+async def run_scenario(
+    hass, portal, client_bytes, hub, name: str, cycles: int, parse_timer: ParseTimer, stream: str, trace: bool
+) -> dict:
+    portal.mutate = name in ("changed", "overlap", "relayout")
+    portal.relayout = name == "relayout"
+    coordinator = None
+    samples = []
+
+    async def one_cycle():
+        nonlocal coordinator
+        if coordinator is None or name == "cold":
+            if coordinator is not None:
+                # Ca la descărcarea intrării: lucrul din fundal se oprește înaintea sesiunii HTTP
+                await coordinator.async_shutdown()
+                await coordinator.api.async_close()
+            coordinator = ScometCoordinator(hass, BenchEntry(hass, len(samples)), hub)
+            if stream != "auto":
+                coordinator.api._stream = stream == "on"
+            if trace:
+                coordinator.api.trace.start()
+        portal.reset_counters()
+        client_bytes.count = 0
+        parse_timer.seconds = 0.0
+        searches = coordinator.api.locators.searches
+        start = time.perf_counter()
+        if name == "overlap":
+            results = await asyncio.gather(
+                coordinator._async_update_data(),
+                coordinator._async_update_data(),
+                *(coordinator.api.async_get_payment_url(max_age=0) for _ in range(3)),
+            )
+            coordinator.data = results[0]
+        else:
+            coordinator.data = await coordinator._async_update_data()
+        return {
+            "locator_searches": coordinator.api.locators.searches - searches,
+            "missing_fields": sum(value is None for value in coordinator.data.values()),
+            "wall_ms": (time.perf_counter() - start) * 1000,
+            "requests": portal.requests,
+            "connections": portal.connections,
+            "bytes": client_bytes.count,
+            "parse_cpu_ms": parse_timer.seconds * 1000,
+        }
+
+    # Ciclu de încălzire: login și prima parsare pentru scenariile cu coordinator refolosit
+    await one_cycle()
+    for _ in range(cycles):
+        samples.append(await one_cycle())
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await one_cycle()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    walls = sorted(sample["wall_ms"] for sample in samples)
+    return {
+        "scenario": name,
+        "stream": stream,
+        "trace": trace,
+        "cycles": cycles,
+        "wall_ms_median": round(statistics.median(walls), 3),
+        "wall_ms_p95": round(walls[min(len(walls) - 1, int(len(walls) * 0.95))], 3),
+        "requests_per_cycle": statistics.mean(sample["requests"] for sample in samples),
+        "connections_per_cycle": statistics.mean(sample["connections"] for sample in samples),
+        "bytes_per_cycle": statistics.mean(sample["bytes"] for sample in samples),
+        "parse_cpu_ms_per_cycle": round(statistics.mean(sample["parse_cpu_ms"] for sample in samples), 3),
+        "locator_searches_per_cycle": statistics.mean(sample["locator_searches"] for sample in samples),
+        "missing_fields": max(sample["missing_fields"] for sample in samples),
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+def write_self_signed(directory: pathlib.Path) -> tuple[pathlib.Path, pathlib.Path]:
+    """Scrie în `directory` un certificat auto-semnat pentru scomet.ro și cheia lui; întoarce căile."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, HOST)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(HOST)]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "standin.crt", directory / "standin.key"
+    cert_path.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+    return cert_path, key_path
+
+
+async def start_portal(portal: StandInPortal) -> web.AppRunner:
+    """
+    Pornește serverul local (HTTPS, certificat auto-semnat) și trimite către el
+    pool-ul de conexiuni al hub-ului; sesiunile conturilor rămân cele reale.
+    """
+    app = web.Application()
+    app.router.add_route("*", "/index.php", portal.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    server_ssl = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    # Nicio cheie privată în depozit: certificatul este generat la fiecare rulare și șters după încărcare
+    with tempfile.TemporaryDirectory() as cert_dir:
+        server_ssl.load_cert_chain(*write_self_signed(pathlib.Path(cert_dir)))
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_ssl)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    hub_module.create_connector = lambda: aiohttp.TCPConnector(
+        resolver=StandInResolver(port), ssl=False, keepalive_timeout=HTTP_KEEPALIVE
+    )
+    return runner
+
+
+async def main(args) -> list[dict]:
+    portal = StandInPortal()
+    client_bytes = ClientBytes()
+    runner = await start_portal(portal)
+    parse_timer = ParseTimer()
+    utils_http.parse_bytes = parse_timer
+    utils_http.StreamingIndexer = parse_timer.indexer
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hub = ScometHub(hass)
+        # Fără ritmul maxim de cereri al hub-ului: am măsura așteptarea, nu lanțul de actualizare
+        hub.limiter = HostLimiter(HUB_MAX_CONNECTIONS)
+        # Executorul de parsare, ca la async_setup_entry
+        await hub.async_setup(DEFAULT_PARSE_MODE)
+        results = []
+        for name in args.scenarios:
+            results.append(
+                await run_scenario(
+                    hass, portal, client_bytes, hub, name, args.cycles, parse_timer, args.stream, args.trace
+                )
+            )
+        await hub.async_shutdown()
+
+    await runner.cleanup()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", default=["cold", "changed", "unchanged"])
+    parser.add_argument(
+        "--stream", choices=["auto", "on", "off"], default="auto",
+        help="parsarea incrementală cu oprire timpurie (implicit: doar fără selectolax)",
+    )
+    parser.add_argument("--trace", action="store_true", help="urmărirea cererilor pornită (eșantionare 100%%)")
+    parser.add_argument("--output", type=pathlib.Path, help="fișierul JSON cu rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    report = json.dumps({"python": sys.version.split()[0], "results": results}, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
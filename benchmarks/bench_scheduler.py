@@ -0,0 +1,134 @@
+"""
+Reluarea unui an de cicluri de facturare cu un ceas simulat.
+
+Compară numărul de cereri și întârzierea cu care sunt observate modificările
+între intervalul fix `DEFAULT_UPDATE`, `BillingScheduler` (toate paginile la
+fiecare ciclu) și `RefreshTiers` cu intervalele implicite (fiecare pagină
+după nivelul ei). Întârzierea unei facturi noi este măsurată până la prima
+citire a paginii de facturi, iar cea a unei plăți până la prima citire a
+paginii de situație.
+
+Rulare, din rădăcina depozitului:
+    python benchmarks/bench_scheduler.py [--seed 1] [--year 2025]
+"""
+
+import argparse
+import bisect
+import pathlib
+import random
+import statistics
+import sys
+from datetime import datetime, timedelta
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from custom_components.scomet.const import DEFAULT_UPDATE, URL_FACTURI, URL_SITUATIE  # noqa: E402
+from custom_components.scomet.scheduler import BillingScheduler, RefreshTiers  # noqa: E402
+
+# Fiecare pagină (situatie, facturi, consumuri) costă o cerere pe ciclu
+REQUESTS_PER_CYCLE = 3
+
+
+class SimulatedPortal:
+    """
+    Portalul Scomet pentru un an: o factură pe lună, emisă în jurul zilei 25,
+    scadentă după 30 de zile și plătită la o dată aleatoare înainte de scadență.
+    """
+
+    def __init__(self, year: int, rng: random.Random):
+        self.events: list[tuple[datetime, dict]] = []
+        previous = {"nrpersoane": 3, "sold": 0.0, "total": None, "datafactura": None,
+                    "datascadenta": None, "consumaparece": None}
+        for month in range(1, 13):
+            issued = datetime(year, month, 25 + rng.randint(-2, 2), rng.randint(8, 17), rng.randint(0, 59))
+            due = issued + timedelta(days=30)
+            total = round(rng.uniform(250, 900), 2)
+            invoice = dict(previous, total=total, sold=total, datafactura=issued.strftime("%Y-%m-%d"),
+                           datascadenta=due.strftime("%Y-%m-%d"), consumaparece=round(rng.uniform(2, 9), 3))
+            paid = issued + timedelta(days=rng.randint(3, 29), hours=rng.randint(0, 12))
+            self.events.append((issued, invoice))
+            self.events.append((paid, dict(invoice, sold=0.0)))
+            previous = self.events[-1][1]
+        self.events.sort(key=lambda event: event[0])
+        self._times = [moment for moment, _ in self.events]
+        self._initial = {"nrpersoane": 3, "sold": 0.0, "total": 312.4, "datafactura": f"{year - 1}-12-24",
+                         "datascadenta": f"{year}-01-23", "consumaparece": 4.2}
+
+    def data_at(self, moment: datetime) -> dict:
+        position = bisect.bisect_right(self._times, moment)
+        return self.events[position - 1][1] if position else self._initial
+
+
+def replay(portal: SimulatedPortal, start: datetime, end: datetime, next_interval) -> tuple[int, list[float]]:
+    """Rulează un an de actualizări și întoarce numărul de cicluri și întârzierile de detecție (ore)."""
+    polls = []
+    moment, last = start, None
+    while moment < end:
+        data = portal.data_at(moment)
+        polls.append(moment)
+        changed = data != last
+        last = data
+        moment += next_interval(moment, data, changed)
+
+    delays = []
+    for event_time, _ in portal.events:
+        position = bisect.bisect_left(polls, event_time)
+        if position < len(polls):
+            delays.append((polls[position] - event_time).total_seconds() / 3600)
+    return len(polls), delays
+
+
+def replay_tiers(portal: SimulatedPortal, start: datetime, end: datetime, tiers: RefreshTiers) -> tuple[int, list[float]]:
+    """Ca `replay`, dar fiecare ciclu citește doar paginile scadente; întoarce cererile și întârzierile (ore)."""
+    polls = {url: [] for url in RefreshTiers.PAGES}
+    moment, last_invoice = start, None
+    while moment < end:
+        data = portal.data_at(moment)
+        for url in tiers.due(moment):
+            polls[url].append(moment)
+            if url == URL_FACTURI:
+                tiers.billing.observe(data, data["datafactura"] != last_invoice)
+                last_invoice = data["datafactura"]
+            tiers.mark(url, moment)
+        moment += tiers.next_interval(moment)
+
+    delays, previous = [], None
+    for event_time, data in portal.events:
+        # O factură nouă apare pe pagina de facturi, o plată pe pagina de situație
+        page = URL_FACTURI if previous is None or data["datafactura"] != previous["datafactura"] else URL_SITUATIE
+        previous = data
+        position = bisect.bisect_left(polls[page], event_time)
+        if position < len(polls[page]):
+            delays.append((polls[page][position] - event_time).total_seconds() / 3600)
+    return sum(len(moments) for moments in polls.values()), delays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    portal = SimulatedPortal(args.year, random.Random(args.seed))
+    start, end = datetime(args.year, 1, 1), datetime(args.year + 1, 1, 1)
+
+    fixed = timedelta(seconds=DEFAULT_UPDATE)
+    scheduler = BillingScheduler(base_interval=fixed)
+
+    def adaptive(moment, data, changed):
+        scheduler.observe(data, changed)
+        return scheduler.next_interval(moment)
+
+    print(f"{'planificare':<14}{'cereri':>10}{'întârziere medie (h)':>24}{'întârziere max (h)':>22}")
+    for name, next_interval in (("fix", lambda *_: fixed), ("adaptiv", adaptive)):
+        cycles, delays = replay(portal, start, end, next_interval)
+        print(f"{name:<14}{cycles * REQUESTS_PER_CYCLE:>10}"
+              f"{statistics.mean(delays):>24.2f}{max(delays):>22.2f}")
+
+    requests, delays = replay_tiers(portal, start, end, RefreshTiers())
+    print(f"{'per pagină':<14}{requests:>10}{statistics.mean(delays):>24.2f}{max(delays):>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Micro-benchmark pentru costul scrierii stărilor senzorilor la fiecare actualizare.
+
+Pentru fiecare implementare, creează `--entries` conturi, fiecare cu propriul
+coordinator și cei șase senzori adăugați printr-o platformă de entități reală.
+Apoi măsoară cât durează notificarea tuturor coordinatoarelor după o
+actualizare în care se schimbă un singur câmp (cazul obișnuit: soldul).
+
+Implementări:
+  current   senzorii din `custom_components/scomet/sensor.py`, cu `ScometCoordinator`
+            (care notifică doar senzorii al căror câmp s-a schimbat)
+  baseline  clasele de senzori dintr-o versiune anterioară, citite cu `git show`
+            (implicit prima versiune din depozit; vezi `--baseline`), cu un
+            `DataUpdateCoordinator` simplu, care notifică toți senzorii
+
+Cu `--debug`, logger-ul integrării este pus pe DEBUG, cu un handler care
+formatează mesajele, ca să fie inclus și costul logării la fiecare citire.
+
+Rulare, din rădăcina depozitului, într-un mediu cu Home Assistant instalat:
+    python benchmarks/bench_sensors.py [--entries 20] [--refreshes 200] [--debug]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import io
+import json
+import logging
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import device_registry as dr, entity_registry as er  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator  # noqa: E402
+
+from custom_components.scomet import sensor  # noqa: E402
+from custom_components.scomet.const import DOMAIN  # noqa: E402
+from custom_components.scomet.coordinator import ScometCoordinator  # noqa: E402
+from custom_components.scomet.hub import ScometHub  # noqa: E402
+
+from bench_refresh import BenchEntry  # noqa: E402
+
+_LOGGER = logging.getLogger(__name__)
+
+SENSOR_PATH = "custom_components/scomet/sensor.py"
+BASELINE_CLASSES = (
+    "NrPersoaneSensor", "TotalSensor", "SoldSensor",
+    "DataFacturaSensor", "DataScadentaSensor", "CosnumApaSensor",
+)
+DATA = {
+    "nrpersoane": 3,
+    "sold": 125.4,
+    "total": 125.4,
+    "datafactura": "2025-01-15",
+    "datascadenta": "2025-02-14",
+    "consumaparece": 7.0,
+}
+
+
+def load_baseline(revision: str):
+    """Modulul `sensor.py` din `revision`, importat în pachetul integrării (pentru importurile relative)."""
+    if revision is None:
+        revision = subprocess.check_output(
+            ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=ROOT, text=True
+        ).split()[0]
+    source = subprocess.check_output(["git", "show", f"{revision}:{SENSOR_PATH}"], cwd=ROOT, text=True)
+    spec = importlib.util.spec_from_loader("custom_components.scomet._sensor_baseline", loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "custom_components.scomet"
+    exec(compile(source, f"{revision}:{SENSOR_PATH}", "exec"), module.__dict__)
+    return module
+
+
+def build(hass: HomeAssistant, hub: ScometHub, implementation: str, number: int, baseline):
+    """Coordinatorul și senzorii unui cont."""
+    if implementation == "current":
+        coordinator = ScometCoordinator(hass, BenchEntry(hass, number), hub)
+        entities = [sensor.ScometSensor(coordinator, description) for description in sensor.SENSORS]
+    else:
+        coordinator = DataUpdateCoordinator(
+            hass, _LOGGER, config_entry=BenchEntry(hass, number), name=f"bench{number}", update_interval=None
+        )
+        entities = [getattr(baseline, name)(coordinator, f"bench{number}") for name in BASELINE_CLASSES]
+    coordinator.data = dict(DATA)
+    return coordinator, entities
+
+
+async def run(hass: HomeAssistant, implementation: str, args, baseline) -> dict:
+    hub = ScometHub(hass)
+    coordinators = []
+    writes = 0
+
+    for number in range(args.entries):
+        entry_id = f"{implementation}{number}"
+        coordinator, entities = build(hass, hub, implementation, number, baseline)
+
+        # O platformă per cont: ID-urile unice ale versiunii vechi nu depind de cont
+        platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain="sensor",
+            platform_name=f"{DOMAIN}_{entry_id}",
+            platform=None,
+            scan_interval=timedelta(days=1),
+            entity_namespace=None,
+        )
+        await platform.async_add_entities(entities)
+
+        for entity in entities:
+            write = entity.async_write_ha_state
+
+            def counted(write=write):
+                nonlocal writes
+                writes += 1
+                write()
+
+            entity.async_write_ha_state = counted
+        coordinators.append(coordinator)
+
+    changes = 0
+
+    def count_change(_event):
+        nonlocal changes
+        changes += 1
+
+    def refresh(number: int) -> float:
+        """O actualizare a tuturor conturilor, în care se schimbă doar soldul; întoarce durata (µs)."""
+        start = time.perf_counter()
+        for coordinator in coordinators:
+            data = dict(coordinator.data)
+            data["sold"] = round(DATA["sold"] + number, 2)
+            coordinator.async_set_updated_data(data)
+        return (time.perf_counter() - start) * 1_000_000
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, count_change)
+    # Prima notificare trezește toți senzorii; nu o numărăm
+    refresh(0)
+    await hass.async_block_till_done()
+    writes = changes = 0
+
+    timings = []
+    for number in range(1, args.refreshes + 1):
+        timings.append(refresh(number))
+        await hass.async_block_till_done()
+
+    unsub()
+    await hub.async_shutdown()
+    timings.sort()
+    return {
+        "implementation": implementation,
+        "entries": args.entries,
+        "refreshes": args.refreshes,
+        "us_per_refresh_median": round(statistics.median(timings), 1),
+        "us_per_refresh_p95": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+        "us_per_entry": round(statistics.mean(timings) / args.entries, 2),
+        "writes_per_refresh": writes / args.refreshes,
+        "state_changes_per_refresh": changes / args.refreshes,
+    }
+
+
+async def main(args) -> list[dict]:
+    if args.debug:
+        handler = logging.StreamHandler(io.StringIO())
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        integration_logger = logging.getLogger("custom_components.scomet")
+        integration_logger.addHandler(handler)
+        integration_logger.setLevel(logging.DEBUG)
+
+    baseline = load_baseline(args.baseline) if "baseline" in args.implementations else None
+
+    results = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await er.async_load(hass)
+        await dr.async_load(hass)
+        for implementation in args.implementations:
+            results.append(await run(hass, implementation, args, baseline))
+        await hass.async_stop(force=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--refreshes", type=int, default=200)
+    parser.add_argument("--implementations", nargs="+", default=["baseline", "current"])
+    parser.add_argument("--baseline", help="revizia git a versiunii de referință (implicit prima)")
+    parser.add_argument("--debug", action="store_true", help="logger-ul integrării pe DEBUG")
+    parser.add_argument("--output", type=pathlib.Path, help="fișierul JSON cu rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    report = json.dumps({"python": sys.version.split()[0], "debug": args.debug, "results": results}, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,96 @@
+"""
+Integrarea Scomet: Administrăm confortul.
+"""
+
+import logging
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_HUB, PLATFORMS, CONF_PARSE_MODE, CONF_UPDATE_INTERVAL, DEFAULT_PARSE_MODE
+from .coordinator import ScometCoordinator
+from .entity import async_migrate_device
+from .hub import ScometHub
+from .services import async_setup_services, async_unload_services
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """
+    Migrează intrările create de versiunile anterioare.
+    Versiunea 1 salva în opțiuni `update_interval` (implicit 10), dar nu îl folosea: intervalul real
+    era cel din datele intrării sau `DEFAULT_UPDATE`. Acum opțiunea se aplică, așa că o scoatem,
+    ca intrările vechi să păstreze intervalul de până acum în loc să citească la fiecare minut.
+    """
+    if entry.version > 2:
+        # Intrare creată de o versiune mai nouă a integrării
+        return False
+
+    if entry.version == 1:
+        options = {key: value for key, value in entry.options.items() if key != CONF_UPDATE_INTERVAL}
+        hass.config_entries.async_update_entry(entry, options=options, version=2)
+        _LOGGER.debug("Intrarea %s migrată la versiunea 2", entry.entry_id)
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """
+    Configurează o intrare Scomet.
+    Dacă avem date salvate, senzorii pornesc imediat cu ele, iar actualizarea din rețea
+    este programată în fundal de hub-ul comun, eșalonat față de celelalte conturi.
+    """
+    hub = hass.data.get(DATA_HUB)
+    if hub is None:
+        hub = hass.data[DATA_HUB] = ScometHub(hass)
+    # Executorul de parsare al contului este creat (și pornit) în afara buclei de evenimente
+    await hub.async_setup(entry.options.get(CONF_PARSE_MODE, DEFAULT_PARSE_MODE))
+
+    coordinator = ScometCoordinator(hass, entry, hub)
+
+    try:
+        restored = await coordinator.async_restore()
+        if not restored:
+            # Prima pornire: nu avem ce afișa, așa că așteptăm prima actualizare
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        # Intrarea nu pornește (va fi reîncercată); sesiunea HTTP creată pentru ea nu mai este folosită
+        await coordinator.api.async_close()
+        raise
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "coordinator": coordinator,
+        "api": coordinator.api,
+    }
+
+    async_setup_services(hass)
+    async_migrate_device(hass, entry)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    hub.async_register(coordinator, refresh_now=restored)
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
+    return True
+
+
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Opțiunile noi se aplică direct coordinatorului care rulează, fără reîncărcarea intrării."""
+    await hass.data[DATA_HUB].async_setup(entry.options.get(CONF_PARSE_MODE, DEFAULT_PARSE_MODE))
+    hass.data[DOMAIN][entry.entry_id]["coordinator"].async_apply_options()
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Descarcă o intrare Scomet, salvează starea pentru următoarea pornire și închide sesiunea HTTP."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hub = hass.data[DATA_HUB]
+        hub.async_unregister(entry.entry_id)
+
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)["coordinator"]
+        # Oprește lucrul din fundal al coordinatorului înainte de închiderea sesiunii HTTP
+        await coordinator.async_shutdown()
+        await coordinator.async_persist()
+        await coordinator.api.async_close()
+
+        if not hub.entry_ids:
+            await hub.async_shutdown()
+            hass.data.pop(DATA_HUB)
+            async_unload_services(hass)
+    return unload_ok
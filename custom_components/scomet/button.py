@@ -1,13 +1,8 @@
 from homeassistant.components.button import ButtonEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 import logging
-import webbrowser
-from .const import DOMAIN, URL_PLATA, HEADERS_POST
-import json
-import asyncio
-
-# Convert headers to a JavaScript object
-headers_js = json.dumps(HEADERS_POST)
+from .const import DOMAIN
+from .entity import device_info
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,43 +43,19 @@ class ScometRedirectButton(CoordinatorEntity, ButtonEntity):
     @property
     def device_info(self):
         """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": "service",
-        }
-
-##    async def async_press(self):
-##        """Execută acțiunea la apăsarea butonului."""
-##        try:
-##            # Retrieve the payment URL from the API
-##            payment_url = await self._api.async_get_payment_url()
-##            
-##            if not payment_url:
-##                _LOGGER.error("Nu s-a putut obține URL-ul de plată.")
-##                return
-##
-##            _LOGGER.info("Redirecționare către URL: %s", payment_url)
-##
-##            # Open the payment URL in a new tab (this will only work on the frontend)
-##            webbrowser.open(payment_url)
-##
-##        except Exception as e:
-##            _LOGGER.error("Eroare la redirecționare: %s", e)
+        return device_info(self._entry_id)
 
     async def async_press(self):
         """Execută acțiunea la apăsarea butonului."""
         try:
-            # Retrieve the payment URL from the API
+            # Retrieve the payment URL from the API (din cache dacă a fost verificat recent)
             payment_url = await self._api.async_get_payment_url()
-            
+
             if not payment_url:
                 _LOGGER.error("Nu s-a putut obține URL-ul de plată.")
                 return
 
-            _LOGGER.info("Redirecționare către URL: %s", payment_url)
+            _LOGGER.debug("Redirecționare către URL: %s", payment_url)
 
             # Retrieve the deskis cookie from the API
             deskis_cookie = self._api.deskis_cookie
@@ -94,15 +65,9 @@ class ScometRedirectButton(CoordinatorEntity, ButtonEntity):
                 return
             # Extract only the actual cookie value
             deskis_cookie = deskis_cookie.value  # Correct way to get the value
-            _LOGGER.info(f"Using cleaned deskis cookie: {deskis_cookie}")
 
             # If browser_mod is available, open the URL in a new window
-            await asyncio.sleep(1)
-            services = self.hass.services.async_services()
-            _LOGGER.info(f"Available services: {services}")
-            if "browser_mod" in self.hass.services.async_services():
-                _LOGGER.info("browser_mod is available")
-
+            if self.hass.services.has_service("browser_mod", "javascript"):
                 # Prepare JavaScript code with headers and cookies
                 javascript_code = f"""
                     // Set the deskis cookie
@@ -134,7 +99,6 @@ class ScometRedirectButton(CoordinatorEntity, ButtonEntity):
                     // Open the payment page in a new window after request
                     window.open('https://scomet.ro/index.php?meniu=apartament&submeniu=plateste', '_blank');
                 """
-                _LOGGER.error(f"javascript_code is: {javascript_code}")
                 # Execute JavaScript via browser_mod
                 await self.hass.services.async_call(
                     "browser_mod",
@@ -142,7 +106,7 @@ class ScometRedirectButton(CoordinatorEntity, ButtonEntity):
                     {"code": javascript_code}
                 )
             else:
-                _LOGGER.error("browser_mod is not available, using fallback method")
+                _LOGGER.warning("browser_mod nu este instalat; pagina de plată nu poate fi deschisă.")
         except Exception as e:
             _LOGGER.error("Eroare la redirecționare: %s", e)
 
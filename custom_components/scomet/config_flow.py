@@ -1,12 +1,17 @@
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
-from .const import DOMAIN
+from .const import (
+    DOMAIN, CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY, CONF_PARSE_MODE, DEFAULT_PARSE_MODE, PARSE_MODES,
+    CONF_UPDATE_INTERVAL, CONF_INVOICES_INTERVAL, CONF_CONSUMPTION_INTERVAL, DEFAULT_UPDATE,
+    DEFAULT_INVOICES_INTERVAL, DEFAULT_CONSUMPTION_INTERVAL, TIER_MIN_INTERVAL,
+)
 
 class ScometConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Scomet."""
 
-    VERSION = 1
+    # 2: opțiunea update_interval se aplică (secunde); cea din versiunea 1 este scoasă (vezi async_migrate_entry)
+    VERSION = 2
 
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
@@ -23,27 +28,46 @@ class ScometConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
         )
 
+    @staticmethod
     @callback
-    def async_get_options_flow(self, config_entry):
+    def async_get_options_flow(config_entry):
         """Get the options flow for this handler."""
-        return ScometOptionsFlow(config_entry)
+        return ScometOptionsFlow()
 
 
 class ScometOptionsFlow(config_entries.OptionsFlow):
-    """Handle Scomet options."""
-
-    def __init__(self, config_entry):
-        """Initialize options flow."""
-        self.config_entry = config_entry
+    """Handle Scomet options. `self.config_entry` este furnizat de Home Assistant."""
 
     async def async_step_init(self, user_input=None):
-        """Manage the options."""
+        """Manage the options. Intervalele (secunde) se aplică imediat, fără reîncărcarea intrării."""
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        options = self.config_entry.options
+        interval = vol.All(vol.Coerce(int), vol.Range(min=TIER_MIN_INTERVAL))
         options_schema = vol.Schema(
             {
-                vol.Optional("update_interval", default=10): vol.Coerce(int),
+                vol.Optional(
+                    CONF_UPDATE_INTERVAL,
+                    default=options.get(
+                        CONF_UPDATE_INTERVAL, self.config_entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE)
+                    ),
+                ): interval,
+                vol.Optional(
+                    CONF_INVOICES_INTERVAL, default=options.get(CONF_INVOICES_INTERVAL, DEFAULT_INVOICES_INTERVAL)
+                ): interval,
+                vol.Optional(
+                    CONF_CONSUMPTION_INTERVAL,
+                    default=options.get(CONF_CONSUMPTION_INTERVAL, DEFAULT_CONSUMPTION_INTERVAL),
+                ): interval,
+                vol.Optional(
+                    CONF_MAX_CONCURRENCY,
+                    default=options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Optional(
+                    CONF_PARSE_MODE,
+                    default=options.get(CONF_PARSE_MODE, DEFAULT_PARSE_MODE),
+                ): vol.In(PARSE_MODES),
             }
         )
 
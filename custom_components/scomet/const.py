@@ -10,6 +10,95 @@ DEFAULT_NAME = "Scomet: Administrăm confortul"
 DEFAULT_USER = "username"
 DEFAULT_PASS = "password"
 DEFAULT_UPDATE = 300  # Interval de actualizare în secunde
+DEFAULT_MAX_CONCURRENCY = 3  # Cereri simultane maxime către același host
+DEFAULT_PAGE_TIMEOUT = 30  # Timp maxim (secunde) pentru descărcarea unei pagini
+PAGE_ENCODING = "utf-8"  # Codificarea paginilor scomet.ro, dacă serverul nu o declară
+STREAM_CHUNK_SIZE = 4096  # Octeți citiți odată la parsarea incrementală (streaming.StreamingIndexer)
+STREAM_DRAIN_LIMIT = 256 * 1024  # Octeți citiți și aruncați după oprirea parsării, ca conexiunea să rămână în pool
+HTTP_CONNECT_TIMEOUT = 10  # Secunde pentru stabilirea unei conexiuni noi (TCP + TLS)
+HTTP_READ_TIMEOUT = 20  # Secunde maxime de așteptare între două bucăți ale unui răspuns
+HTTP_KEEPALIVE = 60  # Secunde cât o conexiune inactivă către scomet.ro rămâne deschisă pentru refolosire
+HTTP_DNS_TTL = 30 * 60  # Secunde cât refolosim adresa rezolvată pentru scomet.ro
+SESSION_REFRESH_MARGIN = 0.9  # Reînnoim la 90% din durata de viață observată a sesiunii
+PAYMENT_URL_TTL = 10 * 60  # Secunde; cât timp refolosim pagina de plată verificată, în aceeași sesiune
+PAYMENT_PREWARM_DAYS = 3  # Cu câte zile înainte de scadență pregătim din timp pagina de plată
+
+# Planificator comun pentru toate conturile (hub.ScometHub)
+DATA_HUB = f"{DOMAIN}_hub"  # Cheia din hass.data
+HUB_MAX_CONNECTIONS = 8  # Conexiuni simultane maxime către scomet.ro, pentru toate conturile
+HUB_RATE = 4.0  # Cereri pe secundă maxime către scomet.ro, pentru toate conturile
+HUB_STAGGER = 60  # Secunde; fereastra în care sunt eșalonate primele actualizări
+HUB_JITTER = 0.1  # ±10% aplicat fiecărui interval de actualizare
+
+# Reîncercări și circuit breaker (resilience)
+RETRY_ATTEMPTS = 3  # Încercări pentru o cerere care eșuează cu o eroare temporară
+RETRY_BASE_DELAY = 1.0  # Secunde; pauza maximă înainte de prima reîncercare (se dublează apoi)
+RETRY_MAX_DELAY = 15.0  # Secunde; plafonul pauzei dintre reîncercări
+CIRCUIT_THRESHOLD = 3  # Cicluri eșuate consecutiv după care actualizările contului sunt suspendate
+CIRCUIT_COOLDOWN = 10 * 60  # Secunde; prima pauză (se dublează la fiecare redeschidere)
+CIRCUIT_MAX_COOLDOWN = 6 * 3600  # Secunde; pauza maximă și pauza după o eroare permanentă
+
+# Urmărirea cererilor la cerere (trace.RequestTrace, serviciul scomet.trace)
+TRACE_BUFFER_SIZE = 200  # Înregistrări păstrate per cont; cele mai vechi sunt eliminate
+TRACE_DEFAULT_DURATION = 10 * 60  # Secunde; urmărirea se oprește singură după această durată
+TRACE_MAX_DURATION = 3600  # Secunde; durata maximă acceptată de serviciu
+HISTORY_DEFAULT_COUNT = 12  # Facturi întoarse implicit de scomet.history (un an)
+
+# Locatorii câștigători (extract.LocatorCache): câte structuri de pagină reținem per cont
+LOCATOR_CACHE_LAYOUTS = 8
+
+# Persistare între reporniri (homeassistant.helpers.storage)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # Secunde; scrierile apropiate sunt grupate într-una singură
+
+# Planificator adaptiv
+SCHEDULER_DENSE_WINDOW = 3  # Zile în jurul datei estimate de emitere / datei scadente
+SCHEDULER_SPARSE_INTERVAL = 6 * 3600  # Interval (secunde) la mijlocul ciclului de facturare
+SCHEDULER_MAX_INTERVAL = 12 * 3600  # Interval maxim (secunde) după mai multe cicluri fără modificări
+SCHEDULER_BACKOFF_AFTER = 3  # Cicluri consecutive fără modificări după care intervalul se dublează
+
+# Niveluri de actualizare per pagină (scheduler.RefreshTiers); un ciclu citește doar paginile scadente
+DEFAULT_INVOICES_INTERVAL = 24 * 3600  # Secunde între citirile paginii de facturi, în afara emiterii/scadenței
+DEFAULT_CONSUMPTION_INTERVAL = 7 * 24 * 3600  # Secunde între citirile consumului, în afara citirii contoarelor
+TIER_INVOICES_DENSE = 3600  # Secunde între citirile facturilor în jurul emiterii și al scadenței
+TIER_METER_INTERVAL = 6 * 3600  # Secunde între citirile consumului în fereastra de citire a contoarelor
+METER_READING_START_DAY = 25  # Fereastra de citire a contoarelor începe în această zi a lunii...
+METER_READING_END_DAY = 5  # ...și se încheie în această zi a lunii următoare (inclusiv)
+TIER_MIN_INTERVAL = 60  # Secunde; pauza minimă între două cicluri
+
+# Instrumentare (metrics.ScometMetrics)
+METRICS_WINDOW = 100  # Ultimele măsurători păstrate pentru fiecare etapă, din care calculăm percentilele
+
+# Options
+CONF_UPDATE_INTERVAL = "update_interval"  # Secunde între citirile paginii de situație (soldul)
+CONF_INVOICES_INTERVAL = "invoices_interval"
+CONF_CONSUMPTION_INTERVAL = "consumption_interval"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_PARSE_MODE = "parse_mode"
+
+# Unde rulează parsarea paginilor (parsers.parse_bytes)
+PARSE_MODE_THREAD = "thread"  # Într-un fir de execuție dedicat, comun tuturor conturilor (implicit)
+PARSE_MODE_PROCESS = "process"  # Într-un pool de procese comun, pentru multe conturi
+PARSE_MODE_LOOP = "loop"  # Direct în bucla de evenimente (pentru comparație)
+PARSE_MODES = [PARSE_MODE_THREAD, PARSE_MODE_PROCESS, PARSE_MODE_LOOP]
+DEFAULT_PARSE_MODE = PARSE_MODE_THREAD
+# Firele de parsare (hub.ScometHub.parse_executor). Parsarea ține GIL-ul: mai multe fire nu parsează
+# mai repede, dar bucla ar concura pentru GIL cu fiecare dintre ele
+PARSE_THREAD_WORKERS = 1
+PARSE_PROCESS_WORKERS = 2  # Procesele pool-ului comun
+
+# Servicii (services.py)
+SERVICE_TRACE = "trace"
+SERVICE_REFRESH = "refresh"
+SERVICE_HISTORY = "history"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_DURATION = "duration"
+ATTR_SAMPLE_RATE = "sample_rate"
+ATTR_CLEAR = "clear"
+ATTR_PAGES = "pages"
+ATTR_FIELDS = "fields"
+ATTR_COUNT = "count"
+REFRESH_DEBOUNCE = 2.0  # Secunde; cererile de recitire sosite în acest interval sunt comasate într-un ciclu
 
 # POST request
 HEADERS_POST = {
@@ -18,6 +107,12 @@ HEADERS_POST = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
 }
 
+# GET request (aceleași Accept și User-Agent, fără corp)
+HEADERS_GET = {
+    "Accept": HEADERS_POST["Accept"],
+    "User-Agent": HEADERS_POST["User-Agent"],
+}
+
 # Authentication payload
 PAYLOAD_LOGIN = {
     "username": DEFAULT_USER,
@@ -0,0 +1,125 @@
+"""
+Istoricul consumului de apă rece, importat ca statistici externe pe termen lung.
+
+Tabelul „Apa rece General” are câte un rând pe lună (luna, index, consum).
+Primul import aduce tot istoricul; următoarele adaugă doar lunile noi (și
+rescriu ultima lună doar dacă valoarea ei s-a schimbat), așa că graficele din
+panoul Energie/Apă se construiesc din statistici agregate, fără rânduri de
+stare la fiecare actualizare.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import VolumeConverter
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # Home Assistant mai vechi de 2025.4: doar has_mean
+    StatisticMeanType = None
+
+from .const import DOMAIN
+from .extract import PageIndex, ro_date, ro_float
+
+_LOGGER = logging.getLogger(__name__)
+
+TABLE_APA_RECE = "Apa rece General"
+COLUMN_PERIOD = 0
+COLUMN_CONSUM = 2
+
+
+def consumption_rows(index: PageIndex) -> list[tuple[date, float]]:
+    """Consumul lunar din tabelul „Apa rece General”, ordonat crescător după lună."""
+    rows = {}
+    for cells in index.tables.get(TABLE_APA_RECE, []):
+        if len(cells) <= COLUMN_CONSUM:
+            continue
+        try:
+            rows[ro_date(cells[COLUMN_PERIOD]).replace(day=1)] = ro_float(cells[COLUMN_CONSUM])
+        except ValueError as err:
+            _LOGGER.debug("Rând de consum ignorat: %s", err)
+    return sorted(rows.items())
+
+
+class ConsumptionStatistics:
+    """Importă consumul lunar de apă rece al unui cont în recorder."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._hass = hass
+        self.statistic_id = f"{DOMAIN}:consum_apa_rece_{entry_id.lower()}"
+        self._metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name="Consum Apă Rece",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement="m³",
+        )
+        if StatisticMeanType is not None:
+            # Cerute de versiunile noi ale recorder-ului; has_mean rămâne pentru cele vechi
+            self._metadata["mean_type"] = StatisticMeanType.NONE
+            self._metadata["unit_class"] = VolumeConverter.UNIT_CLASS
+        # Importurile pornesc în fundal la fiecare modificare; două importuri suprapuse ar citi
+        # aceeași sumă anterioară și ar scrie sume cumulate greșite, așa că le serializăm
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._last_start: datetime | None = None
+        self._last_state = 0.0
+        self._last_sum = 0.0
+
+    async def _async_load_last(self) -> None:
+        """Citește ultima statistică importată (o singură dată pe durata intrării)."""
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics, self._hass, 1, self.statistic_id, True, {"state", "sum"}
+        )
+        if last.get(self.statistic_id):
+            stat = last[self.statistic_id][0]
+            start = stat["start"]
+            self._last_start = dt_util.utc_from_timestamp(start) if isinstance(start, (int, float)) else start
+            self._last_state = stat.get("state") or 0.0
+            self._last_sum = stat.get("sum") or 0.0
+        self._loaded = True
+
+    async def async_import(self, rows: list[tuple[date, float]]) -> int:
+        """Importă lunile noi din `rows` și întoarce câte statistici au fost scrise."""
+        if "recorder" not in self._hass.config.components or not rows:
+            return 0
+        async with self._lock:
+            return await self._async_import(rows)
+
+    async def _async_import(self, rows: list[tuple[date, float]]) -> int:
+        if not self._loaded:
+            await self._async_load_last()
+
+        total = self._last_sum
+        statistics = []
+        for month, value in rows:
+            start = dt_util.start_of_local_day(month)
+            if self._last_start is not None:
+                if start < self._last_start:
+                    continue
+                if start == self._last_start:
+                    if value == self._last_state:
+                        continue
+                    # Luna curentă s-a actualizat: o rescriem pornind de la suma dinaintea ei
+                    total = self._last_sum - self._last_state
+            total += value
+            statistics.append(StatisticData(start=start, state=value, sum=total))
+
+        if not statistics:
+            return 0
+
+        async_add_external_statistics(self._hass, self._metadata, statistics)
+        self._last_start = statistics[-1]["start"]
+        self._last_state = statistics[-1]["state"]
+        self._last_sum = statistics[-1]["sum"]
+        _LOGGER.debug("%s luni de consum importate în %s.", len(statistics), self.statistic_id)
+        return len(statistics)
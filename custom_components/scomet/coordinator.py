@@ -2,17 +2,52 @@
 Coordinator pentru integrarea Scomet: Administrăm confortul.
 """
 
+import asyncio
 import logging
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 from datetime import timedelta
 
+from .consumption import ConsumptionStatistics, consumption_rows
+from .exceptions import ScometLayoutError, ScometTransientError
+from .extract import FIELDS, ScometData, ro_date
+from .history import InvoiceHistory, invoice_rows
+from .metrics import COUNTER_CIRCUIT_TRIPS, COUNTER_REFRESH_FAILURES, COUNTER_REFRESHES, TIMING_REFRESH, page_name
+from .resilience import STATE_OPEN, CircuitBreaker
+from .scheduler import RefreshTiers
 from .utils_http import ScometAPI
-from .const import DEFAULT_UPDATE
+from .const import (
+    DOMAIN, DEFAULT_UPDATE, DEFAULT_MAX_CONCURRENCY, CONF_MAX_CONCURRENCY,
+    CONF_PARSE_MODE, DEFAULT_PARSE_MODE,
+    CONF_UPDATE_INTERVAL, CONF_INVOICES_INTERVAL, CONF_CONSUMPTION_INTERVAL,
+    DEFAULT_INVOICES_INTERVAL, DEFAULT_CONSUMPTION_INTERVAL,
+    STORAGE_VERSION, STORAGE_SAVE_DELAY, URL_FACTURI, URL_CONSUM_APA, PAYMENT_PREWARM_DAYS, REFRESH_DEBOUNCE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-class ScometCoordinator(DataUpdateCoordinator):
+# Pagina pe care se află fiecare câmp
+FIELD_PAGES = {spec.key: spec.url for spec in FIELDS}
+
+def tier_intervals(config_entry) -> dict[str, timedelta]:
+    """Intervalele nivelurilor de actualizare din opțiunile intrării (vezi `scheduler.RefreshTiers`)."""
+    options = config_entry.options
+    return {
+        # Versiunile vechi citeau intervalul din datele intrării; îl respectăm dacă nu există opțiunea
+        "update_interval": timedelta(
+            seconds=options.get(CONF_UPDATE_INTERVAL, config_entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE))
+        ),
+        "invoices_interval": timedelta(seconds=options.get(CONF_INVOICES_INTERVAL, DEFAULT_INVOICES_INTERVAL)),
+        "consumption_interval": timedelta(
+            seconds=options.get(CONF_CONSUMPTION_INTERVAL, DEFAULT_CONSUMPTION_INTERVAL)
+        ),
+    }
+
+
+class ScometCoordinator(DataUpdateCoordinator[ScometData]):
     """
     Coordinator care adună toate datele necesare într-un singur loc.
     `self.data` va fi un dicționar cu chei relevante pentru fiecare tip de informație:
@@ -22,31 +57,72 @@ class ScometCoordinator(DataUpdateCoordinator):
         "sold": ...,
         "datafactura": ...,
         "datascadenta": ...,
-        "consumapa": ...,
-        "payment_url": ...
+        "consumaparece": ...
       }
+    (vezi `extract.ScometData`).
+    URL-ul de plată nu face parte din date: este cerut doar la apăsarea butonului.
+    Fiecare ciclu citește doar paginile scadente (vezi `scheduler.RefreshTiers`);
+    câmpurile celorlalte pagini își păstrează valorile din ciclurile anterioare.
     """
 
-    def __init__(self, hass: HomeAssistant, config_entry):
+    def __init__(self, hass: HomeAssistant, config_entry, hub):
         self.hass = hass
         self.config_entry = config_entry
+        self._hub = hub
 
+        parse_mode = config_entry.options.get(CONF_PARSE_MODE, DEFAULT_PARSE_MODE)
         self.api = ScometAPI(
             hass,
             username=config_entry.data["username"],
             password=config_entry.data["password"],
+            max_concurrency=config_entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            shared_limiter=hub.limiter,
+            http_session=hub.async_create_session(),
+            parse_mode=parse_mode,
+            parse_executor=hub.parse_executor(parse_mode),
 #            cod_incasare=config_entry.data["cod_incasare"],
 #            cod_nlc=config_entry.data["cod_nlc"],
         )
 
-        update_interval_seconds = config_entry.data.get("update_interval", DEFAULT_UPDATE)
-        update_interval = timedelta(seconds=update_interval_seconds)
+        # Momentul următoarei citiri a fiecărei pagini, după nivelul ei de actualizare
+        self.tiers = RefreshTiers(**tier_intervals(config_entry))
+        # Intervalul până la următoarea actualizare; timerul este al hub-ului comun (hub.ScometHub)
+        self.refresh_interval = self.tiers.base_interval
+        # Recitirile cerute explicit (serviciul scomet.refresh, update_entity), comasate într-un singur ciclu
+        self._requested_pages: set[str] = set()  # Paginile cerute în fereastra curentă
+        self._requested: asyncio.Future | None = None  # Rezultatul ciclului comun, așteptat de toți apelanții
+        self._unsub_requested = None
+        self._forced_pages: set[str] = set()  # Paginile citite la următorul ciclu, indiferent de scadență
+        # Pregătirea paginii de plată: o singură dată per sesiune deskis (vezi _async_prewarm_payment)
+        self._prewarm_task: asyncio.Task | None = None
+        self._prewarmed_generation: int | None = None
+
+        # Cookie-ul deskis și ultimele date, păstrate între repornirile Home Assistant
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}")
+        self.data_timestamp = None  # Momentul (UTC) în care datele curente au fost confirmate de server
+
+        # Suspendă actualizările contului după eșecuri repetate (vezi resilience.CircuitBreaker)
+        self.breaker = CircuitBreaker()
+        # Când doar unele pagini eșuează, fiecare are propriul circuit; celelalte continuă normal
+        self.page_breakers = {url: CircuitBreaker(name=f"paginii {page_name(url)}") for url in RefreshTiers.PAGES}
+
+        # Toate facturile văzute vreodată, nu doar prima din pagină
+        self.history = InvoiceHistory(hass, config_entry.entry_id)
+        # Consumul lunar de apă, importat în statisticile pe termen lung
+        self.consumption = ConsumptionStatistics(hass, config_entry.entry_id)
+
+        # Datele și disponibilitatea de la ultima notificare a ascultătorilor (vezi async_update_listeners)
+        self._notified_data: ScometData | None = None
+        self._notified_success: bool | None = None
 
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=config_entry,
             name="ScometCoordinator",
-            update_interval=update_interval,
+            update_interval=None,
+            # Ascultătorii sunt notificați doar dacă datele diferă de ciclul anterior
+            always_update=False,
         )
 
     async def _async_update_data(self):
@@ -54,39 +130,279 @@ class ScometCoordinator(DataUpdateCoordinator):
         Metodă apelată periodic de Coordinator (sau la cerere).
         Întoarce un dict cu toate datele, astfel încât senzorii să le poată folosi.
         """
-        try:
-
-            _LOGGER.debug("Încep actualizarea datelor din API...")
-
-            # Ensure the cookie is valid before making any API requests
-            await self.api._ensure_valid_cookie()
-
-            nrpersoane_data = await self.api.async_get_nrpersoane()
-            _LOGGER.debug("Nr. persoane extras: %s", nrpersoane_data)
-            total_data = await self.api.async_get_total()
-            sold_data = await self.api.async_get_sold()
-            datafactura_data = await self.api.async_get_datafactura()
-            datascadenta_data = await self.api.async_get_datascadenta()
-            consumaparece_data = await self.api.async_get_consumaparece()
-            payment_url = await self.api.async_get_payment_url()
-
-            # Putem separa "factura_restanta" de "facturi" dacă dorim
-            # facturile restante pot fi filtrate din facturi_data
-            # DAR pentru a păstra EXACT structura existentă din senzori,
-            # punem tot obiectul complet la "facturi", și încă unul la "factura_restanta".
-            data = {
-                "nrpersoane": nrpersoane_data,
-                "total": total_data,
-                "sold": sold_data,
-                "datafactura": datafactura_data,
-                "datascadenta": datascadenta_data,
-                "consumaparece": consumaparece_data,
-                "payment_url": payment_url,
-            }
-            _LOGGER.debug("Datele actualizate: %s", data)
+        metrics = self.api.metrics
+        if not self.breaker.allow():
+            # Circuit deschis: nicio cerere către scomet.ro până la sfârșitul pauzei
+            self.refresh_interval = timedelta(seconds=self.breaker.remaining)
+            metrics.async_notify()
+            raise UpdateFailed(
+                f"Actualizări suspendate încă {self.breaker.remaining:.0f} s după eșecuri repetate: "
+                f"{self.breaker.last_error}"
+            )
 
-            return data
+        metrics.increment(COUNTER_REFRESHES)
+        try:
+            with metrics.timed(TIMING_REFRESH):
+                data = await self._async_fetch_data()
         except Exception as err:
             # Orice excepție apare, o marcăm drept UpdateFailed
-            _LOGGER.error("Eroare în _async_update_data: %s", err)
-            raise UpdateFailed(f"Eroare la actualizarea datelor: {err}")
+            metrics.increment(COUNTER_REFRESH_FAILURES)
+            if self.breaker.record_failure(err):
+                metrics.increment(COUNTER_CIRCUIT_TRIPS)
+                # Următorul ciclu (de probă) abia după pauză; hub-ul adaugă și jitter-ul lui
+                self.refresh_interval = timedelta(seconds=self.breaker.remaining)
+            else:
+                # Până la deschiderea circuitului, reîncercăm la intervalul de bază, nu la cel rar;
+                # paginile eșuate rămân scadente și sunt citite la următorul ciclu
+                self.refresh_interval = min(self.refresh_interval, self.tiers.base_interval)
+            # Home Assistant raportează deja eșecul (o singură dată, până la prima reușită)
+            _LOGGER.debug("Eroare în _async_update_data: %s", err)
+            raise UpdateFailed(f"Eroare la actualizarea datelor: {err}") from err
+        else:
+            self.breaker.record_success()
+            return data
+        finally:
+            # Senzorii de diagnostic se actualizează după fiecare ciclu, chiar și fără date noi
+            metrics.async_notify()
+
+    async def _async_fetch_data(self) -> ScometData:
+        _LOGGER.debug("Încep actualizarea datelor din API...")
+
+        # Doar paginile scadente; la prima actualizare (fără date) toate sunt scadente
+        now = dt_util.now()
+        due = set(self.tiers.due(now)) if self.data is not None else set(self.tiers.PAGES)
+        due |= self._forced_pages
+        self._forced_pages = set()
+        pages = [url for url in self.tiers.PAGES if url in due]
+        if not pages:
+            self.refresh_interval = self.tiers.next_interval(now)
+            _LOGGER.debug("Nicio pagină scadentă; următoarea actualizare peste %s", self.refresh_interval)
+            return self.data
+
+        # Ensure the cookie is valid before making any API requests
+        await self.api._ensure_valid_cookie()
+
+        # Fiecare pagină este descărcată și parsată o singură dată pe ciclu,
+        # iar paginile independente sunt cerute în paralel, limitat per host.
+        # Istoricul are nevoie de toate facturile; din celelalte pagini citim doar cât ne trebuie
+        # (tabelul de consum este și el complet imediat ce câmpul consumaparece este rezolvat).
+        snapshot = self.api.snapshot(full_pages=(URL_FACTURI,))
+        fresh = await self.api.async_get_fields(snapshot, keys=[spec.key for spec in FIELDS if spec.url in pages])
+        if len(snapshot.errors) == len(pages):
+            # Toate paginile scadente au eșuat și după reîncercări: ciclul eșuează cu eroarea lor, ca starea
+            # reală (portal căzut, autentificare) să ajungă la circuitul contului, nu doar câmpuri None
+            raise next(iter(snapshot.errors.values()))
+        # O pagină eșuată nu strică celelalte: câmpurile ei își păstrează valorile anterioare
+        fetched = [url for url in pages if url not in snapshot.errors]
+        fresh = {key: value for key, value in fresh.items() if FIELD_PAGES[key] not in snapshot.errors}
+        if all(value is None for value in fresh.values()):
+            # Eroare permanentă (circuitul se deschide pentru pauza maximă) doar dacă paginile citite
+            # acoperă toate câmpurile și niciunul nu a fost găsit vreodată; altfel o pagină goală sau
+            # stricată o singură dată nu suspendă contul: ciclul eșuează, datele anterioare rămân
+            parsed = [key for key, url in FIELD_PAGES.items() if url in fetched]
+            if len(parsed) == len(FIELD_PAGES) and not any(self.api.locators.known(key) for key in parsed):
+                raise ScometLayoutError("Niciun câmp nu a mai putut fi găsit în pagini (s-a schimbat structura lor?)")
+            raise ScometTransientError(f"Niciun câmp găsit în paginile {[page_name(url) for url in fetched]}")
+        data = {**(self.data or {}), **fresh}
+        self._record_pages(fetched, snapshot.errors, now)
+
+        if URL_FACTURI in snapshot.changed:
+            self.history.async_ingest(invoice_rows(await snapshot.async_get(URL_FACTURI)))
+        if URL_CONSUM_APA in snapshot.changed:
+            rows = consumption_rows(await snapshot.async_get(URL_CONSUM_APA))
+            self.config_entry.async_create_background_task(
+                self.hass, self.consumption.async_import(rows), f"{DOMAIN}_statistics_{self.config_entry.entry_id}"
+            )
+
+        if self.data is not None and snapshot.unchanged:
+            # Nimic nou: întoarcem aceleași date, iar senzorii nu mai sunt rescriși
+            _LOGGER.debug("Nicio modificare față de ciclul anterior.")
+            self._schedule_next(fetched, snapshot.changed, now)
+            self._async_schedule_save()
+            self._async_prewarm_payment(self.data)
+            return self.data
+
+        _LOGGER.debug("Datele actualizate: %s", data)
+
+        self._schedule_next(fetched, snapshot.changed, now, data)
+        self._async_schedule_save()
+        self._async_prewarm_payment(data)
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """
+        Notifică doar ascultătorii al căror câmp s-a schimbat.
+        Contextul fiecărui ascultător este cheia câmpului urmărit (vezi `sensor.ScometSensor`);
+        ascultătorii fără context sunt notificați mereu. Dacă disponibilitatea
+        (`last_update_success`) s-a schimbat, sunt notificați toți.
+        """
+        data = self.data or {}
+        previous = self._notified_data
+        notify_all = previous is None or self.last_update_success != self._notified_success
+        self._notified_data = data
+        self._notified_success = self.last_update_success
+
+        for update_callback, context in list(self._listeners.values()):
+            if notify_all or context is None or data.get(context) != previous.get(context):
+                update_callback()
+
+    def _record_pages(self, fetched: list[str], errors: dict, now) -> None:
+        """
+        Actualizează circuitele paginilor: cele citite se închid, iar cele eșuate sunt reîncercate
+        la intervalul de bază sau, după eșecuri repetate, abia după pauza circuitului lor.
+        """
+        for url in fetched:
+            self.page_breakers[url].record_success()
+        for url, err in errors.items():
+            breaker = self.page_breakers[url]
+            if breaker.record_failure(err):
+                self.api.metrics.increment(COUNTER_CIRCUIT_TRIPS)
+            delay = timedelta(seconds=breaker.remaining) if breaker.state == STATE_OPEN else self.tiers.base_interval
+            self.tiers.defer(url, now, delay)
+            _LOGGER.debug("Pagina %s a eșuat (%s); reîncercăm peste %s", page_name(url), err, delay)
+
+    def _schedule_next(self, pages: list[str], changed: set[str], now, data: dict | None = None) -> None:
+        """Marchează paginile citite și ajustează intervalul până la cea mai apropiată pagină scadentă."""
+        if URL_FACTURI in pages:
+            # Ritmul facturilor urmează ciclul de facturare
+            self.tiers.billing.observe(data or self.data, URL_FACTURI in changed)
+        for url in pages:
+            self.tiers.mark(url, now)
+        self.refresh_interval = self.tiers.next_interval(now)
+        _LOGGER.debug("Următoarea actualizare peste %s", self.refresh_interval)
+
+    async def async_refresh_pages(self, urls=None) -> bool:
+        """
+        Recitește paginile `urls` (toate, implicit), indiferent de scadența lor.
+        Cererile sosite în `REFRESH_DEBOUNCE` secunde sunt comasate într-un singur ciclu, cu reuniunea
+        paginilor cerute, iar toți apelanții așteaptă același rezultat: True dacă ciclul a reușit.
+        """
+        self._requested_pages.update(urls or self.tiers.PAGES)
+        if self._requested is None:
+            self._requested = self.hass.loop.create_future()
+            self._unsub_requested = async_call_later(
+                self.hass, REFRESH_DEBOUNCE, HassJob(self._async_refresh_requested, cancel_on_shutdown=True)
+            )
+        # shield: un apelant anulat nu anulează ciclul comun
+        return await asyncio.shield(self._requested)
+
+    async def _async_refresh_requested(self, _now) -> None:
+        future, self._requested, self._unsub_requested = self._requested, None, None
+        self._forced_pages |= self._requested_pages
+        self._requested_pages = set()
+        _LOGGER.debug("Recitire cerută pentru %s", sorted(self._forced_pages))
+        try:
+            await self.async_refresh()
+        finally:
+            future.set_result(self.last_update_success)
+        # Paginile tocmai citite nu mai sunt scadente; următoarea actualizare se mută corespunzător
+        self._hub.async_reschedule(self.config_entry.entry_id)
+
+    async def async_shutdown(self) -> None:
+        """
+        Anulează recitirea cerută în așteptare (apelanții ei primesc False) și pregătirea
+        paginii de plată, înainte ca sesiunea HTTP să fie închisă.
+        """
+        if self._prewarm_task is not None and not self._prewarm_task.done():
+            self._prewarm_task.cancel()
+        self._prewarm_task = None
+        if self._unsub_requested is not None:
+            self._unsub_requested()
+            self._unsub_requested = None
+        if self._requested is not None:
+            self._requested.set_result(False)
+            self._requested = None
+        await super().async_shutdown()
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Aplică opțiunile schimbate, fără reîncărcarea intrării: intervalele, concurența și modul de parsare."""
+        self.tiers.configure(**tier_intervals(self.config_entry))
+        parse_mode = self.config_entry.options.get(CONF_PARSE_MODE, DEFAULT_PARSE_MODE)
+        self.api.configure(
+            max_concurrency=self.config_entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            parse_mode=parse_mode,
+            parse_executor=self._hub.parse_executor(parse_mode),
+        )
+        if self.data is not None:
+            self.refresh_interval = self.tiers.next_interval(dt_util.now())
+        self._hub.async_reschedule(self.config_entry.entry_id)
+        _LOGGER.debug("Opțiuni aplicate; următoarea actualizare peste %s", self.refresh_interval)
+
+    @callback
+    def _async_prewarm_payment(self, data: dict) -> None:
+        """
+        Aproape de scadență (sau după ea, cu sold de plată), verifică pagina de plată
+        în fundal, ca butonul „Plătește acum” să răspundă imediat din cache.
+        O singură verificare per sesiune deskis: cât timp sesiunea rămâne aceeași, pagina
+        nu este recerută la fiecare ciclu, oricât ar dura perioada de restanță.
+        """
+        generation = self.api.session.generation
+        if generation == self._prewarmed_generation or (
+            self._prewarm_task is not None and not self._prewarm_task.done()
+        ):
+            return
+        try:
+            due = ro_date(data.get("datascadenta") or "")
+        except ValueError:
+            return
+        days_left = (due - dt_util.now().date()).days
+        if days_left > PAYMENT_PREWARM_DAYS:
+            return
+        if days_left < 0 and not (data.get("sold") or 0) > 0:
+            # Scadența a trecut și nu mai e nimic de plată
+            return
+
+        self._prewarmed_generation = generation
+        self._prewarm_task = self.config_entry.async_create_background_task(
+            self.hass, self.api.async_get_payment_url(), f"{DOMAIN}_payment_{self.config_entry.entry_id}"
+        )
+
+    async def async_restore(self) -> bool:
+        """
+        Încarcă de pe disc cookie-ul deskis, locatorii câștigători și ultimele date salvate.
+        Întoarce True dacă senzorii pot porni imediat cu datele restaurate.
+        """
+        await self.history.async_load()
+
+        stored = await self._store.async_load()
+        if not stored:
+            return False
+
+        if stored.get("session"):
+            self.api.session.restore(**stored["session"])
+        if stored.get("locators"):
+            self.api.locators.restore(stored["locators"])
+
+        data = stored.get("data")
+        if not data:
+            return False
+
+        self.data = data
+        self.data_timestamp = dt_util.parse_datetime(stored["timestamp"]) if stored.get("timestamp") else None
+        self.tiers.billing.observe(data, changed=False)
+        # Fără citirile salvate, toate paginile sunt scadente la prima actualizare
+        self.tiers.restore(stored.get("tiers") or {})
+        self.refresh_interval = self.tiers.next_interval(dt_util.now())
+        _LOGGER.debug("Date restaurate de pe disc (salvate la %s).", self.data_timestamp)
+        return True
+
+    async def async_persist(self) -> None:
+        """Salvează imediat starea (de exemplu la descărcarea intrării)."""
+        await self._store.async_save(self._data_to_store())
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        self.data_timestamp = dt_util.utcnow()
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_store(self) -> dict:
+        return {
+            "session": self.api.session.export(),
+            "locators": self.api.locators.export(),
+            "tiers": self.tiers.export(),
+            "data": self.data,
+            "timestamp": self.data_timestamp.isoformat() if self.data_timestamp else None,
+        }
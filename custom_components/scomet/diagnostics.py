@@ -0,0 +1,55 @@
+"""
+Diagnosticele unei intrări Scomet (Setări → Dispozitive și servicii → Descarcă diagnosticele).
+Datele de autentificare și cookie-ul deskis nu apar niciodată în fișierul descărcat.
+"""
+
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .metrics import page_name
+
+TO_REDACT = {"username", "password", "deskis", "cookie"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Duratele, contoarele și starea curentă a intrării."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    api = coordinator.api
+    session = api.session
+
+    return async_redact_data(
+        {
+            "entry": {
+                "data": dict(entry.data),
+                "options": dict(entry.options),
+            },
+            "metrics": api.metrics.as_dict(),
+            "circuit": coordinator.breaker.as_dict(),
+            "page_circuits": {
+                page_name(url): breaker.as_dict() for url, breaker in coordinator.page_breakers.items()
+            },
+            "trace": api.trace.as_dict(),
+            "locators": api.locators.as_dict(),
+            "session": {
+                "valid": session.is_valid,
+                "age_s": round(session.age, 1) if session.age is not None else None,
+                "refresh_age_s": None if session.refresh_age is None else round(session.refresh_age, 1),
+                "observed_lifetime_s": session.lifetime,
+                "relogins": session.relogins,
+            },
+            "coordinator": {
+                "last_update_success": coordinator.last_update_success,
+                "data_timestamp": coordinator.data_timestamp.isoformat() if coordinator.data_timestamp else None,
+                "refresh_interval_s": coordinator.refresh_interval.total_seconds(),
+                "tiers": coordinator.tiers.as_dict(dt_util.now()),
+                "data": coordinator.data,
+            },
+            "invoice_history_rows": len(coordinator.history),
+        },
+        TO_REDACT,
+    )
@@ -0,0 +1,58 @@
+"""
+Entitatea de bază a integrării Scomet.
+"""
+
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, DEFAULT_NAME
+
+_LOGGER = logging.getLogger(__name__)
+
+# Identificatorul dispozitivului comun din versiunile vechi, înainte de un dispozitiv per cont
+LEGACY_DEVICE_ID = (DOMAIN, "scomet")
+
+
+def device_info(entry_id: str) -> DeviceInfo:
+    """Dispozitivul de tip serviciu al unui cont: fiecare intrare are dispozitivul ei."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry_id)},
+        name=DEFAULT_NAME,
+        manufacturer="George Neagu (geotibi)",
+        model=DEFAULT_NAME,
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+@callback
+def async_migrate_device(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """
+    Mută dispozitivul comun vechi pe intrarea care îl deține, ca zona și numele date de
+    utilizator să rămână. Un dispozitiv comun mai multor intrări este lăsat în pace.
+    """
+    registry = dr.async_get(hass)
+    device = registry.async_get_device(identifiers={LEGACY_DEVICE_ID})
+    if device is None or device.config_entries != {entry.entry_id}:
+        return
+    if registry.async_get_device(identifiers={(DOMAIN, entry.entry_id)}) is not None:
+        return
+    registry.async_update_device(device.id, new_identifiers={(DOMAIN, entry.entry_id)})
+    _LOGGER.debug("Dispozitivul Scomet a fost mutat pe intrarea %s.", entry.entry_id)
+
+
+class ScometEntity(CoordinatorEntity):
+    """
+    Entitate legată de coordinatorul unui cont Scomet.
+    Metadatele statice (dispozitiv, descriere) sunt atribute `_attr_*` setate o singură dată,
+    nu proprietăți recalculate la fiecare citire a stării.
+    """
+
+    def __init__(self, coordinator, context=None):
+        super().__init__(coordinator, context)
+        self._attr_device_info = device_info(coordinator.config_entry.entry_id)
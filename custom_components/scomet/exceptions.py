@@ -0,0 +1,32 @@
+"""Excepțiile integrării Scomet."""
+
+
+class ScometError(Exception):
+    """Eroare generică în comunicarea cu scomet.ro."""
+
+
+class ScometTransientError(ScometError):
+    """
+    Eroare temporară (timeout, conexiune întreruptă, HTTP 5xx sau 429): merită reîncercată.
+    `retry_after` este pauza cerută de server (antetul Retry-After), dacă există.
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ScometPermanentError(ScometError):
+    """Eroare care nu dispare la reîncercare (date de autentificare greșite, structura paginii s-a schimbat)."""
+
+
+class ScometAuthError(ScometPermanentError):
+    """Autentificarea a eșuat (date greșite sau cookie-ul deskis lipsește)."""
+
+
+class ScometLayoutError(ScometPermanentError):
+    """Paginile au fost descărcate, dar niciun câmp nu a mai putut fi găsit în ele."""
+
+
+class ScometSessionExpired(ScometError):
+    """Serverul a răspuns cu pagina de login: sesiunea deskis a expirat."""
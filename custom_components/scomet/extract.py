@@ -0,0 +1,392 @@
+"""
+Motor declarativ de extragere a câmpurilor din paginile Scomet.
+
+Fiecare câmp este descris de un `FieldSpec` (pagină, locator, transformare).
+Pentru fiecare pagină se construiește un singur `PageIndex`, într-o singură
+trecere prin DOM, iar câmpurile sunt apoi rezolvate direct din index.
+Un senzor nou înseamnă doar o intrare nouă în `FIELDS`.
+
+Pe lângă locatorul principal, un câmp poate avea locatori de rezervă, încercați
+în ordine când portalul își schimbă textele sau structura. `LocatorCache` reține,
+pentru fiecare structură de pagină (`PageIndex.layout`), locatorul exact care a
+găsit câmpul: cât timp structura rămâne aceeași, câmpul este citit direct, iar
+lanțul complet este parcurs din nou doar când structura se schimbă.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import unicodedata
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+from typing import Any, Callable, TypedDict
+
+from bs4 import BeautifulSoup
+
+from .const import LOCATOR_CACHE_LAYOUTS, URL_SITUATIE, URL_FACTURI, URL_CONSUM_APA
+from .htmlindex import LOCATOR_IBOX, LOCATOR_LABEL, LOCATOR_TABLE, index_selectolax, index_soup
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FieldNotFound(Exception):
+    """Câmpul nu a fost găsit în pagină (structura paginii s-a schimbat?)."""
+
+
+def ro_float(value: str) -> float:
+    """Convertește un număr în format românesc ("1.234,56") în float."""
+    value = value.replace("\xa0", "").replace(" ", "")
+    if "," in value:
+        value = value.replace(".", "").replace(",", ".")
+    return float(value)
+
+
+def ro_int(value: str) -> int:
+    """Convertește un număr în format românesc în int."""
+    return int(ro_float(value))
+
+
+def ro_date(value: str) -> date:
+    """Convertește o dată din portal ("2025-01-31", "31.01.2025", "31/01/2025" sau "01.2025") în `date`."""
+    value = value.strip()
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%m.%Y", "%m/%Y"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Dată nerecunoscută: {value!r}")
+
+
+def text(value: str) -> str:
+    """Întoarce textul curățat, fără transformări."""
+    return value.strip()
+
+
+@dataclass(frozen=True)
+class Locator:
+    """Descrie unde se află valoarea unui câmp în indexul paginii."""
+
+    kind: str
+    name: str
+    row: int = 0
+    column: int = 0
+
+
+    def as_list(self) -> list:
+        return [self.kind, self.name, self.row, self.column]
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    Specificația unui câmp: cheia din coordinator, pagina, locatorul și transformarea.
+    `fallbacks` sunt locatorii încercați, în ordine, dacă cel principal nu mai găsește câmpul.
+    Ei se potrivesc doar exact sau după normalizare, niciodată parțial: un titlu scurt ar
+    prinde altă secțiune, iar câștigătorul greșit ar rămâne apoi în `LocatorCache`.
+    """
+
+    key: str
+    url: str
+    locator: Locator
+    transform: Callable[[str], Any] = text
+    fallbacks: tuple[Locator, ...] = ()
+
+    @property
+    def locators(self) -> tuple[Locator, ...]:
+        """Lanțul complet de locatori: cel principal, apoi cei de rezervă."""
+        return (self.locator, *self.fallbacks)
+
+    def accepts(self, locator: Locator) -> bool:
+        """Dacă `locator` (un câștigător reținut) poate fi găsit de lanțul de locatori al câmpului."""
+        name = _normalize(locator.name)
+        for position, candidate in enumerate(self.locators):
+            if (candidate.kind, candidate.row, candidate.column) != (locator.kind, locator.row, locator.column):
+                continue
+            wanted = _normalize(candidate.name)
+            if name == wanted or (position == 0 and candidate.kind != LOCATOR_LABEL and wanted in name):
+                return True
+        return False
+
+
+FIELDS: tuple[FieldSpec, ...] = (
+    FieldSpec(
+        "nrpersoane", URL_SITUATIE, Locator(LOCATOR_IBOX, "Numar curent  persoane"), ro_int,
+        fallbacks=(Locator(LOCATOR_IBOX, "Numar persoane"),),
+    ),
+    FieldSpec(
+        "sold", URL_SITUATIE, Locator(LOCATOR_IBOX, "Sold profilul curent"), ro_float,
+        fallbacks=(Locator(LOCATOR_IBOX, "Sold curent"),),
+    ),
+    FieldSpec(
+        "total", URL_FACTURI, Locator(LOCATOR_LABEL, "Valoare"), ro_float,
+        fallbacks=(Locator(LOCATOR_LABEL, "Valoare factura"),),
+    ),
+    FieldSpec(
+        "datafactura", URL_FACTURI, Locator(LOCATOR_LABEL, "Data"), text,
+        fallbacks=(Locator(LOCATOR_LABEL, "Data factura"), Locator(LOCATOR_LABEL, "Data emitere")),
+    ),
+    FieldSpec(
+        "datascadenta", URL_FACTURI, Locator(LOCATOR_LABEL, "Data scadenta"), text,
+        fallbacks=(Locator(LOCATOR_LABEL, "Scadenta"),),
+    ),
+    FieldSpec(
+        "consumaparece", URL_CONSUM_APA, Locator(LOCATOR_TABLE, "Apa rece General", column=2), ro_float,
+        # Tabelul redenumit, apoi o coloană în plus sau în minus: consumul rămâne pe ultima coloană
+        fallbacks=(Locator(LOCATOR_TABLE, "Apa rece", column=2), Locator(LOCATOR_TABLE, "Apa rece", column=-1)),
+    ),
+)
+
+
+class ScometData(TypedDict, total=False):
+    """Datele unui ciclu de actualizare (`coordinator.data`): câte o cheie pentru fiecare câmp din `FIELDS`."""
+
+    nrpersoane: int | None
+    sold: float | None
+    total: float | None
+    datafactura: str | None
+    datascadenta: str | None
+    consumaparece: float | None
+
+
+def fields_for(keys=None) -> tuple[FieldSpec, ...]:
+    """Întoarce specificațiile pentru cheile cerute (toate dacă `keys` este None)."""
+    if keys is None:
+        return FIELDS
+    return tuple(spec for spec in FIELDS if spec.key in keys)
+
+
+def page_urls(keys=None) -> list[str]:
+    """Paginile pe care se află câmpurile `keys` (toate, implicit), în ordinea din `FIELDS`."""
+    return list(dict.fromkeys(spec.url for spec in fields_for(keys)))
+
+
+def page_kinds(url: str) -> frozenset[str]:
+    """Tipurile de locatori folosite de câmpurile paginii `url`."""
+    return frozenset(locator.kind for spec in FIELDS if spec.url == url for locator in spec.locators)
+
+
+def _normalize(title: str) -> str:
+    """Titlul fără diacritice, fără majuscule și cu spațiile comasate, pentru potrivirea tolerantă."""
+    decomposed = unicodedata.normalize("NFKD", title)
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).casefold().split())
+
+
+@dataclass
+class PageIndex:
+    """
+    Indexul unei pagini, construit o singură dată:
+      - iboxes: titlul h5 al cardului -> textul din h1.no-margins
+      - labels: valoarea data-label -> textele celulelor, în ordinea din pagină
+      - tables: titlul h5 -> rândurile (liste de texte) ale primului tabel de după el
+    """
+
+    iboxes: dict[str, str] = field(default_factory=dict)
+    labels: dict[str, list[str]] = field(default_factory=dict)
+    tables: dict[str, list[list[str]]] = field(default_factory=dict)
+    _layout: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def layout(self) -> str:
+        """
+        Amprenta structurii paginii: titlurile cardurilor, etichetele și titlurile tabelelor
+        (cu numărul de coloane), fără valori. Rămâne aceeași de la o zi la alta cât timp
+        portalul nu își schimbă marcajul; calculată o singură dată per index.
+        """
+        if self._layout is None:
+            digest = hashlib.blake2b(digest_size=8)
+            for part in (
+                *(f"i:{title}" for title in self.iboxes),
+                *(f"l:{label}" for label in self.labels),
+                *(f"t:{title}:{max(map(len, rows), default=0)}" for title, rows in self.tables.items()),
+            ):
+                digest.update(part.encode() + b"\0")
+            self._layout = digest.hexdigest()
+        return self._layout
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> PageIndex:
+        """Construiește indexul într-o singură trecere prin document (vezi `htmlindex.index_soup`)."""
+        return cls(*index_soup(soup))
+
+    @classmethod
+    def from_selectolax(cls, tree) -> PageIndex:
+        """Construiește indexul dintr-un arbore selectolax (lexbor), cu aceleași reguli ca `from_soup`."""
+        return cls(*index_selectolax(tree))
+
+    def lookup(self, locator: Locator) -> str:
+        """Întoarce textul brut indicat de `locator`."""
+        if locator.kind == LOCATOR_IBOX:
+            return self.iboxes[self._match_title(self.iboxes, locator.name)]
+
+        if locator.kind == LOCATOR_LABEL:
+            try:
+                cells = self.labels[self._match_title(self.labels, locator.name, partial=False)]
+            except FieldNotFound:
+                cells = None
+            if not cells or len(cells) <= locator.row:
+                raise FieldNotFound(f"Could not find data-label='{locator.name}'.")
+            return cells[locator.row]
+
+        if locator.kind == LOCATOR_TABLE:
+            table = self.tables[self._match_title(self.tables, locator.name)]
+            rows = [row for row in table if len(row) > locator.column]
+            if len(rows) <= locator.row:
+                raise FieldNotFound(f"No valid data row found in the '{locator.name}' table.")
+            return rows[locator.row][locator.column]
+
+        raise ValueError(f"Locator necunoscut: {locator.kind}")
+
+    def resolve(self, locator: Locator, strict: bool = False) -> Locator:
+        """
+        Locatorul cu titlul exact din această pagină, pe care `lookup` îl găsește direct, fără căutare.
+        Cu `strict`, titlul trebuie să fie identic sau identic după normalizare (fără potrivire parțială).
+        """
+        entries = {LOCATOR_IBOX: self.iboxes, LOCATOR_LABEL: self.labels, LOCATOR_TABLE: self.tables}.get(locator.kind)
+        if entries is None or locator.name in entries:
+            return locator
+        partial = not strict and locator.kind != LOCATOR_LABEL
+        return replace(locator, name=self._match_title(entries, locator.name, partial=partial))
+
+    @staticmethod
+    def _match_title(entries: dict, title: str, partial: bool = True) -> str:
+        """
+        Titlul din `entries` corespunzător lui `title`: titlul exact; altfel (dacă `partial`) un titlu
+        care îl conține; altfel aceeași potrivire, ignorând diacriticele, majusculele și spațiile multiple.
+        """
+        if title in entries:
+            return title
+        if partial:
+            for key in entries:
+                if title in key:
+                    return key
+        wanted = _normalize(title)
+        for key in entries:
+            normalized = _normalize(key)
+            if normalized == wanted or (partial and wanted in normalized):
+                return key
+        raise FieldNotFound(f"Could not find the section for '{title}'.")
+
+
+class LocatorCache:
+    """
+    Locatorii câștigători ai unui cont: structura paginii (`PageIndex.layout`) -> cheia câmpului ->
+    locatorul exact (vezi `PageIndex.resolve`) care a găsit ultima dată câmpul. Sunt reținute doar
+    ultimele `max_layouts` structuri; starea este salvată între reporniri (`export` / `restore`).
+    """
+
+    def __init__(self, max_layouts: int = LOCATOR_CACHE_LAYOUTS):
+        self._max_layouts = max(1, max_layouts)
+        self._layouts: dict[str, dict[str, Locator]] = {}  # În ordinea folosirii; prima este cea mai veche
+        self._latest: dict[str, Locator] = {}  # Ultimul locator câștigător al fiecărui câmp, indiferent de structură
+        self.hits = 0  # Câmpuri citite direct cu locatorul reținut
+        self.searches = 0  # Câmpuri pentru care a fost parcurs lanțul de locatori
+
+    def get(self, layout: str, key: str) -> Locator | None:
+        winners = self._layouts.get(layout)
+        if winners is None:
+            return None
+        # Structura folosită acum devine cea mai recentă
+        self._layouts[layout] = self._layouts.pop(layout)
+        return winners.get(key)
+
+    def put(self, layout: str, key: str, locator: Locator) -> None:
+        winners = self._layouts.pop(layout, {})
+        winners[key] = locator
+        self._layouts[layout] = winners
+        self._latest[key] = locator
+        while len(self._layouts) > self._max_layouts:
+            del self._layouts[next(iter(self._layouts))]
+
+    def known(self, key: str) -> bool:
+        """Dacă există un locator câștigător pentru câmpul `key` (a fost găsit măcar o dată)."""
+        return key in self._latest
+
+    def target(self, spec: FieldSpec) -> Locator:
+        """
+        Locatorul după care citirea incrementală a paginii se poate opri (vezi `streaming.StreamingIndexer`):
+        ultimul câștigător al câmpului sau, dacă nu există încă, locatorul principal.
+        """
+        return self._latest.get(spec.key, spec.locator)
+
+    def export(self) -> dict:
+        """Starea, serializabilă în JSON, pentru persistare între reporniri."""
+        return {
+            layout: {key: locator.as_list() for key, locator in winners.items()}
+            for layout, winners in self._layouts.items()
+        }
+
+    def restore(self, stored: dict) -> None:
+        # Câștigătorii pe care lanțul actual nu i-ar mai alege (de exemplu găsiți parțial de un
+        # locator de rezervă vechi) sunt ignorați; câmpul este căutat din nou
+        specs = {spec.key: spec for spec in FIELDS}
+        for layout, winners in stored.items():
+            for key, locator in winners.items():
+                try:
+                    locator = Locator(*locator)
+                except TypeError:
+                    _LOGGER.debug("Locator salvat invalid pentru %s: %r", key, locator)
+                    continue
+                if key in specs and specs[key].accepts(locator):
+                    self.put(layout, key, locator)
+                else:
+                    _LOGGER.debug("Locator salvat ignorat pentru %s: %s", key, locator)
+
+    def as_dict(self) -> dict:
+        """Statistici și câștigătorii curenți, pentru diagnostice."""
+        return {
+            "layouts": len(self._layouts),
+            "hits": self.hits,
+            "searches": self.searches,
+            "winners": {key: locator.as_list() for key, locator in self._latest.items()},
+        }
+
+
+def _resolve(spec: FieldSpec, index: PageIndex, cache: LocatorCache | None) -> Any:
+    """Valoarea câmpului `spec`: direct cu locatorul reținut pentru structura paginii, altfel prin lanțul de locatori."""
+    if cache is not None:
+        winner = cache.get(index.layout, spec.key)
+        if winner is not None:
+            try:
+                value = spec.transform(index.lookup(winner))
+            except (FieldNotFound, ValueError):
+                pass  # Valoarea nu mai poate fi convertită; parcurgem lanțul
+            else:
+                cache.hits += 1
+                return value
+        cache.searches += 1
+
+    error = None
+    for position, locator in enumerate(spec.locators):
+        try:
+            # Locatorii de rezervă nu se potrivesc parțial (vezi `FieldSpec`)
+            exact = index.resolve(locator, strict=position > 0)
+            value = spec.transform(index.lookup(exact))
+        except (FieldNotFound, ValueError) as err:
+            error = error or err
+            continue
+        if position:
+            _LOGGER.warning(
+                "Câmpul %s a fost găsit cu locatorul de rezervă %s (s-a schimbat structura paginii?).",
+                spec.key, exact,
+            )
+        if cache is not None:
+            cache.put(index.layout, spec.key, exact)
+        return value
+    raise error
+
+
+def extract(specs, index: PageIndex, locators: LocatorCache | None = None) -> dict[str, Any]:
+    """
+    Rezolvă câmpurile `specs` din indexul unei pagini.
+    Un câmp care lipsește sau nu poate fi convertit devine None, fără să le afecteze pe celelalte.
+    Cu `locators`, câmpurile sunt citite direct cu locatorii câștigători reținuți pentru structura paginii.
+    """
+    values = {}
+    for spec in specs:
+        try:
+            values[spec.key] = _resolve(spec, index, locators)
+        except (FieldNotFound, ValueError) as err:
+            _LOGGER.error("Eroare la extragerea câmpului %s: %s", spec.key, err)
+            values[spec.key] = None
+    return values
@@ -0,0 +1,139 @@
+"""
+Istoricul local al facturilor Scomet.
+
+Pagina de facturi listează toate facturile, dar senzorii folosesc doar primul
+rând. Aici păstrăm toate rândurile (data, data scadentă, valoarea) în tablouri
+tipizate, sortate după data facturii, și le salvăm cu `Store`. La fiecare ciclu
+se adaugă doar facturile noi; interogările nu mai ating rețeaua.
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_VERSION, STORAGE_SAVE_DELAY
+from .extract import PageIndex, ro_date, ro_float
+
+_LOGGER = logging.getLogger(__name__)
+
+# Coloanele tabelului de facturi (atributul data-label al celulelor)
+LABEL_DATE = "Data"
+LABEL_DUE = "Data scadenta"
+LABEL_VALUE = "Valoare"
+
+
+def invoice_rows(index: PageIndex) -> list[tuple[date, date | None, float]]:
+    """Toate facturile din indexul paginii de facturi, ca (data, data scadentă, valoare)."""
+    dates = index.labels.get(LABEL_DATE, [])
+    dues = index.labels.get(LABEL_DUE, [])
+    values = index.labels.get(LABEL_VALUE, [])
+
+    rows = []
+    for position, (issued, value) in enumerate(zip(dates, values)):
+        try:
+            due = ro_date(dues[position]) if position < len(dues) else None
+            rows.append((ro_date(issued), due, ro_float(value)))
+        except ValueError as err:
+            _LOGGER.debug("Rând de factură ignorat: %s", err)
+    return rows
+
+
+class InvoiceHistory:
+    """
+    Facturile unui cont, indexate după data facturii.
+    Datele sunt păstrate ca ordinale (`date.toordinal()`), 0 însemnând „lipsă”.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.facturi")
+        self._dates = array("l")
+        self._dues = array("l")
+        self._values = array("d")
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    async def async_load(self) -> None:
+        """Încarcă istoricul salvat."""
+        stored = await self._store.async_load()
+        if stored:
+            self._dates = array("l", stored["date"])
+            self._dues = array("l", stored["due"])
+            self._values = array("d", stored["value"])
+
+    @callback
+    def async_ingest(self, rows) -> int:
+        """
+        Adaugă facturile nevăzute încă și întoarce câte au fost adăugate.
+        O factură este deja văzută dacă are aceeași dată, aceeași dată scadentă și aceeași valoare:
+        în aceeași zi pot fi emise mai multe facturi (de exemplu o factură și stornarea ei).
+        """
+        added = 0
+        for issued, due, value in rows:
+            ordinal = issued.toordinal()
+            due_ordinal = due.toordinal() if due else 0
+            start, position = bisect_left(self._dates, ordinal), bisect_right(self._dates, ordinal)
+            if any(
+                self._dues[seen] == due_ordinal and self._values[seen] == value for seen in range(start, position)
+            ):
+                continue
+            self._dates.insert(position, ordinal)
+            self._dues.insert(position, due_ordinal)
+            self._values.insert(position, value)
+            added += 1
+
+        if added:
+            _LOGGER.debug("%s facturi noi adăugate în istoric (total %s).", added, len(self._dates))
+            self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        return added
+
+    @callback
+    def _data_to_store(self) -> dict:
+        return {"date": self._dates.tolist(), "due": self._dues.tolist(), "value": self._values.tolist()}
+
+    def _row(self, position: int) -> dict:
+        due = self._dues[position]
+        return {
+            "datafactura": date.fromordinal(self._dates[position]).isoformat(),
+            "datascadenta": date.fromordinal(due).isoformat() if due else None,
+            "total": self._values[position],
+        }
+
+    def last(self, count: int) -> list[dict]:
+        """Ultimele `count` facturi, cea mai nouă prima."""
+        end = len(self._dates)
+        return [self._row(position) for position in range(end - 1, max(end - count, 0) - 1, -1)]
+
+    def yearly_totals(self) -> dict[int, float]:
+        """Totalul facturat pe fiecare an."""
+        totals: dict[int, float] = defaultdict(float)
+        for ordinal, value in zip(self._dates, self._values):
+            totals[date.fromordinal(ordinal).year] += value
+        return {year: round(total, 2) for year, total in totals.items()}
+
+    def overdue(self, today: date, balance: float | None) -> list[dict]:
+        """
+        Facturile restante la data `today`.
+        Portalul nu spune ce factură a fost plătită, așa că considerăm neplătite
+        cele mai noi facturi care, împreună, acoperă soldul curent (`balance`).
+        """
+        if not balance or balance <= 0:
+            return []
+
+        overdue = []
+        remaining = balance
+        today_ordinal = today.toordinal()
+        for position in range(len(self._dates) - 1, -1, -1):
+            if remaining <= 0:
+                break
+            remaining -= self._values[position]
+            if 0 < self._dues[position] < today_ordinal:
+                overdue.append(self._row(position))
+        return overdue
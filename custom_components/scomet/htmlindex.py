@@ -0,0 +1,174 @@
+"""
+Indexarea HTML a paginilor Scomet, fără Home Assistant și fără restul integrării.
+
+Modulul importă doar biblioteca standard și parserele HTML, ca un proces de parsare
+(vezi `hub.ScometHub.async_setup`) să îl poată încărca singur, ca modul de nivel
+superior `htmlindex`: procesul copil nu importă pachetul integrării și nici Home
+Assistant. Restul integrării îl folosește prin `parsers` și `extract.PageIndex`.
+
+Rezultatul este un triplet de dicționare de text (iboxes, labels, tables), ușor de
+transferat între procese; `extract.PageIndex` este construit din el în procesul principal.
+"""
+
+from __future__ import annotations
+
+import pkgutil
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Tipuri de locatori
+LOCATOR_IBOX = "ibox"    # Cardul ibox cu titlul h5 dat -> textul din h1.no-margins
+LOCATOR_LABEL = "label"  # Celula <td data-label="..."> de pe rândul dat
+LOCATOR_TABLE = "table"  # Tabelul de după titlul h5 dat -> celula de pe rândul/coloana dată (-1 = ultima)
+
+BACKEND_SELECTOLAX = "selectolax"
+BACKEND_LXML = "lxml"
+BACKEND_HTML_PARSER = "html.parser"
+
+# (iboxes, labels, tables), vezi `extract.PageIndex`
+Index = tuple[dict[str, str], dict[str, list[str]], dict[str, list[list[str]]]]
+
+
+def _has_ibox_class(value) -> bool:
+    """În timpul parsării, clasa poate veni ca text brut ("ibox float-e-margins") sau ca listă."""
+    if not value:
+        return False
+    classes = value.split() if isinstance(value, str) else value
+    return "ibox" in classes
+
+
+# Subarborii care conțin datele pentru fiecare tip de locator
+_STRAINERS = {
+    LOCATOR_IBOX: SoupStrainer("div", class_=_has_ibox_class),
+    LOCATOR_LABEL: SoupStrainer("td", attrs={"data-label": True}),
+    LOCATOR_TABLE: SoupStrainer(["h5", "table"]),
+}
+
+
+def available_backends() -> list[str]:
+    """Backend-urile instalate, în ordinea preferinței."""
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append(BACKEND_SELECTOLAX)
+    if HAS_LXML:
+        backends.append(BACKEND_LXML)
+    backends.append(BACKEND_HTML_PARSER)
+    return backends
+
+
+def best_backend() -> str:
+    """Cel mai rapid backend instalat."""
+    return available_backends()[0]
+
+
+def strainer(kinds) -> SoupStrainer | None:
+    """
+    Strainer-ul pentru o pagină ai cărei locatori au tipurile `kinds`, dacă toți folosesc
+    același tip de subarbore. Altfel întoarce None și pagina este parsată complet.
+    """
+    if len(kinds) != 1:
+        return None
+    return _STRAINERS.get(next(iter(kinds)))
+
+
+def index_soup(soup: BeautifulSoup) -> Index:
+    """Construiește indexul într-o singură trecere prin document."""
+    iboxes, labels, tables = {}, {}, {}
+    heading = None
+
+    for tag in soup.find_all(["div", "h5", "td", "table"]):
+        if tag.name == "h5":
+            heading = tag.text.strip()
+        elif tag.name == "td":
+            label = tag.get("data-label")
+            if label is not None:
+                labels.setdefault(label, []).append(tag.text.strip())
+        elif tag.name == "table":
+            if heading is not None and heading not in tables:
+                tables[heading] = [
+                    [td.text.strip() for td in cells]
+                    for cells in (tr.find_all("td") for tr in tag.find_all("tr"))
+                    if cells
+                ]
+            heading = None
+        elif "ibox" in (tag.get("class") or ()):
+            title = tag.select_one("div.ibox-title h5")
+            value = tag.select_one("div.ibox-content h1.no-margins")
+            if title and value:
+                iboxes.setdefault(title.text.strip(), value.text.strip())
+
+    return iboxes, labels, tables
+
+
+def index_selectolax(tree) -> Index:
+    """Construiește indexul dintr-un arbore selectolax (lexbor), cu aceleași reguli ca `index_soup`."""
+    iboxes, labels, tables = {}, {}, {}
+    heading = None
+
+    # selectolax întoarce nodurile în ordinea din document
+    for node in tree.css("div.ibox, h5, td[data-label], table"):
+        if node.tag == "h5":
+            heading = node.text().strip()
+        elif node.tag == "td":
+            labels.setdefault(node.attributes["data-label"], []).append(node.text().strip())
+        elif node.tag == "table":
+            if heading is not None and heading not in tables:
+                tables[heading] = [
+                    [td.text().strip() for td in cells]
+                    for cells in (tr.css("td") for tr in node.css("tr"))
+                    if cells
+                ]
+            heading = None
+        else:
+            title = node.css_first("div.ibox-title h5")
+            value = node.css_first("div.ibox-content h1.no-margins")
+            if title and value:
+                iboxes.setdefault(title.text().strip(), value.text().strip())
+
+    return iboxes, labels, tables
+
+
+def index_html(html: str, kinds, backend: str | None = None) -> Index:
+    """Parsează documentul cu backend-ul dat (implicit cel mai rapid) și întoarce indexul lui."""
+    backend = backend or best_backend()
+    if backend == BACKEND_SELECTOLAX:
+        return index_selectolax(LexborHTMLParser(html))
+    return index_soup(BeautifulSoup(html, backend, parse_only=strainer(kinds)))
+
+
+def index_bytes(content: bytes, encoding: str, kinds, backend: str | None = None) -> Index:
+    """Punctul de intrare pentru executoare: decodează octeții bruți și întoarce indexul."""
+    return index_html(content.decode(encoding, errors="replace"), kinds, backend)
+
+
+def warm() -> str:
+    """Nu face nimic în afară de importuri; pornește din timp procesele pool-ului."""
+    return best_backend()
+
+
+class ChildFunction:
+    """
+    Funcția `name` din acest modul, trimisă unui proces copil prin numele modulului de nivel
+    superior `htmlindex`: copilul o încarcă fără pachetul integrării (și fără Home Assistant).
+    Procesul copil trebuie să aibă directorul acestui fișier în `sys.path` (vezi `hub.ScometHub`).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, *args):
+        return globals()[self.name](*args)
+
+    def __reduce__(self):
+        return pkgutil.resolve_name, (f"htmlindex:{self.name}",)
@@ -0,0 +1,213 @@
+"""
+Planificatorul comun al tuturor conturilor Scomet.
+
+În loc ca fiecare intrare să aibă propriul timer, hub-ul ține o singură coadă
+de priorități (momentul următoarei actualizări pentru fiecare cont) și un
+singur timer, armat pentru cel mai apropiat moment. Actualizările sunt
+eșalonate cu jitter, iar toate conturile împart aceeași limită de conexiuni,
+același ritm de cereri și același pool de conexiuni HTTP către scomet.ro.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import multiprocessing
+import random
+import site
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from pathlib import Path
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DOMAIN, HUB_JITTER, HUB_MAX_CONNECTIONS, HUB_RATE, HUB_STAGGER,
+    PARSE_MODE_PROCESS, PARSE_MODE_THREAD, PARSE_PROCESS_WORKERS, PARSE_THREAD_WORKERS,
+)
+from .htmlindex import ChildFunction
+from .utils_http import HostLimiter, create_client_session, create_connector
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ScometHub:
+    """Planificator și limitator comun pentru toate intrările Scomet."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.limiter = HostLimiter(HUB_MAX_CONNECTIONS, rate=HUB_RATE)
+        self._coordinators: dict = {}
+        self._due: dict[str, float] = {}  # entry_id -> momentul (time.monotonic) următoarei actualizări
+        self._heap: list[tuple[float, str]] = []
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        # Pool-ul de conexiuni comun; fiecare cont are propria sesiune (cookie-uri) peste el
+        self._connector: aiohttp.TCPConnector | None = None
+        self._unsub_close: CALLBACK_TYPE | None = None
+        # Executoarele de parsare, câte unul pe mod (opțiunea parse_mode), create de async_setup
+        self._parse_executors: dict[str, Executor] = {}
+        self._parse_lock = asyncio.Lock()
+
+    @property
+    def entry_ids(self) -> list[str]:
+        """Intrările înregistrate."""
+        return list(self._coordinators)
+
+    @callback
+    def async_register(self, coordinator, refresh_now: bool = False) -> None:
+        """
+        Adaugă coordinatorul unei intrări în planificare.
+        Dacă `refresh_now`, prima actualizare pornește după un decalaj aleator de cel mult `HUB_STAGGER`.
+        """
+        entry_id = coordinator.config_entry.entry_id
+        self._coordinators[entry_id] = coordinator
+        if refresh_now:
+            self._schedule(entry_id, random.uniform(0, HUB_STAGGER))
+        else:
+            self._schedule(entry_id, self._jitter(coordinator.refresh_interval))
+
+    @callback
+    def async_unregister(self, entry_id: str) -> None:
+        """Scoate intrarea din planificare."""
+        self._coordinators.pop(entry_id, None)
+        self._due.pop(entry_id, None)
+        self._arm()
+
+    @callback
+    def async_reschedule(self, entry_id: str) -> None:
+        """
+        Reprogramează intrarea după noul ei `refresh_interval` (de exemplu după schimbarea opțiunilor).
+        O actualizare în curs se reprogramează singură la final.
+        """
+        if entry_id in self._due:
+            self._schedule(entry_id, self._jitter(self._coordinators[entry_id].refresh_interval))
+
+    @callback
+    def async_create_session(self) -> aiohttp.ClientSession:
+        """Sesiune HTTP nouă pentru un cont: cookie-uri proprii, conexiuni din pool-ul comun."""
+        if self._connector is None or self._connector.closed:
+            self._connector = create_connector()
+            self._unsub_close = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_on_close)
+        return create_client_session(self._connector)
+
+    async def async_setup(self, parse_mode: str) -> None:
+        """
+        Pregătește executorul de parsare pentru `parse_mode`, dacă nu există deja.
+        Crearea și pornirea proceselor blochează, așa că rulează în executorul Home Assistant.
+        """
+        if parse_mode not in (PARSE_MODE_THREAD, PARSE_MODE_PROCESS):
+            return
+        async with self._parse_lock:
+            if parse_mode not in self._parse_executors:
+                self._parse_executors[parse_mode] = await self.hass.async_add_executor_job(
+                    _start_parse_executor, parse_mode
+                )
+
+    @callback
+    def parse_executor(self, mode: str) -> Executor | None:
+        """
+        Executorul de parsare comun tuturor conturilor pentru `mode`, pregătit de `async_setup`
+        (None pentru parsarea în buclă sau dacă executorul nu a fost pregătit).
+        """
+        return self._parse_executors.get(mode)
+
+    async def async_shutdown(self) -> None:
+        """Oprește timerul comun, pool-ul de conexiuni și executoarele de parsare."""
+        self._coordinators.clear()
+        self._due.clear()
+        self._heap.clear()
+        self._arm()
+        if self._unsub_close:
+            self._unsub_close()
+            self._unsub_close = None
+        await self._async_close_pools()
+
+    async def _async_on_close(self, _event: Event) -> None:
+        # La oprirea Home Assistant intrările nu sunt descărcate; închidem noi conexiunile
+        self._unsub_close = None
+        await self._async_close_pools()
+
+    async def _async_close_pools(self) -> None:
+        if self._connector is not None:
+            connector, self._connector = self._connector, None
+            await connector.close()
+        executors, self._parse_executors = self._parse_executors, {}
+        for executor in executors.values():
+            # shutdown așteaptă firele / procesele; nu blocăm bucla
+            await self.hass.async_add_executor_job(partial(executor.shutdown, wait=True, cancel_futures=True))
+
+    @staticmethod
+    def _jitter(interval: timedelta) -> float:
+        seconds = interval.total_seconds()
+        return seconds * random.uniform(1 - HUB_JITTER, 1 + HUB_JITTER)
+
+    @callback
+    def _schedule(self, entry_id: str, delay: float) -> None:
+        due = time.monotonic() + delay
+        self._due[entry_id] = due
+        heapq.heappush(self._heap, (due, entry_id))
+        self._arm()
+
+    @callback
+    def _arm(self) -> None:
+        """Armează timerul unic pentru cel mai apropiat moment din coadă."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+        # Intrările învechite (reprogramate sau scoase) sunt eliminate leneș
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+        if self._heap:
+            delay = max(0.0, self._heap[0][0] - time.monotonic())
+            self._unsub_timer = async_call_later(self.hass, delay, self._async_fire)
+
+    @callback
+    def _async_fire(self, _now) -> None:
+        self._unsub_timer = None
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            due, entry_id = heapq.heappop(self._heap)
+            if self._due.get(entry_id) != due:
+                continue
+            del self._due[entry_id]
+            coordinator = self._coordinators[entry_id]
+            coordinator.config_entry.async_create_background_task(
+                self.hass, self._async_refresh(coordinator), f"{DOMAIN}_refresh_{entry_id}"
+            )
+        self._arm()
+
+    async def _async_refresh(self, coordinator) -> None:
+        entry_id = coordinator.config_entry.entry_id
+        try:
+            await coordinator.async_refresh()
+        finally:
+            if entry_id in self._coordinators:
+                self._schedule(entry_id, self._jitter(coordinator.refresh_interval))
+
+
+def _start_parse_executor(mode: str) -> Executor:
+    """
+    Creează executorul de parsare; pentru procese le și pornește, cu câte o sarcină goală.
+    Procesele sunt pornite cu "spawn" (Home Assistant are multe fire de execuție, iar fork le-ar copia
+    starea) și primesc directorul integrării în `sys.path`: parsarea din ele importă doar `htmlindex`.
+    """
+    if mode != PARSE_MODE_PROCESS:
+        return ThreadPoolExecutor(max_workers=PARSE_THREAD_WORKERS, thread_name_prefix=f"{DOMAIN}_parse")
+    executor = ProcessPoolExecutor(
+        max_workers=PARSE_PROCESS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=site.addsitedir,
+        initargs=(str(Path(__file__).parent),),
+    )
+    warm = ChildFunction("warm")
+    for future in [executor.submit(warm) for _ in range(PARSE_PROCESS_WORKERS)]:
+        future.result()
+    return executor
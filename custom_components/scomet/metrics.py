@@ -0,0 +1,155 @@
+"""
+Instrumentarea căii critice a unei actualizări Scomet.
+
+Fiecare etapă (login, descărcarea și parsarea fiecărei pagini, extragerea
+câmpurilor, ciclul complet) este cronometrată într-o fereastră glisantă de
+eșantioane, din care calculăm percentile; alături ținem contoare simple
+(reautentificări, eșecuri, pagini modificate). Costul este de un
+`time.perf_counter()` și un `deque.append()` pe măsurătoare.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlsplit
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import METRICS_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+# Etapele cronometrate
+TIMING_REFRESH = "refresh"
+TIMING_LOGIN = "login"
+TIMING_FETCH = "fetch"
+TIMING_PARSE = "parse"
+TIMING_EXTRACT = "extract"
+
+# Contoare
+COUNTER_REFRESHES = "refreshes"
+COUNTER_REFRESH_FAILURES = "refresh_failures"
+COUNTER_LOGINS = "logins"
+COUNTER_LOGIN_FAILURES = "login_failures"
+COUNTER_RELOGINS = "relogins"
+COUNTER_FETCH_FAILURES = "fetch_failures"
+COUNTER_RETRIES = "retries"
+COUNTER_CIRCUIT_TRIPS = "circuit_trips"
+COUNTER_PAGES_CHANGED = "pages_changed"
+COUNTER_PAGES_UNCHANGED = "pages_unchanged"
+COUNTER_SHARED_REQUESTS = "shared_requests"  # Apeluri servite de o cerere identică aflată deja în curs
+
+
+def page_name(url: str) -> str:
+    """Numele scurt al unei pagini scomet.ro (parametrul `submeniu`), pentru etichete."""
+    parts = urlsplit(url)
+    return parse_qs(parts.query).get("submeniu", [parts.path.strip("/") or parts.hostname or url])[0]
+
+
+class RollingStats:
+    """Ultimele `window` durate (milisecunde) ale unei etape."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0  # Total măsurători, nu doar cele din fereastră
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    @property
+    def last(self) -> float | None:
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent: float) -> float | None:
+        """Percentila `percent` (0–100) din fereastră, prin metoda rangului cel mai apropiat."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def as_dict(self) -> dict:
+        def rounded(value):
+            return None if value is None else round(value, 2)
+
+        return {
+            "count": self.count,
+            "last": rounded(self.last),
+            "p50": rounded(self.percentile(50)),
+            "p95": rounded(self.percentile(95)),
+            "max": rounded(max(self._samples, default=None)),
+        }
+
+
+class ScometMetrics:
+    """Duratele și contoarele unui cont Scomet."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._window = window
+        self.timings: dict[str, RollingStats] = {}
+        self.counters: Counter[str] = Counter()
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    def stats(self, name: str, page: str | None = None) -> RollingStats:
+        """Statisticile etapei `name` (opțional, doar pentru pagina `page`), create la nevoie."""
+        key = f"{name}:{page}" if page else name
+        if key not in self.timings:
+            self.timings[key] = RollingStats(self._window)
+        return self.timings[key]
+
+    def record(self, name: str, milliseconds: float, page: str | None = None) -> None:
+        """Adaugă o durată la etapa `name`; pentru pagini, și la totalul etapei."""
+        self.stats(name).add(milliseconds)
+        if page:
+            self.stats(name, page).add(milliseconds)
+
+    @contextmanager
+    def timed(self, name: str, page: str | None = None):
+        """Cronometrează blocul `with`, inclusiv când acesta ridică o excepție."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, page)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def pages(self, name: str) -> dict[str, float | None]:
+        """Percentila 95 a etapei `name` pentru fiecare pagină măsurată."""
+        prefix = f"{name}:"
+        return {
+            key[len(prefix):]: stats.as_dict()["p95"]
+            for key, stats in self.timings.items()
+            if key.startswith(prefix)
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "timings_ms": {key: stats.as_dict() for key, stats in sorted(self.timings.items())},
+            "counters": dict(self.counters),
+        }
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """
+        Abonează `update_callback` la sfârșitul fiecărui ciclu de actualizare.
+        Spre deosebire de ascultătorii coordinatorului, este apelat și când datele nu s-au schimbat.
+        """
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,39 @@
+"""
+Backend-uri de parsare HTML pentru paginile Scomet.
+
+Ordinea de preferință este selectolax (lexbor), apoi BeautifulSoup cu lxml,
+apoi BeautifulSoup cu html.parser, care este mereu disponibil. Pentru
+BeautifulSoup se parsează doar subarborii relevanți pentru locatorii paginii
+(vezi `SoupStrainer`), nu tot documentul.
+
+Parsarea propriu-zisă este în `htmlindex`, care nu importă Home Assistant;
+aici sunt doar adaptoarele care întorc `extract.PageIndex`. Executoarele
+(vezi `utils_http.ScometAPI`) primesc octeții bruți și întorc doar indexul
+paginii, așa că parsarea poate rula într-un fir de execuție sau într-un
+proces separat care încarcă doar `htmlindex`.
+"""
+
+from __future__ import annotations
+
+from .const import PAGE_ENCODING
+from .extract import PageIndex, page_kinds
+from .htmlindex import (  # noqa: F401
+    BACKEND_HTML_PARSER,
+    BACKEND_LXML,
+    BACKEND_SELECTOLAX,
+    available_backends,
+    best_backend,
+    index_bytes,
+    index_html,
+)
+
+
+def parse_page(html: str, url: str, backend: str | None = None) -> PageIndex:
+    """Parsează pagina `url` cu backend-ul dat (implicit cel mai rapid) și întoarce indexul ei."""
+    return PageIndex(*index_html(html, page_kinds(url), backend))
+
+
+def parse_bytes(content: bytes, charset: str | None, url: str, backend: str | None = None) -> PageIndex:
+    """Decodează și parsează pagina `url` în procesul curent."""
+    # Decodăm noi octeții, fără detecția (lentă) de codificare din response.text()
+    return PageIndex(*index_bytes(content, charset or PAGE_ENCODING, page_kinds(url), backend))
@@ -0,0 +1,180 @@
+"""
+Reîncercări și circuit breaker pentru căderile scomet.ro.
+
+Erorile sunt împărțite în temporare (timeout, conexiune, HTTP 5xx/429), care
+sunt reîncercate cu backoff exponențial și jitter complet, și permanente
+(autentificare, structura paginii), care nu sunt reîncercate.
+
+`CircuitBreaker` urmărește ciclurile de actualizare ale unui cont (sau citirile
+unei singure pagini, când celelalte pagini reușesc): după
+eșecuri repetate (sau imediat, la o eroare permanentă) suspendă actualizările
+pentru o pauză cu jitter, dublată la fiecare redeschidere. Jitter-ul
+împrăștie conturile în timp, ca să nu revină toate deodată când portalul
+își revine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+import aiohttp
+
+from .const import (
+    CIRCUIT_COOLDOWN,
+    CIRCUIT_MAX_COOLDOWN,
+    CIRCUIT_THRESHOLD,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+from .exceptions import ScometError, ScometPermanentError, ScometTransientError
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Stările circuitului
+STATE_CLOSED = "closed"  # Actualizări normale
+STATE_OPEN = "open"  # Actualizări suspendate până la sfârșitul pauzei
+STATE_HALF_OPEN = "half_open"  # Pauza s-a încheiat; următorul ciclu este o probă
+
+# Coduri HTTP după care merită să reîncercăm
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def http_error(url: str, response: aiohttp.ClientResponse) -> ScometError:
+    """Eroarea corespunzătoare unui răspuns HTTP neașteptat."""
+    message = f"HTTP {response.status}: {url}"
+    if response.status in TRANSIENT_STATUSES or response.status >= 500:
+        retry_after = response.headers.get(aiohttp.hdrs.RETRY_AFTER)
+        return ScometTransientError(message, float(retry_after) if retry_after and retry_after.isdigit() else None)
+    return ScometPermanentError(message)
+
+
+def is_transient(err: BaseException) -> bool:
+    """Eroarea poate dispărea la o nouă încercare."""
+    if isinstance(err, ScometTransientError):
+        return True
+    if isinstance(err, ScometError):
+        return False
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status in TRANSIENT_STATUSES or err.status >= 500
+    # Timeout-urile aiohttp sunt și TimeoutError; restul erorilor de conexiune sau de transfer sunt temporare
+    return isinstance(err, (TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Reîncercări cu backoff exponențial și jitter complet, doar pentru erorile temporare."""
+
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+
+    def delay(self, attempt: int, err: BaseException | None = None) -> float:
+        """Pauza dinaintea reîncercării `attempt` (de la 0): aleatoare între 0 și min(max_delay, base · 2^attempt)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        retry_after = getattr(err, "retry_after", None)
+        if retry_after:
+            # Serverul ne-a spus cât să așteptăm; nu revenim mai devreme
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    async def async_call(
+        self, func: Callable[[], Awaitable[_T]], on_retry: Callable[[BaseException], None] | None = None
+    ) -> _T:
+        """Rulează `func()`, reîncercând erorile temporare; ultima eroare este ridicată mai departe."""
+        for attempt in range(self.attempts):
+            try:
+                return await func()
+            except Exception as err:
+                if attempt + 1 >= self.attempts or not is_transient(err):
+                    raise
+                delay = self.delay(attempt, err)
+                _LOGGER.debug("Eroare temporară (%s); reîncercăm peste %.1f s.", err, delay)
+                if on_retry:
+                    on_retry(err)
+                await asyncio.sleep(delay)
+        raise AssertionError("RetryPolicy.attempts trebuie să fie cel puțin 1")
+
+
+class CircuitBreaker:
+    """
+    Starea circuitului unui cont: închis (normal), deschis (actualizări suspendate)
+    sau semi-deschis (pauza s-a încheiat; un singur ciclu de probă decide).
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+        max_cooldown: float = CIRCUIT_MAX_COOLDOWN,
+        name: str = "Scomet",
+    ):
+        self.name = name  # Pentru mesajele din log
+        self._threshold = max(1, threshold)
+        self._cooldown = cooldown
+        self._max_cooldown = max(max_cooldown, cooldown)
+        self.state = STATE_CLOSED
+        self.failures = 0  # Cicluri eșuate consecutiv
+        self.trips = 0  # Deschideri consecutive, fără un ciclu reușit între ele
+        self.last_error: str | None = None
+        self._open_until = 0.0  # time.monotonic() la care se încheie pauza
+
+    @property
+    def remaining(self) -> float:
+        """Secundele rămase din pauză (0 dacă circuitul nu este deschis)."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """Putem face un ciclu acum? La sfârșitul pauzei, circuitul trece în semi-deschis."""
+        if self.state == STATE_OPEN and self.remaining == 0:
+            self.state = STATE_HALF_OPEN
+        return self.state != STATE_OPEN
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Actualizările %s au fost reluate după %s eșecuri.", self.name, self.failures)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.last_error = None
+
+    def record_failure(self, err: BaseException) -> bool:
+        """Înregistrează un ciclu eșuat; întoarce True dacă circuitul tocmai s-a deschis."""
+        self.failures += 1
+        self.last_error = f"{type(err).__name__}: {err}"
+        permanent = isinstance(err, ScometPermanentError)
+        if not (permanent or self.state == STATE_HALF_OPEN or self.failures >= self._threshold):
+            return False
+
+        # Pauza se dublează la fiecare redeschidere; o eroare permanentă așteaptă direct pauza maximă.
+        # Jitter-ul (50–100% din pauză) împrăștie conturile căzute odată.
+        cooldown = self._max_cooldown if permanent else min(self._max_cooldown, self._cooldown * 2**self.trips)
+        cooldown *= random.uniform(0.5, 1.0)
+        self.trips += 1
+        self.state = STATE_OPEN
+        self._open_until = time.monotonic() + cooldown
+        _LOGGER.warning(
+            "Actualizările %s sunt suspendate %.0f s după %s eșecuri consecutive (%s).",
+            self.name, cooldown, self.failures, self.last_error,
+        )
+        return True
+
+    def as_dict(self) -> dict:
+        """Starea circuitului, pentru diagnostice."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "remaining_s": round(self.remaining, 1),
+            "last_error": self.last_error,
+        }
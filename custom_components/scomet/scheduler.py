@@ -0,0 +1,238 @@
+"""
+Planificator adaptiv pentru actualizările Scomet.
+
+Facturile sunt emise și devin scadente într-un ritm lunar previzibil, așa că
+intervalul dintre actualizări se ajustează după datele deja extrase:
+  - dens (intervalul de bază) în jurul datei estimate de emitere și al datei scadente;
+  - rar la mijlocul ciclului;
+  - și mai rar, exponențial, după mai multe cicluri consecutive fără modificări.
+
+`RefreshTiers` aplică ritmul de mai sus doar paginii de facturi: fiecare pagină
+are propriul nivel de actualizare (situația des, facturile zilnic sau dens în
+jurul emiterii, consumul în jurul citirii contoarelor), iar un ciclu citește
+doar paginile al căror interval a expirat.
+"""
+
+from __future__ import annotations
+
+import calendar
+import logging
+from datetime import date, datetime, timedelta
+
+from .const import (
+    DEFAULT_CONSUMPTION_INTERVAL,
+    DEFAULT_INVOICES_INTERVAL,
+    DEFAULT_UPDATE,
+    HUB_JITTER,
+    METER_READING_END_DAY,
+    METER_READING_START_DAY,
+    SCHEDULER_BACKOFF_AFTER,
+    SCHEDULER_DENSE_WINDOW,
+    SCHEDULER_MAX_INTERVAL,
+    SCHEDULER_SPARSE_INTERVAL,
+    TIER_INVOICES_DENSE,
+    TIER_METER_INTERVAL,
+    TIER_MIN_INTERVAL,
+    URL_CONSUM_APA,
+    URL_FACTURI,
+    URL_SITUATIE,
+)
+from .extract import ro_date
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def add_month(day: date) -> date:
+    """Aceeași zi din luna următoare (sau ultima zi a lunii, dacă aceea e mai scurtă)."""
+    year, month = (day.year + 1, 1) if day.month == 12 else (day.year, day.month + 1)
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _parse(value) -> date | None:
+    if not value:
+        return None
+    try:
+        return ro_date(value)
+    except ValueError:
+        return None
+
+
+class BillingScheduler:
+    """
+    Învață din `datafactura` și `datascadenta` ritmul ciclului de facturare
+    și propune intervalul până la următoarea actualizare.
+    """
+
+    def __init__(
+        self,
+        base_interval: timedelta = timedelta(seconds=DEFAULT_UPDATE),
+        sparse_interval: timedelta = timedelta(seconds=SCHEDULER_SPARSE_INTERVAL),
+        max_interval: timedelta = timedelta(seconds=SCHEDULER_MAX_INTERVAL),
+        dense_window: timedelta = timedelta(days=SCHEDULER_DENSE_WINDOW),
+        backoff_after: int = SCHEDULER_BACKOFF_AFTER,
+    ):
+        self.base_interval = base_interval
+        self.sparse_interval = max(sparse_interval, base_interval)
+        self.max_interval = max(max_interval, self.sparse_interval)
+        self.dense_window = dense_window
+        self.backoff_after = backoff_after
+
+        self._last_issue: date | None = None
+        self._due: date | None = None
+        self._unchanged = 0
+
+    @property
+    def expected_issue(self) -> date | None:
+        """Data estimată a următoarei facturi: aceeași zi din luna de după ultima factură."""
+        return add_month(self._last_issue) if self._last_issue else None
+
+    def observe(self, data: dict | None, changed: bool) -> None:
+        """Înregistrează rezultatul unui ciclu de actualizare."""
+        self._unchanged = 0 if changed else self._unchanged + 1
+        if not data:
+            return
+
+        issue = _parse(data.get("datafactura"))
+        if issue and (self._last_issue is None or issue > self._last_issue):
+            self._last_issue = issue
+        due = _parse(data.get("datascadenta"))
+        if due:
+            self._due = due
+
+    def _windows(self) -> list[tuple[datetime, datetime]]:
+        """Ferestrele dense (început, sfârșit), în ora locală a datelor."""
+        windows = []
+        for day in (self.expected_issue, self._due):
+            if day is None:
+                continue
+            center = datetime.combine(day, datetime.min.time())
+            windows.append((center - self.dense_window, center + self.dense_window + timedelta(days=1)))
+        return windows
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Intervalul până la următoarea actualizare, pornind de la momentul `now`."""
+        if self._last_issue is None:
+            # Încă nu știm nimic despre ciclul de facturare
+            return self.base_interval
+
+        local = now.replace(tzinfo=None)
+        next_window = None
+        for start, end in self._windows():
+            if start <= local < end:
+                return self.base_interval
+            if local < start and (next_window is None or start < next_window):
+                next_window = start
+
+        backoff = max(0, self._unchanged - self.backoff_after)
+        interval = min(self.sparse_interval * (2 ** min(backoff, 16)), self.max_interval)
+
+        # Nu sărim niciodată peste începutul următoarei ferestre dense
+        if next_window is not None:
+            interval = min(interval, max(next_window - local, self.base_interval))
+        return interval
+
+
+class RefreshTiers:
+    """
+    Momentul următoarei citiri a fiecărei pagini, după nivelul ei de actualizare:
+      - situatie (soldul): la fiecare `update_interval`;
+      - facturi: o dată la `invoices_interval`, dens în jurul emiterii și al scadenței (`BillingScheduler`);
+      - consumuri: o dată la `consumption_interval`, dens în fereastra de citire a contoarelor.
+    Intervalele pot fi schimbate oricând (`configure`); scadențele sunt recalculate imediat.
+    """
+
+    PAGES = (URL_SITUATIE, URL_FACTURI, URL_CONSUM_APA)
+
+    def __init__(
+        self,
+        update_interval: timedelta = timedelta(seconds=DEFAULT_UPDATE),
+        invoices_interval: timedelta = timedelta(seconds=DEFAULT_INVOICES_INTERVAL),
+        consumption_interval: timedelta = timedelta(seconds=DEFAULT_CONSUMPTION_INTERVAL),
+    ):
+        self.billing = BillingScheduler()
+        self._fetched: dict[str, datetime] = {}  # Ultima citire reușită a fiecărei pagini
+        self._due: dict[str, tuple[datetime, timedelta]] = {}  # Pagina -> (scadența, intervalul ei)
+        self.configure(update_interval, invoices_interval, consumption_interval)
+
+    def configure(self, update_interval: timedelta, invoices_interval: timedelta, consumption_interval: timedelta) -> None:
+        """Schimbă intervalele și recalculează scadențele paginilor deja citite."""
+        self.update_interval = update_interval
+        self.consumption_interval = consumption_interval
+        self.billing.base_interval = min(timedelta(seconds=TIER_INVOICES_DENSE), invoices_interval)
+        self.billing.sparse_interval = invoices_interval
+        self.billing.max_interval = max(timedelta(seconds=SCHEDULER_MAX_INTERVAL), invoices_interval)
+        for url, fetched in self._fetched.items():
+            ttl = self._ttl(url, fetched)
+            self._due[url] = (fetched + ttl, ttl)
+
+    @property
+    def base_interval(self) -> timedelta:
+        """Cel mai scurt interval de bază; după un ciclu eșuat, reîncercăm cel târziu după el."""
+        return max(min(self.update_interval, self.billing.base_interval), timedelta(seconds=TIER_MIN_INTERVAL))
+
+    def _ttl(self, url: str, now: datetime) -> timedelta:
+        if url == URL_FACTURI:
+            return self.billing.next_interval(now)
+        if url == URL_CONSUM_APA:
+            return self._consumption_ttl(now)
+        return self.update_interval
+
+    def _consumption_ttl(self, now: datetime) -> timedelta:
+        """Dens în fereastra de citire a contoarelor, rar în rest, fără să sară peste începutul ferestrei."""
+        dense = min(timedelta(seconds=TIER_METER_INTERVAL), self.consumption_interval)
+        if now.day >= METER_READING_START_DAY or now.day <= METER_READING_END_DAY:
+            return dense
+        window = now.replace(day=METER_READING_START_DAY, hour=0, minute=0, second=0, microsecond=0)
+        return min(self.consumption_interval, max(window - now, dense))
+
+    def due(self, now: datetime) -> list[str]:
+        """
+        Paginile de citit acum: cele necitite încă și cele al căror interval a expirat. Intră și paginile
+        care ar expira în marja de jitter a hub-ului, ca un ciclu pornit puțin mai devreme să nu le rateze.
+        """
+        return [
+            url for url in self.PAGES
+            if url not in self._due or now >= self._due[url][0] - self._due[url][1] * HUB_JITTER
+        ]
+
+    def mark(self, url: str, now: datetime) -> None:
+        """Pagina `url` a fost citită cu succes la `now`."""
+        self._fetched[url] = now
+        ttl = self._ttl(url, now)
+        self._due[url] = (now + ttl, ttl)
+
+    def defer(self, url: str, now: datetime, delay: timedelta) -> None:
+        """Pagina `url` nu a putut fi citită: o reîncercăm peste `delay`, fără să afecteze celelalte pagini."""
+        self._due[url] = (now + delay, delay)
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Intervalul până la scadența celei mai apropiate pagini."""
+        if len(self._due) < len(self.PAGES):
+            return timedelta(seconds=TIER_MIN_INTERVAL)
+        nearest = min(due for due, _ttl in self._due.values())
+        return max(nearest - now, timedelta(seconds=TIER_MIN_INTERVAL))
+
+    def export(self) -> dict:
+        """Ultima citire a fiecărei pagini, serializabilă în JSON, pentru persistare între reporniri."""
+        return {url: fetched.isoformat() for url, fetched in self._fetched.items()}
+
+    def restore(self, stored: dict) -> None:
+        """Reface scadențele din citirile salvate (după `billing.observe` cu datele restaurate)."""
+        for url, fetched in stored.items():
+            if url not in self.PAGES:
+                continue
+            try:
+                self.mark(url, datetime.fromisoformat(fetched))
+            except (TypeError, ValueError):
+                _LOGGER.debug("Momentul salvat al citirii paginii %s este invalid: %r", url, fetched)
+
+    def as_dict(self, now: datetime) -> dict:
+        """Scadența fiecărei pagini, pentru diagnostice."""
+        return {
+            url: {
+                "fetched": self._fetched[url].isoformat() if url in self._fetched else None,
+                "ttl_s": self._due[url][1].total_seconds() if url in self._due else None,
+                "due_in_s": round((self._due[url][0] - now).total_seconds()) if url in self._due else 0,
+            }
+            for url in self.PAGES
+        }
@@ -1,13 +1,24 @@
 import logging
-from datetime import datetime
-from homeassistant.components.button import ButtonEntity
-from homeassistant.components.sensor import SensorEntity
+from dataclasses import dataclass
+from typing import Callable
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.const import EntityCategory, UnitOfTime, UnitOfVolume
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
+from .entity import ScometEntity, device_info
+from .extract import page_urls
+from .metrics import (
+    COUNTER_FETCH_FAILURES, COUNTER_LOGIN_FAILURES, COUNTER_REFRESH_FAILURES, COUNTER_RELOGINS, COUNTER_RETRIES,
+    TIMING_EXTRACT, TIMING_FETCH, TIMING_LOGIN, TIMING_PARSE, TIMING_REFRESH, ScometMetrics,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,490 +31,186 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     # Obținem coordinatorul din hass.data
     coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
-    # Creăm entitățile senzor
-    async_add_entities([
-        NrPersoaneSensor(coordinator, entry.entry_id),
-        TotalSensor(coordinator, entry.entry_id),
-        SoldSensor(coordinator, entry.entry_id),
-        DataFacturaSensor(coordinator, entry.entry_id),
-        DataScadentaSensor(coordinator, entry.entry_id),
-        CosnumApaSensor(coordinator, entry.entry_id),
-    ])
+    # ID-urile unice vechi (`scomet_<cheie>`) erau aceleași pentru toate conturile
+    legacy_ids = {f"{DOMAIN}_{description.key}": description.key for description in SENSORS}
 
-    _LOGGER.debug("Senzorii au fost adăugați pentru entry_id=%s", entry.entry_id)
-
-class NrPersoaneSensor(CoordinatorEntity, SensorEntity):
-    """Senzor pentru afișarea informațiilor despre numărul de persoane."""
-
-    def __init__(self, coordinator, entry_id):
-        """Inițializează senzorul NrPersoane."""
-        super().__init__(coordinator)
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_nrpersoane"
-        self._attr_name = "Număr persoane"
-        self._entity_id = f"sensor.{DOMAIN}_nrpersoane"
-        self._icon = "mdi:account-multiple"
-        self._device_class = "Device class"
-        self._state_class = "State class"
-        self._state = None
-
-    @property
-    def state(self):
-        """Returnează starea senzorului (numărul de persoane)."""
-        _LOGGER.debug("State requested for NrPersoaneSensor: %s", self.coordinator.data)
-
-        if self.coordinator.data is None:
-            return "Unknown"
-
-        nrpersoane = self.coordinator.data.get("nrpersoane")
-
-        if nrpersoane is None:
-            _LOGGER.error("Eroare: NrPersoaneSensor nu a găsit date în coordinator.")
-            return "Unknown"
-
-        return nrpersoane
-
-    @property
-    def unique_id(self):
-        """Returnează ID-ul unic al senzorului."""
-#        return self._attr_unique_id
-        return f"{DOMAIN}_nrpersoane"
-
-    @property
-    def entity_id(self):
-        """Returnează ID-ul entității."""
-        return self._entity_id
-
-    @entity_id.setter
-    def entity_id(self, value):
-        """Setează ID-ul entității."""
-        self._entity_id = value
-
-    @property
-    def icon(self):
-        """Returnează iconița asociată senzorului."""
-        return self._icon
-
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
-
-    @property
-    def device_class(self):
-        """Return the state class of the sensor."""
-        return self._device_class
-
-    @property
-    def state_class(self):
-        """Return the state class of the sensor."""
-        return self._state_class
-
-    async def async_update(self):
-        """Actualizează starea senzorului cu datele din API."""
-        try:
-            self._state = await self.coordinator.async_get_nrpersoane()
-        except Exception as e:
-            _LOGGER.error("Eroare la actualizarea NrPersoaneSensor: %s", e)
-
-class TotalSensor(CoordinatorEntity, SensorEntity):
-    """Senzor pentru afișarea informațiilor despre totalul de plată."""
-
-    def __init__(self, coordinator, entry_id):
-        """Inițializează senzorul Total."""
-        super().__init__(coordinator)
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_total"
-        self._attr_name = "Total"
-        self.entity_id = "sensor.scomet_total"
-        #self._entity_id = f"sensor.{DOMAIN}_total"
-        #self._entity_id = f"sensor.{DOMAIN}_total"
-        self._attr_entity_id = "sensor.scomet_total"  # Correctly formatted entity ID
-        self._attr_icon = "mdi:sigma"
-        self._attr_device_class = "monetary"
-        self._attr_state_class = "measurement"
-        #self._attr_unit_of_measurement = "Lei"
-        self._unique_id = f"scomet_total"
-
-    @property
-    def state(self):
-        """Returnează starea senzorului total."""
-        _LOGGER.debug("State requested for Total: %s", self.coordinator.data)
-
-        if self.coordinator.data is None:
-            return "Unknown"
-
-        total = self.coordinator.data.get("total")
-
-        if total is None:
-            _LOGGER.error("Eroare: TotalSensor nu a găsit date în coordinator.")
-            return "Unknown"
-
-        return total
-
-    @property
-    def unique_id(self):
-        """Returnează ID-ul unic al senzorului."""
-        return f"{DOMAIN}_total"
-
-#    @property
-#    def entity_id(self):
-#        """Returnează ID-ul entității."""
-#        return self._entity_id
-
-#    @entity_id.setter
-#    def entity_id(self, value):
-#        """Setează ID-ul entității."""
-#        self._entity_id = value
-
-#    @property
-#    def icon(self):
-#        """Returnează iconița asociată senzorului."""
-#        return self._icon
-
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
-
-#    @property
-#    def device_class(self):
-#        """Return the device class of the sensor."""
-#        return "MONETARY"
-
-#    @property
-#    def state_class(self):
-#        """Return the state class of the sensor."""
-#        return "measurement"
-
-    async def async_update(self):
-        """Actualizează starea senzorului cu datele din API."""
-        try:
-            self._state = await self.coordinator.async_get_total()
-        except Exception as e:
-            _LOGGER.error("Eroare la actualizarea Totalului: %s", e)
-
-    @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement of the sensor."""
-        return "Lei"
-
-class SoldSensor(CoordinatorEntity, SensorEntity):
-    """Senzor pentru afișarea informațiilor despre soldul ramas."""
-
-    def __init__(self, coordinator, entry_id):
-        """Inițializează senzorul Sold."""
-        super().__init__(coordinator)
-        self._entry_id = entry_id
-        #self._attr_unique_id = f"{entry_id}_sold3"
-        self._attr_name = "Sold"
-        self.entity_id = f"sensor.{DOMAIN}_sold"
-        #self._entity_id = f"sensor.{DOMAIN}_sold2"
-        #self._attr_entity_id = "sensor.scomet_sold1"  # Correctly formatted entity ID
-        self._attr_icon = "mdi:sigma"
-        self._attr_device_class = "monetary"
-        self._attr_state_class = "measurement"
-        #self._attr_unit_of_measurement = "Lei"
-        self._unique_id = f"{DOMAIN}_sold"
-
-    @property
-    def state(self):
-        """Returnează starea senzorului (sold)."""
-        _LOGGER.debug("State requested for Sold: %s", self.coordinator.data)
-
-        if self.coordinator.data is None:
-            return "Unknown"
-
-        sold = self.coordinator.data.get("sold")
-
-        if sold is None:
-            _LOGGER.error("Eroare: SoldSensor nu a găsit date în coordinator.")
-            return "Unknown"
-
-        return sold
-
-    @property
-    def unique_id(self):
-        """Returnează ID-ul unic al senzorului."""
-        return "scomet_sold"
-
-#    @property
-#    def entity_id(self):
-#        """Returnează ID-ul entității."""
-#        return self._entity_id
-#
-#    @entity_id.setter
-#    def entity_id(self, value):
-#        """Setează ID-ul entității."""
-#        self._entity_id = value
-
-#    @property
-#    def icon(self):
-#        """Returnează iconița asociată senzorului."""
-#        return self._icon
-
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
-
-#    @property
-#    def device_class(self):
-#        """Return the device class of the sensor."""
-#        return "MONETARY"
-
-#    @property
-#    def state_class(self):
-#        """Return the state class of the sensor."""
-#        return "measurement"
-    
-    async def async_update(self):
-        """Actualizează starea senzorului cu datele din API."""
-        try:
-            self._state = await self.coordinator.async_get_sold()
-        except Exception as e:
-            _LOGGER.error("Eroare la actualizarea Soldului: %s", e)
-
-    @property
-    def unit_of_measurement(self):
-        """Return the measurement unit of the sensor."""
-        return "Lei"
-
-class DataFacturaSensor(CoordinatorEntity, SensorEntity):
-    """Senzor pentru afișarea informațiilor despre data de emitere a facturii."""
-
-    def __init__(self, coordinator, entry_id):
-        """Inițializează senzorul Data Factură."""
-        super().__init__(coordinator)
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_datafactura"
-        self._attr_name = "Dată emitere factură"
-        self._entity_id = f"sensor.{DOMAIN}_datafactura"
-        self._icon = "mdi:calendar"
-        self._device_class = "Device class"
-        self._state = "State"
-        self._state_class = "State class"
-
-    @property
-    def state(self):
-        """Returnează starea senzorului dată factură."""
-        _LOGGER.debug("State requested for Data factura: %s", self.coordinator.data)
-
-        if self.coordinator.data is None:
-            return "Unknown"
-
-        datafactura = self.coordinator.data.get("datafactura")
-
-        if datafactura is None:
-            _LOGGER.error("Eroare: DataFacturaSensor nu a găsit date în coordinator.")
-            return "Unknown"
+    @callback
+    def _migrate_unique_id(entity_entry: er.RegistryEntry) -> dict | None:
+        key = legacy_ids.get(entity_entry.unique_id)
+        if key is None:
+            return None
+        _LOGGER.debug("Migrare ID unic %s pentru %s", entity_entry.unique_id, entity_entry.entity_id)
+        return {"new_unique_id": f"{entry.entry_id}_{key}"}
 
-        return datafactura
+    await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
 
-    @property
-    def unique_id(self):
-        """Returnează ID-ul unic al senzorului."""
-        return f"{DOMAIN}_datafactura"
-
-    @property
-    def entity_id(self):
-        """Returnează ID-ul entității."""
-        return self._entity_id
+    # Creăm entitățile senzor, câte una pentru fiecare descriere
+    async_add_entities(ScometSensor(coordinator, description) for description in SENSORS)
 
-    @entity_id.setter
-    def entity_id(self, value):
-        """Setează ID-ul entității."""
-        self._entity_id = value
-
-    @property
-    def icon(self):
-        """Returnează iconița asociată senzorului."""
-        return self._icon
-
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
-
-    @property
-    def device_class(self):
-        """Return the state class of the sensor."""
-        return self._device_class
-
-    @property
-    def state_class(self):
-        """Return the state class of the sensor."""
-        return self._state_class
-
-class DataScadentaSensor(CoordinatorEntity, SensorEntity):
-    """Senzor pentru afișarea informațiilor despre data scadentă a facturii."""
-
-    def __init__(self, coordinator, entry_id):
-        """Inițializează senzorul Data Scadentă"""
-        super().__init__(coordinator)
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_datascadenta"
-        self._attr_name = "Dată scadentă factură"
-        self._entity_id = f"sensor.{DOMAIN}_datascadenta"
-        self._icon = "mdi:calendar-alert"
-        self._device_class = "Device class"
-        self._state = "State"
-        self._state_class = "State class"
-
-    @property
-    def state(self):
-        """Returnează starea senzorului dată scadentă."""
-        _LOGGER.debug("State requested for Data scadenta: %s", self.coordinator.data)
-
-        if self.coordinator.data is None:
-            return "Unknown"
-
-        datascadenta = self.coordinator.data.get("datascadenta")
-
-        if datascadenta is None:
-            _LOGGER.error("Eroare: DataScadentaSensor nu a găsit date în coordinator.")
-            return "Unknown"
-
-        return datascadenta
-
-    @property
-    def unique_id(self):
-        """Returnează ID-ul unic al senzorului."""
-        return f"{DOMAIN}_datascadenta"
-
-    @property
-    def entity_id(self):
-        """Returnează ID-ul entității."""
-        return self._entity_id
+    # Senzori de diagnostic (dezactivați implicit) pentru duratele și contoarele actualizărilor
+    async_add_entities(
+        ScometDiagnosticSensor(coordinator.api.metrics, entry.entry_id, description)
+        for description in DIAGNOSTIC_SENSORS
+    )
 
-    @entity_id.setter
-    def entity_id(self, value):
-        """Setează ID-ul entității."""
-        self._entity_id = value
-
-    @property
-    def icon(self):
-        """Returnează iconița asociată senzorului."""
-        return self._icon
-
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
-
-    @property
-    def device_class(self):
-        """Return the state class of the sensor."""
-        return self._device_class
-
-    @property
-    def state_class(self):
-        """Return the state class of the sensor."""
-        return self._state_class
-
-class CosnumApaSensor(CoordinatorEntity, SensorEntity):
-    """Senzor pentru afișarea informațiilor despre consumul de apă."""
-
-    def __init__(self, coordinator, entry_id):
-        """Inițializează senzorul consum apă rece"""
-        super().__init__(coordinator)
-        self._entry_id = entry_id
-        self._attr_unique_id = f"{entry_id}_consumaparece"
-        self._attr_name = "Consum Apă Rece"
-        self._entity_id = f"sensor.{DOMAIN}_consumaparece"
-        self._icon = "mdi:water-pump"
-        self._device_class = "Device class"
-        self._state = "State"
-        self._state_class = "State class"
-
-    @property
-    def state(self):
-        """Returnează starea senzorului consum apă."""
-        _LOGGER.debug("State requested for Consum Apa Rece: %s", self.coordinator.data)
-
-        if self.coordinator.data is None:
-            return "Unknown"
-
-        consumaparece = self.coordinator.data.get("consumaparece")
-
-        if consumaparece is None:
-            _LOGGER.error("Eroare: ConsumApaReceSensor nu a găsit date în coordinator.")
-            return "Unknown"
-
-        return consumaparece
+    _LOGGER.debug("Senzorii au fost adăugați pentru entry_id=%s", entry.entry_id)
 
-    @property
-    def unique_id(self):
-        """Returnează ID-ul unic al senzorului."""
-        return f"{DOMAIN}_consumaparece"
 
-    @property
-    def entity_id(self):
-        """Returnează ID-ul entității."""
-        return self._entity_id
+# Cheia fiecărei descrieri este cheia câmpului din `extract.FIELDS` / `extract.ScometData`
+SENSORS = (
+    SensorEntityDescription(
+        key="nrpersoane",
+        name="Număr persoane",
+        icon="mdi:account-multiple",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="total",
+        name="Total",
+        icon="mdi:sigma",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        native_unit_of_measurement="Lei",
+    ),
+    SensorEntityDescription(
+        key="sold",
+        name="Sold",
+        icon="mdi:sigma",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        native_unit_of_measurement="Lei",
+    ),
+    SensorEntityDescription(
+        key="datafactura",
+        name="Dată emitere factură",
+        icon="mdi:calendar",
+    ),
+    SensorEntityDescription(
+        key="datascadenta",
+        name="Dată scadentă factură",
+        icon="mdi:calendar-alert",
+    ),
+    SensorEntityDescription(
+        key="consumaparece",
+        name="Consum Apă Rece",
+        icon="mdi:water-pump",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfVolume.CUBIC_METERS,
+    ),
+)
+
+
+class ScometSensor(ScometEntity, SensorEntity):
+    """
+    Senzor pentru un câmp din datele coordinatorului.
+    Toate metadatele vin din `entity_description`; la fiecare scriere a stării
+    se citește doar valoarea câmpului din `coordinator.data`.
+    """
 
-    @entity_id.setter
-    def entity_id(self, value):
-        """Setează ID-ul entității."""
-        self._entity_id = value
+    def __init__(self, coordinator, description: SensorEntityDescription):
+        """Inițializează senzorul pentru câmpul `description.key`."""
+        # Contextul ascultătorului: coordinatorul ne trezește doar când câmpul nostru se schimbă
+        super().__init__(coordinator, context=description.key)
+        self.entity_description = description
+        self._key = description.key
+        # Entitățile existente sunt migrate în `async_setup_entry` și își păstrează entity_id-ul
+        self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{description.key}"
+
+    @property
+    def suggested_object_id(self) -> str:
+        """ID-ul propus entităților noi (`sensor.scomet_sold`); al doilea cont primește sufixul `_2`."""
+        return f"{DOMAIN}_{self._key}"
+
+    @property
+    def native_value(self):
+        """Valoarea câmpului din ultimul ciclu de actualizare."""
+        data = self.coordinator.data
+        return None if data is None else data.get(self._key)
+
+    async def async_update(self) -> None:
+        """
+        `homeassistant.update_entity`: recitește doar pagina câmpului. Actualizările cerute
+        pentru mai mulți senzori deodată sunt comasate într-un singur ciclu.
+        """
+        if self.enabled:
+            await self.coordinator.async_refresh_pages(page_urls([self._key]))
+
+
+@dataclass(frozen=True, kw_only=True)
+class ScometDiagnosticDescription(SensorEntityDescription):
+    """Descrierea unui senzor de diagnostic calculat din `metrics.ScometMetrics`."""
+
+    value_fn: Callable[[ScometMetrics], float | int | None]
+    attributes_fn: Callable[[ScometMetrics], dict] | None = None
+
+
+def _duration(key: str, name: str, timing: str, percent: float, per_page: bool = False) -> ScometDiagnosticDescription:
+    return ScometDiagnosticDescription(
+        key=key,
+        name=name,
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.stats(timing).percentile(percent),
+        # Percentila 95 pentru fiecare pagină, ca atribute
+        attributes_fn=(lambda metrics: metrics.pages(timing)) if per_page else None,
+    )
+
+
+def _counter(key: str, name: str, *counters: str) -> ScometDiagnosticDescription:
+    return ScometDiagnosticDescription(
+        key=key,
+        name=name,
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: sum(metrics.counters[counter] for counter in counters),
+        attributes_fn=lambda metrics: dict(metrics.counters),
+    )
+
+
+DIAGNOSTIC_SENSORS = (
+    _duration("refresh_p50", "Scomet durată actualizare p50", TIMING_REFRESH, 50),
+    _duration("refresh_p95", "Scomet durată actualizare p95", TIMING_REFRESH, 95),
+    _duration("login_p95", "Scomet durată autentificare p95", TIMING_LOGIN, 95),
+    _duration("fetch_p95", "Scomet durată descărcare pagină p95", TIMING_FETCH, 95, per_page=True),
+    _duration("parse_p95", "Scomet durată parsare pagină p95", TIMING_PARSE, 95, per_page=True),
+    _duration("extract_p95", "Scomet durată extragere câmpuri p95", TIMING_EXTRACT, 95, per_page=True),
+    _counter("relogins", "Scomet reautentificări", COUNTER_RELOGINS),
+    _counter("failures", "Scomet eșecuri", COUNTER_REFRESH_FAILURES, COUNTER_FETCH_FAILURES, COUNTER_LOGIN_FAILURES),
+    _counter("retries", "Scomet reîncercări", COUNTER_RETRIES),
+)
+
+
+class ScometDiagnosticSensor(SensorEntity):
+    """
+    Senzor de diagnostic pentru duratele și contoarele unui cont.
+    Se actualizează după fiecare ciclu (vezi `ScometMetrics.async_add_listener`),
+    nu doar când datele coordinatorului se schimbă.
+    """
 
-    @property
-    def icon(self):
-        """Returnează iconița asociată senzorului."""
-        return self._icon
+    _attr_should_poll = False
 
-    @property
-    def device_info(self):
-        """Informații despre dispozitiv pentru integrare."""
-        return {
-            "identifiers": {(DOMAIN, "scomet")},
-            "name": "Scomet: Administrăm confortul",
-            "manufacturer": "George Neagu (geotibi)",
-            "model": "Scomet: Administrăm confortul",
-            "entry_type": DeviceEntryType.SERVICE,
-        }
+    def __init__(self, metrics: ScometMetrics, entry_id: str, description: ScometDiagnosticDescription):
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_device_info = device_info(entry_id)
 
-    @property
-    def device_class(self):
-        """Return the state class of the sensor."""
-        return "WATER"
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._metrics.async_add_listener(self.async_write_ha_state))
 
     @property
-    def state_class(self):
-        """Return the state class of the sensor."""
-        return "measurement"
+    def native_value(self):
+        return self.entity_description.value_fn(self._metrics)
 
     @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement of the sensor."""
-        return "m³"
\ No newline at end of file
+    def extra_state_attributes(self):
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self._metrics)
@@ -0,0 +1,169 @@
+"""
+Serviciile integrării Scomet.
+
+  scomet.trace    pornește, prelungește sau oprește urmărirea cererilor
+                  (vezi `trace.RequestTrace`) și, la cerere, întoarce înregistrările.
+  scomet.refresh  recitește acum paginile (sau paginile câmpurilor) cerute, indiferent
+                  de scadența lor, și, la cerere, întoarce valorile actualizate. Apelurile
+                  apropiate sunt comasate într-un singur ciclu per cont.
+  scomet.history  întoarce din istoricul local (vezi `history.InvoiceHistory`) ultimele
+                  facturi, totalurile pe ani și facturile restante, fără cereri către portal.
+
+Serviciile sunt înregistrate odată cu prima intrare și scoase la descărcarea ultimei.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CLEAR, ATTR_CONFIG_ENTRY_ID, ATTR_COUNT, ATTR_DURATION, ATTR_FIELDS, ATTR_PAGES, ATTR_SAMPLE_RATE,
+    DOMAIN, HISTORY_DEFAULT_COUNT, SERVICE_HISTORY, SERVICE_REFRESH, SERVICE_TRACE, TRACE_DEFAULT_DURATION,
+    TRACE_MAX_DURATION,
+)
+from .extract import FIELDS, page_urls
+from .metrics import page_name
+from .scheduler import RefreshTiers
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DURATION, default=TRACE_DEFAULT_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=TRACE_MAX_DURATION)
+        ),
+        vol.Optional(ATTR_SAMPLE_RATE, default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional(ATTR_CLEAR, default=False): cv.boolean,
+    }
+)
+
+# Paginile după numele scurt (parametrul `submeniu`): situatie, facturi, consumuri
+PAGES = {page_name(url): url for url in RefreshTiers.PAGES}
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_PAGES): vol.All(cv.ensure_list, [vol.In(list(PAGES))]),
+        vol.Optional(ATTR_FIELDS): vol.All(cv.ensure_list, [vol.In([spec.key for spec in FIELDS])]),
+    }
+)
+
+HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_COUNT, default=HISTORY_DEFAULT_COUNT): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+def _coordinators(hass: HomeAssistant, call: ServiceCall) -> dict:
+    """Coordinatoarele vizate de apel: intrarea `config_entry_id` sau toate."""
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None:
+        return {entry_id: data["coordinator"] for entry_id, data in entries.items()}
+    if entry_id not in entries:
+        raise ServiceValidationError(f"Intrarea Scomet {entry_id} nu există sau nu este încărcată.")
+    return {entry_id: entries[entry_id]["coordinator"]}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Înregistrează serviciile integrării (o singură dată)."""
+    if hass.services.has_service(DOMAIN, SERVICE_TRACE):
+        return
+
+    @callback
+    def async_trace(call: ServiceCall) -> ServiceResponse:
+        """Pornește urmărirea pentru `duration` secunde (0 o oprește) și întoarce înregistrările."""
+        coordinators = _coordinators(hass, call)
+        for coordinator in coordinators.values():
+            trace = coordinator.api.trace
+            if call.data[ATTR_CLEAR]:
+                trace.clear()
+            trace.start(call.data[ATTR_DURATION], call.data[ATTR_SAMPLE_RATE])
+        if not call.return_response:
+            return None
+        return {"entries": {entry_id: coordinator.api.trace.as_dict() for entry_id, coordinator in coordinators.items()}}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_TRACE, async_trace, schema=TRACE_SCHEMA, supports_response=SupportsResponse.OPTIONAL
+    )
+
+    async def async_refresh(call: ServiceCall) -> ServiceResponse:
+        """
+        Recitește paginile cerute (`pages` și paginile câmpurilor `fields`; toate, dacă lipsesc amândouă)
+        și întoarce valorile câmpurilor cerute (sau ale paginilor recitite).
+        """
+        coordinators = _coordinators(hass, call)
+        pages = [PAGES[name] for name in call.data.get(ATTR_PAGES, [])]
+        keys = call.data.get(ATTR_FIELDS, [])
+        urls = list(dict.fromkeys([*pages, *(page_urls(keys) if keys else [])])) or None
+
+        results = await asyncio.gather(
+            *(coordinator.async_refresh_pages(urls) for coordinator in coordinators.values())
+        )
+        failed = {
+            entry_id: str(coordinator.last_exception)
+            for (entry_id, coordinator), success in zip(coordinators.items(), results)
+            if not success
+        }
+        if failed:
+            raise HomeAssistantError(f"Recitirea Scomet a eșuat: {failed}")
+        if not call.return_response:
+            return None
+
+        wanted = set(keys) | {spec.key for spec in FIELDS if spec.url in pages} or {spec.key for spec in FIELDS}
+        return {
+            "entries": {
+                entry_id: {
+                    "pages": [page_name(url) for url in urls or RefreshTiers.PAGES],
+                    "data": {key: value for key, value in (coordinator.data or {}).items() if key in wanted},
+                    "timestamp": coordinator.data_timestamp.isoformat() if coordinator.data_timestamp else None,
+                }
+                for entry_id, coordinator in coordinators.items()
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA, supports_response=SupportsResponse.OPTIONAL
+    )
+
+    @callback
+    def async_history(call: ServiceCall) -> ServiceResponse:
+        """Ultimele `count` facturi, totalurile pe ani și facturile restante la soldul curent."""
+        coordinators = _coordinators(hass, call)
+        today = dt_util.now().date()
+        # Anii devin chei text: răspunsul serviciului trebuie să fie JSON simplu
+        return {
+            "entries": {
+                entry_id: {
+                    "invoices": coordinator.history.last(call.data[ATTR_COUNT]),
+                    "yearly_totals": {
+                        str(year): total for year, total in coordinator.history.yearly_totals().items()
+                    },
+                    "overdue": coordinator.history.overdue(today, (coordinator.data or {}).get("sold")),
+                }
+                for entry_id, coordinator in coordinators.items()
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_HISTORY, async_history, schema=HISTORY_SCHEMA, supports_response=SupportsResponse.ONLY
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Scoate serviciile integrării (după descărcarea ultimei intrări)."""
+    hass.services.async_remove(DOMAIN, SERVICE_TRACE)
+    hass.services.async_remove(DOMAIN, SERVICE_REFRESH)
+    hass.services.async_remove(DOMAIN, SERVICE_HISTORY)
@@ -0,0 +1,246 @@
+"""
+Ciclul de viață al sesiunii deskis pentru scomet.ro.
+
+  - autentificarea rulează o singură dată, sub lock; apelanții concurenți o așteaptă;
+  - o sesiune expirată este detectată din răspuns (redirect sau pagina de login);
+  - cererea eșuată este reluată transparent după reautentificare;
+  - vârsta sesiunii este urmărită; după prima expirare observată, sesiunea este
+    reînnoită înainte de durata ei de viață.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from http.cookies import Morsel
+from typing import Awaitable, Callable, TypeVar
+
+import aiohttp
+from yarl import URL
+
+from .const import HEADERS_POST, URL_LOGIN, SESSION_REFRESH_MARGIN
+from .exceptions import ScometAuthError, ScometSessionExpired, ScometTransientError
+from .resilience import http_error
+from .trace import RequestTrace
+from .metrics import (
+    COUNTER_LOGIN_FAILURES, COUNTER_LOGINS, COUNTER_RELOGINS, TIMING_LOGIN, ScometMetrics,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Formularul de login apare doar pentru utilizatorii neautentificați
+LOGIN_FORM_MARKER = b'name="parola"'
+
+
+def is_login_page(response: aiohttp.ClientResponse, content: bytes | None = None) -> bool:
+    """Adevărat dacă serverul ne-a trimis la pagina de login în loc de pagina cerută."""
+    if response.history and "autentificare" in str(response.url):
+        return True
+    return content is not None and LOGIN_FORM_MARKER in content
+
+
+class ScometSession:
+    """Gestionează cookie-ul deskis al unui cont Scomet."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        limiter=None,
+        metrics: ScometMetrics | None = None,
+        trace: RequestTrace | None = None,
+    ):
+        self._session = session
+        self._limiter = limiter  # utils_http.HostLimiter comun, dacă există
+        self._metrics = metrics or ScometMetrics()
+        self._trace = trace or RequestTrace()
+        self._username = username
+        self._password = password
+        self._lock = asyncio.Lock()
+        self._cookie: Morsel | None = None
+        self._created: float | None = None  # time.monotonic() la login
+        self._created_wall: float | None = None  # time.time() la login, pentru persistare
+        self._lifetime: float | None = None  # Durata de viață observată a unei sesiuni (secunde)
+        self._generation = 0  # Crește la fiecare login reușit
+
+    @property
+    def cookie(self) -> Morsel | None:
+        """Cookie-ul deskis curent."""
+        return self._cookie
+
+    @property
+    def generation(self) -> int:
+        """Crește la fiecare login reușit; rezultatele legate de o sesiune o pot reține."""
+        return self._generation
+
+    @property
+    def relogins(self) -> int:
+        """Câte reautentificări au fost necesare după primul login."""
+        return self._metrics.counters[COUNTER_RELOGINS]
+
+    @property
+    def lifetime(self) -> float | None:
+        """Durata de viață observată a unei sesiuni, dacă a expirat deja vreuna."""
+        return self._lifetime
+
+    @property
+    def age(self) -> float | None:
+        """Vârsta sesiunii curente, în secunde."""
+        return None if self._created is None else time.monotonic() - self._created
+
+    @property
+    def refresh_age(self) -> float | None:
+        """
+        Vârsta la care sesiunea este reînnoită preventiv. Fără o durată de viață observată
+        (None) nu ghicim: folosim cookie-ul până când serverul ne trimite pagina de login
+        și atunci reautentificăm o singură dată (vezi `async_call`).
+        """
+        if self._lifetime is None:
+            return None
+        return self._lifetime * SESSION_REFRESH_MARGIN
+
+    @property
+    def is_valid(self) -> bool:
+        """Avem un cookie care nu a atins încă vârsta de reînnoire."""
+        if self._cookie is None:
+            return False
+        refresh_age = self.refresh_age
+        return refresh_age is None or self.age < refresh_age
+
+    async def async_login(self) -> bool:
+        """
+        Login and store the deskis cookie.
+        Return true if login is successful.
+        Dacă serverul nu răspunde (conexiune, timeout, HTTP 5xx), ridică `ScometTransientError`:
+        nu știm dacă datele de autentificare sunt bune, deci eșecul nu este definitiv.
+        """
+        try:
+            payload = {
+                "utilizator": self._username,
+                "parola": self._password,
+            }
+            # Urmărim doar răspunsul: corpul cererii conține parola
+            with self._trace.request("POST", URL_LOGIN, page="login") as record:
+                async with self._acquire(), self._session.post(URL_LOGIN, headers=HEADERS_POST, data=payload) as resp:
+                    RequestTrace.response(record, resp)
+                    if resp.status == 200:
+                        # Here we extract cookies from the response
+                        cookies = self._session.cookie_jar.filter_cookies(URL_LOGIN)
+                        deskis_cookie = cookies.get("deskis")  # Extract the deskis cookie
+                        RequestTrace.update(record, outcome="logged_in" if deskis_cookie else "no_cookie")
+                        if deskis_cookie:
+                            _LOGGER.debug("Autentificare reușită.")
+                            self._cookie = deskis_cookie
+                            self._created = time.monotonic()
+                            self._created_wall = time.time()
+                            self._generation += 1
+                            return True
+                        else:
+                            _LOGGER.error("Eroare: Nu s-a găsit cookie-ul deskis.")
+                    else:
+                        _LOGGER.error("Eroare HTTP la login: Status=%s", resp.status)
+                        error = http_error(URL_LOGIN, resp)
+                        if isinstance(error, ScometTransientError):
+                            self._forget()
+                            raise error
+        except (aiohttp.ClientError, TimeoutError) as err:
+            _LOGGER.error("Excepție în timpul autentificării: %s", err)
+            self._forget()
+            raise ScometTransientError(f"Login: {err}") from err
+
+        # Dacă nu a reușit
+        self._forget()
+        return False
+
+    def _forget(self) -> None:
+        self._cookie = None
+        self._created = None
+        self._created_wall = None
+
+    def _acquire(self):
+        return self._limiter.acquire(URL_LOGIN) if self._limiter else contextlib.nullcontext()
+
+    def export(self) -> dict | None:
+        """Starea sesiunii, serializabilă în JSON, pentru persistare între reporniri."""
+        if self._cookie is None:
+            return None
+        return {"value": self._cookie.value, "created": self._created_wall, "lifetime": self._lifetime}
+
+    def restore(self, value: str, created: float, lifetime: float | None = None) -> bool:
+        """
+        Refolosește un cookie deskis salvat anterior, dacă nu a atins vârsta de reînnoire.
+        Dacă serverul îl respinge totuși, expirarea este detectată la prima cerere.
+        """
+        if lifetime:
+            self._lifetime = lifetime
+        age = time.time() - created
+        refresh_age = self.refresh_age
+        if age < 0 or (refresh_age is not None and age >= refresh_age):
+            _LOGGER.debug("Cookie-ul deskis salvat are %.0f s; nu îl refolosim.", age)
+            return False
+
+        cookie = Morsel()
+        cookie.set("deskis", value, value)
+        self._session.cookie_jar.update_cookies({"deskis": value}, URL(URL_LOGIN))
+        self._cookie = cookie
+        self._created = time.monotonic() - age
+        self._created_wall = created
+        self._generation += 1
+        _LOGGER.debug("Cookie deskis restaurat (vârstă %.0f s).", age)
+        return True
+
+    async def async_ensure(self) -> int:
+        """
+        Garantează o sesiune validă și întoarce generația ei.
+        Un singur apelant face login; ceilalți așteaptă lock-ul și refolosesc rezultatul.
+        """
+        if self.is_valid:
+            return self._generation
+
+        async with self._lock:
+            if self.is_valid:
+                return self._generation
+
+            if self._cookie is not None:
+                _LOGGER.debug("Sesiunea deskis are %.0f s; o reînnoim preventiv.", self.age)
+            if self._generation:
+                self._metrics.increment(COUNTER_RELOGINS)
+            try:
+                with self._metrics.timed(TIMING_LOGIN):
+                    logged_in = await self.async_login()
+            except ScometTransientError:
+                self._metrics.increment(COUNTER_LOGIN_FAILURES)
+                raise
+            if not logged_in:
+                self._metrics.increment(COUNTER_LOGIN_FAILURES)
+                raise ScometAuthError("Autentificare eșuată! Nu s-a putut obține cookie-ul deskis.")
+            self._metrics.increment(COUNTER_LOGINS)
+            return self._generation
+
+    def _expire(self, generation: int) -> None:
+        """Marchează sesiunea `generation` drept expirată și reține cât a trăit."""
+        if generation != self._generation or self._cookie is None:
+            # Altcineva a făcut deja login după ce cererea noastră a pornit
+            return
+        _LOGGER.debug("Sesiunea deskis a expirat după %.0f s.", self.age)
+        self._lifetime = self.age if self._lifetime is None else min(self._lifetime, self.age)
+        self._forget()
+
+    async def async_call(self, request: Callable[[dict], Awaitable[_T]]) -> _T:
+        """
+        Rulează `request(cookies)` cu o sesiune validă.
+        Dacă cererea ridică `ScometSessionExpired`, reautentifică o singură dată și o reia.
+        """
+        generation = await self.async_ensure()
+        try:
+            return await request({"deskis": self._cookie})
+        except ScometSessionExpired:
+            self._expire(generation)
+
+        await self.async_ensure()
+        return await request({"deskis": self._cookie})
@@ -0,0 +1,164 @@
+"""
+Parsare incrementală, cu oprire timpurie, pentru paginile Scomet.
+
+`StreamingIndexer` primește pagina pe bucăți (`feed`) și construiește un
+`PageIndex` cu aceleași reguli ca `PageIndex.from_soup`, dar doar pentru
+porțiunea citită. Imediat ce locatorii tuturor câmpurilor cerute sunt rezolvați
+(`complete`), apelantul poate opri citirea răspunsului: restul paginii nu
+mai este descărcat, decodat sau ținut în memorie.
+"""
+
+from __future__ import annotations
+
+import logging
+from html.parser import HTMLParser
+
+from .extract import LOCATOR_IBOX, LOCATOR_LABEL, LOCATOR_TABLE, Locator, PageIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StreamingIndexer(HTMLParser):
+    """
+    Indexul incremental al unei pagini, până la rezolvarea tuturor `locators`
+    (de obicei locatorii câștigători ai câmpurilor, vezi `extract.LocatorCache.target`).
+    """
+
+    def __init__(self, locators: list[Locator]):
+        super().__init__(convert_charrefs=True)
+        self.index = PageIndex()
+        self._locators = list(locators)
+
+        self._heading: str | None = None  # Ultimul h5 văzut (titlul tabelului următor)
+        self._text: list[str] | None = None  # Textul elementului capturat acum
+        self._capture: str | None = None  # Eticheta elementului capturat: h5, td sau h1
+        self._label: str | None = None  # data-label al celulei capturate
+
+        self._divs = 0  # Adâncimea div-urilor deschise
+        self._ibox: int | None = None  # Adâncimea div-ului .ibox curent
+        self._ibox_part: tuple[str, int] | None = None  # ("ibox-title" / "ibox-content", adâncime)
+        self._ibox_title: str | None = None
+        self._ibox_value: str | None = None
+
+        self._tables = 0  # Adâncimea tabelelor deschise
+        self._table_heading: str | None = None
+        self._rows: list[list[str]] = []
+        self._row: list[str] | None = None
+
+    @property
+    def complete(self) -> bool:
+        """Toate câmpurile cerute pot fi rezolvate din porțiunea citită până acum."""
+        return all(self._resolved(locator) for locator in self._locators)
+
+    def _resolved(self, locator) -> bool:
+        # Doar titlurile exacte opresc citirea: potrivirea parțială din `PageIndex._match_title`
+        # s-ar putea să găsească alt titlu decât ar găsi-o pe pagina completă. Dacă titlul lipsește,
+        # pagina este citită până la capăt, iar lanțul de locatori de rezervă caută în toată pagina
+        if locator.kind == LOCATOR_IBOX:
+            return locator.name in self.index.iboxes
+        if locator.kind == LOCATOR_LABEL:
+            return len(self.index.labels.get(locator.name, ())) > locator.row
+        if locator.kind == LOCATOR_TABLE:
+            return locator.name in self.index.tables
+        return False
+
+    def _start_capture(self, tag: str, label: str | None = None) -> None:
+        self._capture, self._label, self._text = tag, label, []
+
+    def _end_capture(self) -> str:
+        text = "".join(self._text).strip()
+        self._capture, self._label, self._text = None, None, None
+        return text
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "td" and self._capture == "td":
+            # Celulă neînchisă explicit
+            self._finish_cell()
+
+        if tag == "div":
+            self._divs += 1
+            classes = (dict(attrs).get("class") or "").split()
+            if self._ibox is None and "ibox" in classes:
+                self._ibox = self._divs
+                self._ibox_title = self._ibox_value = None
+            elif self._ibox is not None and self._ibox_part is None:
+                for part in ("ibox-title", "ibox-content"):
+                    if part in classes:
+                        self._ibox_part = (part, self._divs)
+        elif tag == "h5":
+            self._start_capture("h5")
+        elif tag == "h1":
+            if (
+                self._ibox_part is not None
+                and self._ibox_part[0] == "ibox-content"
+                and self._ibox_value is None
+                and "no-margins" in (dict(attrs).get("class") or "").split()
+            ):
+                self._start_capture("h1")
+        elif tag == "table":
+            self._tables += 1
+            if self._tables == 1:
+                self._table_heading = self._heading
+                self._rows = []
+        elif tag == "tr":
+            if self._tables:
+                self._finish_row()
+                self._row = []
+        elif tag == "td":
+            label = dict(attrs).get("data-label")
+            if label is not None or self._row is not None:
+                self._start_capture("td", label)
+
+    def handle_endtag(self, tag):
+        if tag == "h5" and self._capture == "h5":
+            self._heading = self._end_capture()
+            if self._ibox_part is not None and self._ibox_part[0] == "ibox-title" and self._ibox_title is None:
+                self._ibox_title = self._heading
+        elif tag == "h1" and self._capture == "h1":
+            self._ibox_value = self._end_capture()
+        elif tag == "td" and self._capture == "td":
+            self._finish_cell()
+        elif tag == "tr":
+            self._finish_row()
+        elif tag == "table" and self._tables:
+            self._finish_table()
+        elif tag == "div" and self._divs:
+            self._finish_div()
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def _finish_cell(self) -> None:
+        label = self._label
+        text = self._end_capture()
+        if label is not None:
+            self.index.labels.setdefault(label, []).append(text)
+        if self._row is not None:
+            self._row.append(text)
+
+    def _finish_row(self) -> None:
+        if self._capture == "td":
+            self._finish_cell()
+        if self._row:
+            self._rows.append(self._row)
+        self._row = None
+
+    def _finish_table(self) -> None:
+        self._tables -= 1
+        if self._tables:
+            return
+        self._finish_row()
+        if self._table_heading is not None and self._table_heading not in self.index.tables:
+            self.index.tables[self._table_heading] = self._rows
+        self._rows = []
+        self._heading = None
+
+    def _finish_div(self) -> None:
+        if self._ibox_part is not None and self._ibox_part[1] == self._divs:
+            self._ibox_part = None
+        if self._ibox == self._divs:
+            if self._ibox_title and self._ibox_value:
+                self.index.iboxes.setdefault(self._ibox_title, self._ibox_value)
+            self._ibox = None
+        self._divs -= 1
@@ -0,0 +1,132 @@
+"""
+Modul de urmărire (trace) la cerere pentru cererile către scomet.ro.
+
+Implicit este oprit și costă o singură comparație pe cerere. Pornit (serviciul
+`scomet.trace`, pentru o durată limitată), reține pentru o parte din cereri
+(`sample_rate`) câte o înregistrare structurată: metoda, pagina, statusul,
+durata, octeții citiți, rezultatul și eroarea. Înregistrările stau într-un
+buffer circular de dimensiune fixă, iar cookie-urile și datele de
+autentificare nu ajung niciodată în ele: corpul cererii nu este reținut, iar
+din anteturile răspunsului păstrăm doar câteva, cu valorile sensibile ascunse.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import aiohttp
+from homeassistant.util import dt as dt_util
+
+from .const import TRACE_BUFFER_SIZE, TRACE_DEFAULT_DURATION, TRACE_MAX_DURATION
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "**REDACTED**"
+
+# Anteturile de răspuns reținute; cele din SENSITIVE_HEADERS apar doar ca REDACTED
+TRACED_HEADERS = (
+    aiohttp.hdrs.CONTENT_TYPE,
+    aiohttp.hdrs.CONTENT_LENGTH,
+    aiohttp.hdrs.CONTENT_ENCODING,
+    aiohttp.hdrs.ETAG,
+    aiohttp.hdrs.LAST_MODIFIED,
+    aiohttp.hdrs.LOCATION,
+    aiohttp.hdrs.RETRY_AFTER,
+    aiohttp.hdrs.SET_COOKIE,
+)
+SENSITIVE_HEADERS = frozenset({aiohttp.hdrs.SET_COOKIE, aiohttp.hdrs.COOKIE, aiohttp.hdrs.AUTHORIZATION})
+
+
+def redact_headers(headers) -> dict[str, str]:
+    """Anteturile urmărite din `headers`, cu valorile sensibile înlocuite."""
+    return {
+        name: REDACTED if name in SENSITIVE_HEADERS else headers[name]
+        for name in TRACED_HEADERS
+        if name in headers
+    }
+
+
+class RequestTrace:
+    """Buffer circular de înregistrări per cerere, pornit doar la cerere și doar pentru o durată limitată."""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE):
+        self._records: deque[dict] = deque(maxlen=size)
+        self._until = 0.0  # time.monotonic() până la care urmărirea este pornită
+        self.sample_rate = 1.0
+
+    @property
+    def enabled(self) -> bool:
+        return time.monotonic() < self._until
+
+    @property
+    def remaining(self) -> float:
+        """Secundele rămase până la oprirea automată."""
+        return max(0.0, self._until - time.monotonic())
+
+    def start(self, duration: float = TRACE_DEFAULT_DURATION, sample_rate: float = 1.0) -> None:
+        """Pornește (sau prelungește) urmărirea pentru `duration` secunde; 0 o oprește."""
+        duration = min(max(0.0, duration), TRACE_MAX_DURATION)
+        self._until = time.monotonic() + duration
+        self.sample_rate = min(max(0.0, sample_rate), 1.0)
+        if duration:
+            _LOGGER.debug("Urmărirea cererilor pornită pentru %.0f s (eșantionare %.0f%%).", duration, self.sample_rate * 100)
+
+    def stop(self) -> None:
+        self._until = 0.0
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def _sampled(self) -> bool:
+        return self.enabled and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    @contextmanager
+    def request(self, method: str, url: str, **fields):
+        """
+        Urmărește o cerere: produce înregistrarea ei (dict), pe care apelantul o completează
+        cu statusul și rezultatul, sau None dacă cererea nu este eșantionată.
+        Durata și eroarea (dacă apare) sunt adăugate la ieșire.
+        """
+        if not self._sampled():
+            yield None
+            return
+
+        record = {"time": dt_util.utcnow().isoformat(), "method": method, "url": url, **fields}
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as err:
+            record["error"] = f"{type(err).__name__}: {err}"
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self._records.append(record)
+
+    @staticmethod
+    def response(record: dict | None, response: aiohttp.ClientResponse) -> None:
+        """Completează înregistrarea cu statusul și anteturile (redactate) ale răspunsului."""
+        if record is not None:
+            record["status"] = response.status
+            record["headers"] = redact_headers(response.headers)
+
+    @staticmethod
+    def update(record: dict | None, **fields) -> None:
+        """Adaugă câmpuri înregistrării, dacă cererea este urmărită."""
+        if record is not None:
+            record.update(fields)
+
+    def records(self) -> list[dict]:
+        return list(self._records)
+
+    def as_dict(self) -> dict:
+        """Starea urmăririi și înregistrările, pentru diagnostice și răspunsul serviciului."""
+        return {
+            "enabled": self.enabled,
+            "remaining_s": round(self.remaining, 1),
+            "sample_rate": self.sample_rate,
+            "records": self.records(),
+        }
@@ -1,412 +1,610 @@
+import asyncio
+import codecs
+from concurrent.futures import Executor
+import hashlib
 import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import TypeVar
+from urllib.parse import urlsplit
 import aiohttp
-from bs4 import BeautifulSoup
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from .const import URL_LOGIN, HEADERS_POST, URL_SITUATIE, URL_PLATA, URL_FACTURI, URL_CONSUM_APA
+from homeassistant.util.ssl import client_context
+from .const import (
+    HEADERS_GET, HEADERS_POST, URL_PLATA, PAYMENT_URL_TTL,
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_PAGE_TIMEOUT, PAGE_ENCODING, STREAM_CHUNK_SIZE, STREAM_DRAIN_LIMIT,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_KEEPALIVE, HTTP_DNS_TTL, HUB_MAX_CONNECTIONS,
+    DEFAULT_PARSE_MODE, PARSE_MODE_LOOP, PARSE_MODE_PROCESS,
+)
+from .extract import FieldSpec, LocatorCache, PageIndex, extract, fields_for, page_kinds
+from .exceptions import ScometAuthError, ScometSessionExpired
+from .htmlindex import ChildFunction
+from .metrics import (
+    COUNTER_FETCH_FAILURES, COUNTER_PAGES_CHANGED, COUNTER_PAGES_UNCHANGED, COUNTER_RETRIES, COUNTER_SHARED_REQUESTS,
+    TIMING_EXTRACT, TIMING_FETCH, TIMING_PARSE, ScometMetrics, page_name,
+)
+from .parsers import BACKEND_SELECTOLAX, best_backend, parse_bytes
+from .resilience import RetryPolicy, http_error
+from .session import LOGIN_FORM_MARKER, ScometSession, is_login_page
+from .streaming import StreamingIndexer
+from .trace import RequestTrace
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Parsarea trimisă pool-ului de procese (vezi hub.ScometHub.async_setup)
+_CHILD_INDEX_BYTES = ChildFunction("index_bytes")
+
+try:
+    from aiohttp.compression_utils import HAS_BROTLI
+except ImportError:
+    HAS_BROTLI = False
+
+# Cerem br doar dacă aiohttp îl poate decomprima (pachetul Brotli instalat)
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+
+def create_connector() -> aiohttp.TCPConnector:
+    """
+    Pool-ul de conexiuni către scomet.ro: conexiunile rămân deschise între cereri,
+    iar adresa rezolvată este refolosită, așa că un ciclu nu mai plătește DNS și TLS la fiecare pagină.
+    """
+    return aiohttp.TCPConnector(
+        ssl=client_context(),
+        limit=HUB_MAX_CONNECTIONS,
+        limit_per_host=HUB_MAX_CONNECTIONS,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        ttl_dns_cache=HTTP_DNS_TTL,
+    )
+
+
+def create_client_session(connector: aiohttp.BaseConnector, connector_owner: bool = False) -> aiohttp.ClientSession:
+    """
+    Sesiunea HTTP a unui cont: cookie-uri proprii (doar ale scomet.ro, nu și ale altor integrări)
+    și timeout-uri explicite pentru conectare și citire, peste `connector`.
+    """
+    return aiohttp.ClientSession(
+        connector=connector,
+        connector_owner=connector_owner,
+        cookie_jar=aiohttp.CookieJar(),
+        timeout=aiohttp.ClientTimeout(
+            total=DEFAULT_PAGE_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT
+        ),
+        headers={aiohttp.hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING},
+    )
+
+
 class ScometAPI:
     """
     Manager for SCOMET integration
     Authenticate and get data from the server.
     """
 
-    def __init__(self, hass: HomeAssistant, username: str, password: str):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        parser_backend: str | None = None,
+        shared_limiter: "HostLimiter | None" = None,
+        stream: bool | None = None,
+        http_session: aiohttp.ClientSession | None = None,
+        retry: RetryPolicy | None = None,
+        parse_mode: str = DEFAULT_PARSE_MODE,
+        parse_executor: Executor | None = None,
+    ):
         self._hass = hass
         self._username = username
         self._password = password
-        self._session = async_get_clientsession(self._hass)
-        self._cookies = None
-        self._deskis_cookie = None  # New variable to store deskis cookie
-    
+        # Sesiunea HTTP proprie contului (vezi hub.ScometHub.async_create_session); închisă de async_close
+        self._session = http_session or create_client_session(create_connector(), connector_owner=True)
+        # Limita contului, plus limita comună tuturor conturilor (vezi hub.ScometHub)
+        self._limiter = HostLimiter(max_concurrency)
+        self._shared_limiter = shared_limiter or HostLimiter(max_concurrency)
+        # Duratele login/descărcare/parsare/extragere și contoarele contului
+        self.metrics = ScometMetrics()
+        # Înregistrările per cerere, doar cât timp urmărirea este pornită (serviciul scomet.trace)
+        self.trace = RequestTrace()
+        # Locatorii care au găsit ultima dată fiecare câmp, per structură de pagină (salvați de coordinator)
+        self.locators = LocatorCache()
+        # Cererile identice aflate în curs (de la coordinator, buton, serviciu) împart aceeași execuție
+        self._flight = SingleFlight(lambda: self.metrics.increment(COUNTER_SHARED_REQUESTS))
+        self._auth = ScometSession(
+            self._session, username, password, self._shared_limiter, self.metrics, self.trace
+        )
+        # Erorile temporare (timeout, 5xx) sunt reîncercate cu backoff; cele permanente nu
+        self._retry = retry or RetryPolicy()
+        self._parser_backend = parser_backend or best_backend()
+        # Parsarea completă rulează într-un fir sau proces separat (hub.ScometHub.parse_executor),
+        # ca bucla de evenimente să nu se blocheze; fără executor dedicat, în executorul Home Assistant
+        self._parse_mode = parse_mode
+        self._parse_executor = parse_executor
+        # Parsarea incrementală cu oprire timpurie costă mai puțin CPU decât parsarea completă cu
+        # BeautifulSoup, dar mai mult decât selectolax; implicit o folosim doar fără selectolax
+        self._stream = self._parser_backend != BACKEND_SELECTOLAX if stream is None else stream
+        self._pages: dict[str, PageState] = {}  # Ultima versiune văzută a fiecărei pagini
+        self._payment_checked: tuple[float, int] | None = None  # (time.monotonic(), generația sesiunii)
+        _LOGGER.debug("Backend de parsare HTML: %s", self._parser_backend)
+
     @property
     def deskis_cookie(self):
         """Return the stored deskis cookie."""
-        return self._deskis_cookie
+        return self._auth.cookie
+
+    @property
+    def session(self) -> ScometSession:
+        """Sesiunea deskis a contului."""
+        return self._auth
+
+    def configure(self, max_concurrency: int, parse_mode: str, parse_executor: Executor | None) -> None:
+        """Aplică opțiunile schimbate ale contului; cererile deja pornite își termină limita veche."""
+        self._limiter = HostLimiter(max_concurrency)
+        self._parse_mode = parse_mode
+        self._parse_executor = parse_executor
+
+    async def async_close(self) -> None:
+        """Închide sesiunea HTTP a contului (la descărcarea intrării), după cererile încă în curs."""
+        await self._flight.async_cancel()
+        await self._session.close()
 
     async def async_login(self) -> bool:
         """
         Login and store cookies for session management.
         Return true if login is successful.
         """
-        try:
-            payload = {
-                "utilizator": self._username,
-                "parola": self._password,
-            }
-            async with self._session.post(URL_LOGIN, headers=HEADERS_POST, data=payload) as resp:
-                if resp.status == 200:
-                    # Here we extract cookies from the response
-                    self._cookies = self._session.cookie_jar.filter_cookies(URL_LOGIN)
-                    self._deskis_cookie = self._cookies.get("deskis")  # Extract the deskis cookie
-                    if self._deskis_cookie:
-                        _LOGGER.error("Autentificare reușită, deskis cookie: %s", self._deskis_cookie)
-                        return True
-                    else:
-                        _LOGGER.error("Eroare: Nu s-a găsit cookie-ul deskis.")
-                else:
-                    _LOGGER.error("Eroare HTTP la login: Status=%s", resp.status)
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Excepție în timpul autentificării: %s", err)
-
-        # Dacă nu a reușit
-        self._cookies = None
-        self._deskis_cookie = None
-        return False
+        return await self._auth.async_login()
 
     async def _ensure_valid_cookie(self):
         """
-        Verifică dacă cookie-ul este valid și reautentifică dacă este necesar.
+        Verifică dacă sesiunea este validă și reautentifică dacă este necesar
+        (cookie lipsă sau sesiune prea veche). Un login eșuat temporar (5xx, timeout) este reîncercat.
         """
-        if not self._deskis_cookie:
-            _LOGGER.debug("Cookie deskis inexistent. Încercăm autentificarea...")
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                raise Exception("Autentificare eșuată! Nu s-a putut obține cookie-ul deskis.")
-        else:
-            # Optionally, you can test the validity of the cookie by making a lightweight request.
-            _LOGGER.debug("Cookie deskis este setat. Presupunem că este valid.")
-
+        await self._async_retry(self._auth.async_ensure)
 
     async def async_request(self, url: str) -> dict | None:
         """
         GET request with cookies for session management.
         If no previous session, it will try to log in.
         """
-        # Dacă nu avem cookies, încercăm să ne autentificăm
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookies de autentificare.")
-                return None
-
         # We now use the extracted deskis cookie for the GET request
         headers = {
             "accept": "application/json",
             "user-agent": HEADERS_POST["User-Agent"],
         }
-        
-        cookies = {
-            "deskis": self._deskis_cookie
-        }
 
-        try:
+        async def request(cookies):
             async with self._session.get(url, headers=headers, cookies=cookies) as resp:
+                if is_login_page(resp):
+                    raise ScometSessionExpired(url)
                 if resp.status == 200:
                     data = await resp.json()
-                    _LOGGER.error("Răspuns OK de la %s: %s", url, data)
+                    _LOGGER.debug("Răspuns OK de la %s", url)
                     return data
-                else:
-                    _LOGGER.error("Eroare la request: Status=%s, URL=%s, Răspuns=%s",resp.status, url, await resp.text())
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Eroare conexiune la URL=%s: %s", url, err)
-
-        return None
-
-    async def async_get_nrpersoane(self):
-        url = URL_SITUATIE
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis.")
+                _LOGGER.error("Eroare la request: Status=%s, URL=%s", resp.status, url)
                 return None
 
-        headers = HEADERS_POST
-
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
-
         try:
-            async with self._session.get(url, headers=headers, cookies=cookies) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch data: HTTP {response.status}")
+            return await self._flight.async_do(
+                ("json", url, self._auth.generation), lambda: self._auth.async_call(request)
+            )
+        except ScometAuthError:
+            _LOGGER.error("Eroare: Nu s-a putut obține cookies de autentificare.")
+        except aiohttp.ClientError as err:
+            _LOGGER.error("Eroare conexiune la URL=%s: %s", url, err)
 
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
+        return None
 
-                # Find the div that contains "Numar curent persoane"
-                num_pers_div = None
-                for div in soup.find_all("div", class_="ibox-title"):
-                    if div.find("h5") and "Numar curent  persoane" in div.find("h5").text:
-                        num_pers_div = div.find_parent("div", class_="ibox")
-                        break
+    def snapshot(self, full_pages=None) -> "PageSnapshot":
+        """
+        Creează un instantaneu nou de pagini pentru un ciclu de actualizare.
+        `full_pages` sunt paginile de care cineva are nevoie în întregime (de exemplu tot
+        tabelul de facturi); celelalte pot fi citite doar până la câmpurile cerute.
+        Implicit (None), toate paginile sunt citite complet.
+        """
+        return PageSnapshot(self, full_pages if self._stream else None)
 
-                if not num_pers_div:
-                    raise Exception("Could not find the section for 'Numar curent persoane'.")
+    async def async_fetch_page(self, url: str, keys: frozenset[str] | None = None) -> tuple[PageIndex, bool]:
+        """
+        Descarcă o pagină autentificată și întoarce indexul ei (vezi `extract.PageIndex`)
+        și dacă pagina s-a schimbat față de ultima descărcare.
+        Cu `keys`, pagina este parsată pe măsură ce sosește, iar citirea se oprește
+        imediat ce câmpurile `keys` sunt rezolvate; indexul conține doar porțiunea citită.
+        Pentru o pagină neschimbată (304 sau octeți identici) se refolosește indexul anterior, fără parsare.
+        Dacă sesiunea a expirat, reautentifică și reia cererea o singură dată.
+        Erorile temporare sunt reîncercate (vezi `resilience.RetryPolicy`); dacă tot nu reușim,
+        ridică `ScometTransientError` / o eroare aiohttp, iar pentru autentificare sau alt
+        răspuns decât 200 ridică `ScometPermanentError`.
+        Apelurile concurente pentru aceeași pagină, în aceeași sesiune, împart o singură descărcare
+        și același index; o descărcare completă în curs servește și cererile parțiale.
+        """
+        generation = self._auth.generation
+        return await self._flight.async_do(
+            ("page", url, keys, generation),
+            lambda: self._async_retry(
+                lambda: self._auth.async_call(lambda cookies: self._async_fetch_page(url, cookies, keys))
+            ),
+            also=(("page", url, None, generation),) if keys else (),
+        )
+
+    async def _async_retry(self, func):
+        return await self._retry.async_call(func, on_retry=lambda _err: self.metrics.increment(COUNTER_RETRIES))
+
+    async def _async_fetch_page(self, url: str, cookies: dict, keys: frozenset[str] | None) -> tuple[PageIndex, bool]:
+        state = self._pages.get(url)
+        if state and not state.covers(keys):
+            # Indexul păstrat este parțial și nu conține tot ce ni se cere acum
+            state = None
+        page = page_name(url)
+        headers = dict(HEADERS_POST)
+        if state:
+            # Cereri condiționate, dacă serverul ne-a dat validatori
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+
+        async with self._limiter.acquire(url), self._shared_limiter.acquire(url), asyncio.timeout(DEFAULT_PAGE_TIMEOUT):
+            # Cronometrăm doar cererea, nu și așteptarea unui loc la limitatoare
+            with self.metrics.timed(TIMING_FETCH, page), self.trace.request("GET", url, page=page) as record:
+                async with self._session.get(url, headers=headers, cookies=cookies) as response:
+                    RequestTrace.response(record, response)
+                    if response.status == 304 and state:
+                        _LOGGER.debug("Pagină nemodificată (304): %s", url)
+                        self.metrics.increment(COUNTER_PAGES_UNCHANGED)
+                        RequestTrace.update(record, outcome="not_modified")
+                        return state.index, False
+
+                    if response.status != 200:
+                        raise http_error(url, response)
+
+                    etag = response.headers.get(aiohttp.hdrs.ETAG)
+                    last_modified = response.headers.get(aiohttp.hdrs.LAST_MODIFIED)
+
+                    if keys:
+                        index, fingerprint, size = await self._async_stream_page(
+                            response, url, [spec for spec in fields_for(keys) if spec.url == url], state
+                        )
+                    else:
+                        # Decodăm noi octeții, fără detecția (lentă) de codificare din response.text()
+                        content = await response.read()
+                        if is_login_page(response, content):
+                            raise ScometSessionExpired(url)
+                        fingerprint = hashlib.blake2b(content, digest_size=16).digest()
+                        index, size = None, len(content)
+                    charset = response.charset
+                    RequestTrace.update(record, bytes=size, partial=bool(keys))
+
+        if state and state.fingerprint == fingerprint:
+            _LOGGER.debug("Pagină identică cu ciclul anterior: %s", url)
+            self.metrics.increment(COUNTER_PAGES_UNCHANGED)
+            RequestTrace.update(record, outcome="unchanged")
+            state.etag, state.last_modified = etag, last_modified
+            return state.index, False
+
+        self.metrics.increment(COUNTER_PAGES_CHANGED)
+        RequestTrace.update(record, outcome="changed")
+        if index is None:
+            _LOGGER.debug("Pagină descărcată: %s (%s octeți)", url, len(content))
+            with self.metrics.timed(TIMING_PARSE, page):
+                index = await self._async_parse(content, charset, url)
+        self._pages[url] = PageState(fingerprint, etag, last_modified, index, keys or None, size)
+        return index, True
+
+    async def _async_parse(self, content: bytes, charset: str | None, url: str) -> PageIndex:
+        """Parsează pagina în afara buclei de evenimente, conform `parse_mode`."""
+        if self._parse_mode == PARSE_MODE_LOOP:
+            return parse_bytes(content, charset, url, self._parser_backend)
+        if self._parse_executor is None:
+            return await self._hass.async_add_executor_job(parse_bytes, content, charset, url, self._parser_backend)
+        loop = asyncio.get_running_loop()
+        if self._parse_mode == PARSE_MODE_PROCESS:
+            # Procesul copil primește doar octeții și întoarce dicționarele indexului (vezi htmlindex)
+            parts = await loop.run_in_executor(
+                self._parse_executor, _CHILD_INDEX_BYTES,
+                content, charset or PAGE_ENCODING, page_kinds(url), self._parser_backend,
+            )
+            return PageIndex(*parts)
+        return await loop.run_in_executor(self._parse_executor, parse_bytes, content, charset, url, self._parser_backend)
+
+    async def _async_stream_page(
+        self, response: aiohttp.ClientResponse, url: str, specs: list[FieldSpec], state: "PageState | None"
+    ) -> tuple[PageIndex, bytes, int]:
+        """
+        Citește răspunsul pe bucăți, le parsează pe măsură ce sosesc și se oprește când câmpurile
+        `specs` sunt rezolvate. Întoarce indexul porțiunii citite, amprenta și lungimea ei.
+        Dacă primii octeți sunt identici cu porțiunea citită data trecută (`state`), nu mai parsăm nimic.
+        Doar parsarea se oprește devreme: restul corpului este citit și aruncat (vezi `_async_drain`).
+        """
+        indexer = StreamingIndexer([self.locators.target(spec) for spec in specs])
+        decoder = codecs.getincrementaldecoder(response.charset or PAGE_ENCODING)(errors="replace")
+        hasher = hashlib.blake2b(digest_size=16)
+        # Octeții citiți cât timp pot fi încă identici cu porțiunea din ciclul anterior
+        pending = bytearray() if state else None
+        tail = b""  # Sfârșitul bucății anterioare, dacă marcajul de login cade între două bucăți
+        size = 0
+        parse_seconds = 0.0
+
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            if is_login_page(response, tail + chunk):
+                raise ScometSessionExpired(url)
+            tail = chunk[-len(LOGIN_FORM_MARKER):]
+
+            if pending is not None:
+                pending += chunk
+                if len(pending) < state.size:
+                    continue
+                if hashlib.blake2b(pending[:state.size], digest_size=16).digest() == state.fingerprint:
+                    await self._async_drain(response, url)
+                    return state.index, state.fingerprint, state.size
+                chunk, pending = bytes(pending), None
+
+            hasher.update(chunk)
+            size += len(chunk)
+            start = time.perf_counter()
+            indexer.feed(decoder.decode(chunk))
+            parse_seconds += time.perf_counter() - start
+            if indexer.complete:
+                await self._async_drain(response, url)
+                break
+        else:
+            if pending:
+                # Pagina s-a terminat înainte de lungimea porțiunii anterioare
+                hasher.update(pending)
+                size += len(pending)
+                indexer.feed(decoder.decode(bytes(pending)))
+            indexer.feed(decoder.decode(b"", final=True))
+            indexer.close()
+
+        _LOGGER.debug("Pagină citită incremental: %s (%s octeți, completă: %s)", url, size, indexer.complete)
+        self.metrics.record(TIMING_PARSE, parse_seconds * 1000, page_name(url))
+        return indexer.index, hasher.digest(), size
+
+    @staticmethod
+    async def _async_drain(response: aiohttp.ClientResponse, url: str) -> None:
+        """
+        Citește și aruncă restul corpului, fără parsare. Un corp necitit până la capăt face ca
+        aiohttp să închidă conexiunea în loc să o întoarcă în pool (iar următoarea cerere plătește
+        din nou TCP + TLS). Peste `STREAM_DRAIN_LIMIT` octeți renunțăm și lăsăm conexiunea închisă.
+        """
+        drained = 0
+        while drained <= STREAM_DRAIN_LIMIT:
+            chunk = await response.content.readany()
+            if not chunk:
+                return
+            drained += len(chunk)
+        _LOGGER.debug("Rest de pagină prea mare (peste %s octeți), conexiunea este închisă: %s", drained, url)
+
+    async def async_get_fields(self, snapshot: "PageSnapshot | None" = None, keys=None) -> dict:
+        """
+        Extrage câmpurile cerute (toate, implicit) conform specificațiilor din `extract.FIELDS`.
+        Paginile necesare sunt descărcate în paralel; o pagină care eșuează
+        lasă pe None doar câmpurile ei.
+        """
+        snapshot = snapshot or self.snapshot()
+        specs = fields_for(keys)
 
-                # Extract the number inside the h1 tag within the found section
-                h1_tag = num_pers_div.select_one("div.ibox-content h1.no-margins")
-                if not h1_tag:
-                    raise Exception("Could not find the number of people inside the correct section.")
+        by_page: dict[str, list] = {}
+        for spec in specs:
+            by_page.setdefault(spec.url, []).append(spec)
 
-                # Extract and convert to integer
-                num_people = int(float(h1_tag.text.strip()))
-                _LOGGER.debug("Nr. persoane extras corect: %s", num_people)
+        await snapshot.async_prefetch(*by_page, keys=keys)
 
-                return num_people
+        data = {}
+        for url, page_specs in by_page.items():
+            try:
+                index = await snapshot.async_get(url)
+            except Exception:
+                # Eroarea a fost deja raportată la descărcare
+                data.update((spec.key, None) for spec in page_specs)
+                continue
+            with self.metrics.timed(TIMING_EXTRACT, page_name(url)):
+                data.update(extract(page_specs, index, self.locators))
 
-        except Exception as e:
-            _LOGGER.error("Error in async_get_nrpersoane: %s", e)
-            return None
+        return data
 
-    async def async_get_total(self):
-        url = URL_FACTURI
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis pentru datafactura.")
-                return None
+    async def async_get_payment_url(self, max_age: float = PAYMENT_URL_TTL):
+        """
+        Obține URL-ul paginii de plată utilizând cookie-ul deskis.
+        Nu face parte din actualizarea periodică: este cerut doar la apăsarea butonului
+        (sau pregătit din timp înainte de scadență). O verificare reușită este refolosită
+        `max_age` secunde, cât timp sesiunea deskis rămâne aceeași.
+        """
 
-        headers = HEADERS_POST
+        url = URL_PLATA # Payment page URL
 
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
+        if self._payment_checked and self._auth.is_valid:
+            checked, generation = self._payment_checked
+            if generation == self._auth.generation and time.monotonic() - checked < max_age:
+                return url
+
+        async def request(cookies):
+            with self.trace.request("GET", url, page=page_name(url)) as record:
+                async with self._session.get(url, headers=HEADERS_GET, cookies=cookies) as response:
+                    RequestTrace.response(record, response)
+                    if response.status != 200:
+                        raise http_error(url, response)
+                    if is_login_page(response, await response.read()):
+                        raise ScometSessionExpired(url)
+
+                _LOGGER.debug("Accesare pagină de plată reușită: %s", url)
+                self._payment_checked = (time.monotonic(), self._auth.generation)
+                return url  # ✅ Return the payment page URL
 
         try:
-            async with self._session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch data: HTTP {response.status}")
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
-
-            # Find the first <td> with data-label="Data" and extract the text (date)
-            first_total_td = soup.find("td", {"data-label": "Valoare"})
-            if not first_total_td:
-                raise Exception("Could not find the total with data-label='Valoare'.")
-
-            # Extract the date from the text content of the <td>
-            total_value = first_total_td.text.strip().replace(",", ".")
-            _LOGGER.info(f"Found total_value: {total_value}")
-            total=float(total_value)
-            _LOGGER.info(f"Found total: {total}")
-            return total
+            # Apăsări repetate ale butonului sau pregătirea din timp, în paralel: o singură verificare
+            return await self._flight.async_do(
+                ("payment", url, self._auth.generation),
+                lambda: self._async_retry(lambda: self._auth.async_call(request)),
+            )
 
         except Exception as e:
-            _LOGGER.error(f"Error occurred while extracting total: {str(e)}")
+            _LOGGER.error("Error in async_get_payment_url: %s", e)
             return None
-        
-    async def async_get_sold(self):
-        url = URL_SITUATIE
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis.")
-                return None
 
-        headers = HEADERS_POST
-
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
-
-        try:
-            async with self._session.get(url, headers=headers, cookies=cookies) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch data: HTTP {response.status}")
 
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
 
-                # Find the div that contains "Sold profilul curent"
-                sold_div = None
-                for div in soup.find_all("div", class_="ibox-title"):
-                    if div.find("h5") and "Sold profilul curent" in div.find("h5").text:
-                        sold_div = div.find_parent("div", class_="ibox")
-                        break
+@dataclass
+class PageState:
+    """Amprenta și validatorii HTTP ai ultimei versiuni a unei pagini, împreună cu indexul ei."""
 
-                if not sold_div:
-                    raise Exception("Could not find the section for 'Sold profilul curent'.")
+    fingerprint: bytes
+    etag: str | None
+    last_modified: str | None
+    index: PageIndex
+    keys: frozenset[str] | None = None  # Pentru un index parțial (citit incremental), câmpurile pe care le conține
+    size: int = 0  # Octeții acoperiți de amprentă (pentru un index parțial, porțiunea citită)
 
-                # Extract the number inside the h1 tag within the found section
-                h1_tag = sold_div.select_one("div.ibox-content h1.no-margins")
-                if not h1_tag:
-                    raise Exception("Could not find sold inside the correct section.")
+    def covers(self, keys: frozenset[str] | None) -> bool:
+        """Indexul conține tot ce trebuie pentru câmpurile `keys` (None = toată pagina)."""
+        return self.keys is None or (keys is not None and keys <= self.keys)
 
-                # Extract and Convert ->"341,63" → "341.63" → float
-                sold_value = h1_tag.text.strip().replace(",", ".")
-                sold = float(sold_value)
 
-                _LOGGER.debug("Sold extras corect: %s", sold)
-
-                return sold
-
-        except Exception as e:
-            _LOGGER.error("Error in async_get_sold: %s", e)
-            return None
-        
-    async def async_get_datafactura(self):
-        url = URL_FACTURI
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis pentru datafactura.")
-                return None
-
-        headers = HEADERS_POST
-
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
-
-        try:
-            async with self._session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch data: HTTP {response.status}")
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
-
-            # Find the first <td> with data-label="Data" and extract the text (date)
-            first_date_td = soup.find("td", {"data-label": "Data"})
-            if not first_date_td:
-                raise Exception("Could not find a date with data-label='Data'.")
-
-            # Extract the date from the text content of the <td>
-            date = first_date_td.text.strip()
-            _LOGGER.info(f"Found date: {date}")
-            return date
-
-        except Exception as e:
-            _LOGGER.error(f"Error occurred while extracting data: {str(e)}")
-            return None
-        
-
-    async def async_get_datascadenta(self):
-        url = URL_FACTURI
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis pentru datafactura.")
-                return None
+class SingleFlight:
+    """
+    Deduplicarea apelurilor aflate în curs: apelurile concurente cu aceeași cheie împart o singură
+    execuție și același rezultat (sau aceeași excepție). Cheia este ștearsă când execuția se încheie,
+    așa că un apel ulterior pornește una nouă; nimic nu este păstrat ca un cache.
+    """
 
-        headers = HEADERS_POST
+    def __init__(self, on_shared: Callable[[], None] | None = None):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._on_shared = on_shared
 
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
+    def __len__(self) -> int:
+        return len(self._calls)
 
-        try:
-            async with self._session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch data: HTTP {response.status}")
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
-
-            # Find the first <td> with data-label="Data" and extract the text (date)
-            first_date_td = soup.find("td", {"data-label": "Data scadenta"})
-            if not first_date_td:
-                raise Exception("Could not find a date with data-label='Data scadenta'.")
-
-            # Extract the date from the text content of the <td>
-            datascadenta = first_date_td.text.strip()
-            _LOGGER.info(f"Found date: {datascadenta}")
-            return datascadenta
-
-        except Exception as e:
-            _LOGGER.error(f"Error occurred while extracting datascadenta: {str(e)}")
-            return None
-        
-    async def async_get_consumaparece(self):
-        url = URL_CONSUM_APA
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis pentru datafactura.")
-                return None
+    async def async_do(self, key: Hashable, func: Callable[[], Awaitable[_T]], also: tuple = ()) -> _T:
+        """
+        Rezultatul lui `func()`, sau al execuției deja pornite pentru `key` ori pentru una dintre
+        cheile `also` (execuții care acoperă și cererea de față, de exemplu o pagină completă).
+        """
+        for candidate in (key, *also):
+            task = self._calls.get(candidate)
+            if task is not None:
+                if self._on_shared:
+                    self._on_shared()
+                # shield: anularea unui apelant nu anulează execuția pentru ceilalți
+                return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(func())
+        self._calls[key] = task
+        task.add_done_callback(partial(self._done, key))
+        return await asyncio.shield(task)
+
+    async def async_cancel(self) -> None:
+        """Anulează execuțiile aflate în curs și așteaptă să se încheie (la descărcarea intrării)."""
+        tasks = list(self._calls.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Excepția ajunge la apelanți; dacă toți au fost anulați, nu o mai raportează asyncio
+            task.exception()
+
+
+class HostLimiter:
+    """
+    Limitează cererile către fiecare host: numărul de cereri simultane și,
+    opțional, ritmul lor (cereri pe secundă). Fiecare host primește propriul
+    semafor și propriul ritm, create la prima cerere.
+    """
 
-        headers = HEADERS_POST
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, rate: float | None = None):
+        self._max_concurrency = max(1, max_concurrency)
+        self._interval = 1 / rate if rate else 0.0
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_slot: dict[str, float] = {}
+
+    def limit(self, url: str) -> asyncio.Semaphore:
+        """Întoarce semaforul hostului din `url`."""
+        host = urlsplit(url).hostname or ""
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphores[host]
+
+    @asynccontextmanager
+    async def acquire(self, url: str):
+        """Ocupă un loc pentru o cerere către hostul din `url`, respectând și ritmul maxim."""
+        async with self.limit(url):
+            if self._interval:
+                host = urlsplit(url).hostname or ""
+                now = asyncio.get_running_loop().time()
+                slot = max(now, self._next_slot.get(host, now))
+                self._next_slot[host] = slot + self._interval
+                if slot > now:
+                    await asyncio.sleep(slot - now)
+            yield
+
+
+class PageSnapshot:
+    """
+    Instantaneu al paginilor Scomet pentru un singur ciclu de actualizare.
+    Fiecare pagină distinctă este descărcată și parsată o singură dată,
+    iar indexul ei este folosit de toți extractorii care au nevoie de el.
+    """
 
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
+    def __init__(self, api: ScometAPI, full_pages=None):
+        self._api = api
+        # Paginile citite complet; None = toate. Celelalte sunt citite doar până la câmpurile cerute.
+        self._full_pages = None if full_pages is None else frozenset(full_pages)
+        self._pages: dict[str, asyncio.Task] = {}
+        self.changed: set[str] = set()  # Paginile modificate față de ciclul anterior
+        self.errors: dict[str, Exception] = {}  # Paginile care nu au putut fi descărcate și eroarea lor
 
+    def _page_task(self, url: str, keys=None) -> asyncio.Task:
+        """
+        Pornește descărcarea paginii `url` doar la prima cerere din ciclu.
+        Pentru o pagină care nu trebuie citită complet, citirea se oprește după câmpurile
+        paginii dintre `keys` (toate câmpurile ei, dacă `keys` este None).
+        """
+        if url not in self._pages:
+            fields = None
+            if self._full_pages is not None and url not in self._full_pages:
+                fields = frozenset(spec.key for spec in fields_for(keys) if spec.url == url) or None
+            self._pages[url] = asyncio.create_task(self._async_fetch(url, fields))
+        return self._pages[url]
+
+    async def _async_fetch(self, url: str, keys: frozenset[str] | None) -> PageIndex:
         try:
-            async with self._session.get(url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch data: HTTP {response.status}")
-
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
-
-            # Locate the correct section using <h5> tag
-            apa_rece_header = soup.find("h5", string="Apa rece General")
+            index, changed = await self._api.async_fetch_page(url, keys)
+        except Exception as err:
+            self.errors[url] = err
+            self._api.metrics.increment(COUNTER_FETCH_FAILURES)
+            raise
+        if changed:
+            self.changed.add(url)
+        return index
 
-            if not apa_rece_header:
-                raise Exception("Could not find 'Apa rece General' header.")
-
-            # Find the associated table (searching for the next <table>)
-            apa_rece_table = apa_rece_header.find_next("table")
-
-            if not apa_rece_table:
-                raise Exception("Could not find 'Apa rece General' table after header.")
-
-            # Get all rows inside the table
-            rows = apa_rece_table.find_all("tr")
-
-            if not rows or len(rows) < 2:
-                raise Exception("Could not find enough rows in 'Apa rece General' table.")
-
-            # Find the first data row (skip headers if present)
-            first_data_row = None
-            for row in rows:
-                td_elements = row.find_all("td")
-                if len(td_elements) >= 3:  # Ensure there are enough columns
-                    first_data_row = row
-                    break
-                
-            if not first_data_row:
-                raise Exception("No valid data row found in the table.")
-
-            # Find the third <td> (which contains the "Consum" value)
-            consum_td = first_data_row.find_all("td")[2]  # Third column (Index 2)
-
-            # Extract and clean the text
-            consum_text = consum_td.text.strip().replace("\xa0", "").replace(",", ".")
-
-            # Convert to float
-            consum_value = float(consum_text)
-
-            _LOGGER.info(f"Found Consum apa rece: {consum_value}")
-            return consum_value
-
-        except Exception as e:
-            _LOGGER.error(f"Error occurred while extracting consumaparece: {str(e)}")
-            return None
-        
-    async def async_get_payment_url(self):
-        """Obține URL-ul paginii de plată utilizând cookie-ul deskis."""
-
-        url = URL_PLATA # Payment page URL
-
-        if not self._deskis_cookie:
-            auth_ok = await self.async_login()
-            if not auth_ok:
-                _LOGGER.error("Eroare: Nu s-a putut obține cookie-ul deskis.")
-                return None
-
-        headers = {
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-        }
-
-        cookies = {
-            "deskis": self._deskis_cookie  # ✅ Use dynamically obtained cookie
-        }
-
-        try:
-            async with self._session.get(url, headers=headers, cookies=cookies) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch payment page: HTTP {response.status}")
+    @property
+    def unchanged(self) -> bool:
+        """Adevărat dacă toate paginile descărcate sunt identice cu ciclul anterior."""
+        return not self.changed and not self.errors
 
-                _LOGGER.info("Accesare pagină de plată reușită: %s", url)
-                return url  # ✅ Return the payment page URL
+    async def async_prefetch(self, *urls: str, keys=None) -> None:
+        """
+        Descarcă în paralel paginile independente, pentru câmpurile `keys` (implicit toate).
+        Erorile rămân izolate pe pagină și sunt ridicate doar de extractorii paginii respective.
+        """
+        results = await asyncio.gather(*(self._page_task(url, keys) for url in urls), return_exceptions=True)
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                # Eroarea ajunge la coordinator (PageSnapshot.errors), care o raportează
+                _LOGGER.debug("Eroare la descărcarea paginii %s: %s", url, result)
 
-        except Exception as e:
-            _LOGGER.error("Error in async_get_payment_url: %s", e)
-            return None
+    async def async_get(self, url: str) -> PageIndex:
+        """
+        Întoarce indexul paginii `url`, descărcându-l doar la prima cerere.
+        Pentru o pagină care nu este în `full_pages`, indexul conține doar porțiunea citită.
+        """
+        # shield: anularea unui apelant nu anulează descărcarea pentru ceilalți
+        return await asyncio.shield(self._page_task(url))
@@ -0,0 +1 @@
+"""Testele integrării Scomet."""
@@ -0,0 +1,83 @@
+"""
+Fluxul de opțiuni și migrarea intrărilor, cu intrări `MockConfigEntry` care nu sunt
+configurate: nimic din aceste teste nu face login la scomet.ro.
+"""
+
+import pytest
+from homeassistant.data_entry_flow import FlowResultType, InvalidData
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.scomet import async_migrate_entry
+from custom_components.scomet.const import (
+    CONF_CONSUMPTION_INTERVAL, CONF_INVOICES_INTERVAL, CONF_PARSE_MODE, CONF_UPDATE_INTERVAL, DOMAIN,
+    PARSE_MODE_PROCESS, TIER_MIN_INTERVAL,
+)
+
+DATA = {"username": "test", "password": "test"}
+OPTIONS = {CONF_UPDATE_INTERVAL: 120, CONF_INVOICES_INTERVAL: 7200, CONF_CONSUMPTION_INTERVAL: 86400}
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Integrarea este încărcată din `custom_components/`."""
+
+
+async def test_options_flow_saves_and_notifies(hass):
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=DATA)
+    entry.add_to_hass(hass)
+    updates = []
+
+    async def record_update(_hass, updated):
+        updates.append(dict(updated.options))
+
+    # Ascultătorul real are nevoie de o intrare încărcată (cu rețea); aici doar numărăm apelurile
+    entry.add_update_listener(record_update)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(result["flow_id"], OPTIONS)
+    await hass.async_block_till_done()
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert {key: entry.options[key] for key in OPTIONS} == OPTIONS
+    assert updates == [dict(entry.options)]
+
+
+async def test_options_flow_rejects_intervals_below_floor(hass):
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=DATA)
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    with pytest.raises(InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"], {CONF_UPDATE_INTERVAL: TIER_MIN_INTERVAL - 1}
+        )
+    assert CONF_UPDATE_INTERVAL not in entry.options
+
+
+async def test_migrate_v1_drops_legacy_update_interval(hass):
+    entry = MockConfigEntry(
+        domain=DOMAIN, version=1, data=DATA, options={CONF_UPDATE_INTERVAL: 10, CONF_PARSE_MODE: PARSE_MODE_PROCESS}
+    )
+    entry.add_to_hass(hass)
+
+    assert await async_migrate_entry(hass, entry)
+    assert entry.version == 2
+    assert dict(entry.options) == {CONF_PARSE_MODE: PARSE_MODE_PROCESS}
+    assert dict(entry.data) == DATA
+
+
+async def test_migrate_keeps_current_options(hass):
+    entry = MockConfigEntry(domain=DOMAIN, version=2, data=DATA, options=OPTIONS)
+    entry.add_to_hass(hass)
+
+    assert await async_migrate_entry(hass, entry)
+    assert dict(entry.options) == OPTIONS
+
+
+async def test_migrate_refuses_newer_versions(hass):
+    entry = MockConfigEntry(domain=DOMAIN, version=3, data=DATA)
+    entry.add_to_hass(hass)
+
+    assert not await async_migrate_entry(hass, entry)
@@ -0,0 +1,27 @@
+"""Istoricul local al facturilor: adăugarea fără duplicate."""
+
+from datetime import date
+
+from custom_components.scomet.history import InvoiceHistory
+
+ISSUED = date(2025, 1, 25)
+DUE = date(2025, 2, 24)
+
+
+async def test_ingest_skips_invoices_already_seen(hass):
+    history = InvoiceHistory(hass, "test")
+    rows = [(ISSUED, DUE, 120.5), (date(2024, 12, 25), None, 98.0)]
+
+    assert history.async_ingest(rows) == 2
+    assert history.async_ingest(rows) == 0
+    assert len(history) == 2
+
+
+async def test_ingest_keeps_distinct_invoices_of_the_same_day(hass):
+    history = InvoiceHistory(hass, "test")
+
+    # O factură și stornarea ei, emise în aceeași zi
+    assert history.async_ingest([(ISSUED, DUE, 120.5), (ISSUED, DUE, -120.5)]) == 2
+    assert history.async_ingest([(ISSUED, DUE, -120.5), (ISSUED, None, 120.5)]) == 1
+    assert [row["total"] for row in history.last(3)] == [120.5, -120.5, 120.5]
+    assert history.yearly_totals() == {2025: 120.5}
@@ -0,0 +1,101 @@
+"""
+Întârzierea buclei de evenimente cât timp paginile sunt parsate în afara ei.
+
+Mai multe conturi parsează simultan, de mai multe ori, paginile din `benchmarks/fixtures`,
+cu html.parser (cel mai lent backend, cazul cel mai rău). În paralel, o sondă programează
+un timer la fiecare `PROBE_INTERVAL` și măsoară cu cât întârzie: cât timp parsarea ar rula
+în buclă, timerul nu ar putea porni.
+"""
+
+import asyncio
+import gc
+import time
+from pathlib import Path
+
+import pytest
+
+from custom_components.scomet.const import (
+    PARSE_MODE_PROCESS, PARSE_MODE_THREAD, URL_CONSUM_APA, URL_FACTURI, URL_SITUATIE,
+)
+from custom_components.scomet.hub import ScometHub
+from custom_components.scomet.parsers import BACKEND_HTML_PARSER, parse_bytes
+from custom_components.scomet.utils_http import ScometAPI
+
+FIXTURES = Path(__file__).resolve().parents[1] / "benchmarks" / "fixtures"
+PAGES = {
+    URL_SITUATIE: (FIXTURES / "situatie.html").read_bytes(),
+    URL_FACTURI: (FIXTURES / "facturi.html").read_bytes(),
+    URL_CONSUM_APA: (FIXTURES / "consumuri.html").read_bytes(),
+}
+ACCOUNTS = 10
+ROUNDS = 3
+PROBE_INTERVAL = 0.005
+MAX_LAG = 0.05
+
+
+class LagProbe:
+    """Programează un timer la fiecare `interval` secunde și reține cu cât a întârziat."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> list[float]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return self.samples
+
+
+@pytest.mark.parametrize("mode", [PARSE_MODE_THREAD, PARSE_MODE_PROCESS])
+async def test_parsing_does_not_block_the_loop(hass, mode):
+    hub = ScometHub(hass)
+    # Executorul (și procesele) sunt pornite aici, în afara măsurătorii
+    await hub.async_setup(mode)
+    apis = [
+        ScometAPI(
+            hass, f"cont{number}", "parola",
+            parser_backend=BACKEND_HTML_PARSER, http_session=hub.async_create_session(),
+            parse_mode=mode, parse_executor=hub.parse_executor(mode),
+        )
+        for number in range(ACCOUNTS)
+    ]
+
+    async def parse_all():
+        return await asyncio.gather(
+            *(api._async_parse(content, None, url) for api in apis for url, content in PAGES.items())
+        )
+
+    # Obiectele modulelor importate nu sunt subiectul măsurătorii: fără freeze, o colectare
+    # completă peste ele ar apărea într-un moment oarecare al măsurătorii
+    gc.collect()
+    gc.freeze()
+    probe = LagProbe(PROBE_INTERVAL)
+    probe.start()
+    try:
+        for _ in range(ROUNDS):
+            indexes = await parse_all()
+    finally:
+        lags = await probe.stop()
+        gc.unfreeze()
+        for api in apis:
+            await api.async_close()
+        await hub.async_shutdown()
+
+    # Indexul întors de executor este cel din parsarea directă
+    expected = [parse_bytes(content, None, url, BACKEND_HTML_PARSER) for url, content in PAGES.items()]
+    assert indexes == expected * ACCOUNTS
+    assert lags
+    assert max(lags) < MAX_LAG, f"bucla a întârziat {max(lags) * 1000:.1f} ms în modul {mode}"
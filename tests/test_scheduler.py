@@ -0,0 +1,193 @@
+"""
+Testele planificatorului, cu un ceas simulat: fiecare metodă primește momentul `now`,
+așa că ceasul este doar un `datetime` pe care îl avansăm explicit.
+"""
+
+from datetime import datetime, timedelta
+
+from custom_components.scomet.const import (
+    HUB_JITTER, SCHEDULER_BACKOFF_AFTER, SCHEDULER_DENSE_WINDOW, SCHEDULER_MAX_INTERVAL, SCHEDULER_SPARSE_INTERVAL,
+    TIER_MIN_INTERVAL, URL_CONSUM_APA, URL_FACTURI, URL_SITUATIE,
+)
+from custom_components.scomet.scheduler import BillingScheduler, RefreshTiers
+
+BASE = timedelta(minutes=5)
+SPARSE = timedelta(seconds=SCHEDULER_SPARSE_INTERVAL)
+# Ultima factură: emisă pe 25 ianuarie, scadentă pe 24 februarie; următoarea este așteptată pe 25 februarie
+INVOICE = {"datafactura": "2025-01-25", "datascadenta": "2025-02-24"}
+MID_CYCLE = datetime(2025, 2, 8, 12, 0)
+
+
+class FakeClock:
+    """Ceasul simulat: pornește la `start` și avansează doar la cerere."""
+
+    def __init__(self, start: datetime):
+        self.now = start
+
+    def advance(self, delta: timedelta) -> datetime:
+        self.now += delta
+        return self.now
+
+
+def billing(changed: bool = True) -> BillingScheduler:
+    scheduler = BillingScheduler(base_interval=BASE)
+    scheduler.observe(INVOICE, changed)
+    return scheduler
+
+
+def test_billing_base_interval_until_first_invoice():
+    scheduler = BillingScheduler(base_interval=BASE)
+    assert scheduler.next_interval(MID_CYCLE) == BASE
+    scheduler.observe({"datafactura": None}, changed=True)
+    assert scheduler.next_interval(MID_CYCLE) == BASE
+
+
+def test_billing_dense_around_expected_issue_and_due_date():
+    scheduler = billing()
+    assert scheduler.expected_issue.isoformat() == "2025-02-25"
+    for moment in (datetime(2025, 2, 24, 9, 0), datetime(2025, 2, 25, 23, 0), datetime(2025, 2, 21, 0, 0)):
+        assert scheduler.next_interval(moment) == BASE
+    # Fereastra se încheie la SCHEDULER_DENSE_WINDOW zile după ziua estimată
+    after = datetime(2025, 2, 26) + timedelta(days=SCHEDULER_DENSE_WINDOW, minutes=1)
+    assert scheduler.next_interval(after) > BASE
+
+
+def test_billing_sparse_mid_cycle_with_backoff():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = billing()
+    assert scheduler.next_interval(clock.now) == SPARSE
+
+    for _ in range(SCHEDULER_BACKOFF_AFTER):
+        scheduler.observe(INVOICE, changed=False)
+        assert scheduler.next_interval(clock.now) == SPARSE
+    scheduler.observe(INVOICE, changed=False)
+    assert scheduler.next_interval(clock.now) == SPARSE * 2
+
+    for _ in range(10):
+        scheduler.observe(INVOICE, changed=False)
+    assert scheduler.next_interval(clock.now) == timedelta(seconds=SCHEDULER_MAX_INTERVAL)
+
+    # O modificare resetează backoff-ul
+    scheduler.observe(INVOICE, changed=True)
+    assert scheduler.next_interval(clock.now) == SPARSE
+
+
+def test_billing_never_sleeps_past_next_dense_window():
+    scheduler = billing()
+    window_start = datetime(2025, 2, 24) - timedelta(days=SCHEDULER_DENSE_WINDOW)
+    assert scheduler.next_interval(window_start - timedelta(hours=2)) == timedelta(hours=2)
+    # Chiar înaintea ferestrei nu coborâm sub intervalul de bază
+    assert scheduler.next_interval(window_start - timedelta(seconds=30)) == BASE
+
+
+def test_billing_replay_detects_every_invoice_within_dense_window():
+    """Un an simulat: fiecare factură nouă este văzută cel târziu după intervalul de bază."""
+    clock = FakeClock(datetime(2025, 1, 26, 0, 0))
+    scheduler = billing()
+    issued = [datetime(2025, month, 25, 10, 0) for month in range(2, 13)]
+    seen = {}
+    current = dict(INVOICE)
+    while clock.now < datetime(2025, 12, 31):
+        fresh = [moment for moment in issued if moment <= clock.now]
+        data = dict(current, datafactura=fresh[-1].strftime("%Y-%m-%d")) if fresh else current
+        changed = data != current
+        if changed:
+            seen[fresh[-1]] = clock.now
+        current = data
+        scheduler.observe(data, changed)
+        clock.advance(scheduler.next_interval(clock.now))
+
+    assert len(seen) == len(issued)
+    assert max(moment - issue for issue, moment in seen.items()) <= BASE
+
+
+def tiers(**intervals) -> RefreshTiers:
+    return RefreshTiers(**{name: timedelta(seconds=seconds) for name, seconds in intervals.items()})
+
+
+def test_tiers_everything_due_before_first_fetch():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers()
+    assert scheduler.due(clock.now) == list(RefreshTiers.PAGES)
+    assert scheduler.next_interval(clock.now) == timedelta(seconds=TIER_MIN_INTERVAL)
+
+
+def test_tiers_each_page_on_its_own_interval():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers(update_interval=300, invoices_interval=86400, consumption_interval=7 * 86400)
+    for url in RefreshTiers.PAGES:
+        scheduler.mark(url, clock.now)
+    assert scheduler.due(clock.now) == []
+    assert scheduler.next_interval(clock.now) == timedelta(seconds=300)
+
+    clock.advance(timedelta(seconds=300))
+    assert scheduler.due(clock.now) == [URL_SITUATIE]
+    scheduler.mark(URL_SITUATIE, clock.now)
+    assert scheduler.due(clock.now) == []
+
+
+def test_tiers_jitter_margin():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers(update_interval=300)
+    for url in RefreshTiers.PAGES:
+        scheduler.mark(url, clock.now)
+    # Un ciclu pornit de hub cu până la HUB_JITTER mai devreme citește totuși pagina
+    margin = timedelta(seconds=300 * HUB_JITTER)
+    assert URL_SITUATIE not in scheduler.due(clock.now + timedelta(seconds=300) - margin - timedelta(seconds=1))
+    assert URL_SITUATIE in scheduler.due(clock.now + timedelta(seconds=300) - margin)
+
+
+def test_tiers_sixty_second_floor():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers(update_interval=10, invoices_interval=10, consumption_interval=10)
+    for url in RefreshTiers.PAGES:
+        scheduler.mark(url, clock.now)
+    assert scheduler.base_interval == timedelta(seconds=TIER_MIN_INTERVAL)
+    assert scheduler.next_interval(clock.now) == timedelta(seconds=TIER_MIN_INTERVAL)
+    # Chiar și cu o scadență deja trecută
+    assert scheduler.next_interval(clock.advance(timedelta(hours=1))) == timedelta(seconds=TIER_MIN_INTERVAL)
+
+
+def test_tiers_defer_only_the_failed_page():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers(update_interval=300)
+    for url in RefreshTiers.PAGES:
+        scheduler.mark(url, clock.now)
+    clock.advance(timedelta(seconds=300))
+    scheduler.defer(URL_SITUATIE, clock.now, timedelta(seconds=900))
+    assert URL_SITUATIE not in scheduler.due(clock.advance(timedelta(seconds=600)))
+    assert scheduler.next_interval(clock.now) == timedelta(seconds=300)
+    assert URL_SITUATIE in scheduler.due(clock.advance(timedelta(seconds=300)))
+
+
+def test_tiers_configure_applies_to_fetched_pages():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers(update_interval=3600)
+    scheduler.mark(URL_SITUATIE, clock.now)
+    assert scheduler.due(clock.now + timedelta(seconds=600)) == [URL_FACTURI, URL_CONSUM_APA]
+    scheduler.configure(timedelta(seconds=300), scheduler.billing.sparse_interval, scheduler.consumption_interval)
+    assert URL_SITUATIE in scheduler.due(clock.now + timedelta(seconds=600))
+
+
+def test_tiers_export_restore_round_trip():
+    clock = FakeClock(MID_CYCLE)
+    scheduler = tiers()
+    scheduler.billing.observe(INVOICE, changed=True)
+    for url in RefreshTiers.PAGES:
+        scheduler.mark(url, clock.advance(timedelta(minutes=7)))
+
+    restored = tiers()
+    restored.billing.observe(INVOICE, changed=True)
+    restored.restore(scheduler.export())
+
+    later = clock.advance(timedelta(minutes=3))
+    assert restored.export() == scheduler.export()
+    assert restored.as_dict(later) == scheduler.as_dict(later)
+    assert restored.due(later) == scheduler.due(later)
+    assert restored.next_interval(later) == scheduler.next_interval(later)
+
+
+def test_tiers_restore_ignores_invalid_entries():
+    scheduler = tiers()
+    scheduler.restore({URL_SITUATIE: "nu este o dată", "https://exemplu.ro": MID_CYCLE.isoformat()})
+    assert scheduler.export() == {}
@@ -0,0 +1,42 @@
+"""Deduplicarea cererilor aflate în curs (`utils_http.SingleFlight`)."""
+
+import asyncio
+
+import pytest
+
+from custom_components.scomet.utils_http import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    shared = []
+    flight = SingleFlight(lambda: shared.append(True))
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return "pagina"
+
+    results = await asyncio.gather(*(flight.async_do("situatie", fetch) for _ in range(3)))
+    assert results == ["pagina"] * 3
+    assert calls == 1
+    assert len(shared) == 2
+    assert len(flight) == 0
+
+
+async def test_cancel_stops_executions_in_flight():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        await asyncio.sleep(3600)
+
+    caller = asyncio.create_task(flight.async_do("facturi", fetch))
+    await started.wait()
+
+    await flight.async_cancel()
+    assert len(flight) == 0
+    with pytest.raises(asyncio.CancelledError):
+        await caller